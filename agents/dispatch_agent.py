@@ -6,7 +6,8 @@ from config import settings
 from models.schemas import NewsReport, UserProfile
 from tools.email_tool import send_email_report
 from agents.historical_recommender_agent import save_report_to_history
-from core.utils import generate_content
+from models.seen_urls import SeenUrlIndex
+from core.utils import generate_content, run_blocking
 
 
 DISPATCH_AGENT_INSTRUCTION = """
@@ -56,7 +57,8 @@ async def run_dispatch_agent(
     """
     # Send the email (no AI call needed for dispatch)
     # Support multiple recipients via CC and BCC
-    success = send_email_report(
+    success = await run_blocking(
+        send_email_report,
         report=report,
         recipient_email=user_profile.delivery_email,
         cc_emails=user_profile.cc_emails,
@@ -65,8 +67,7 @@ async def run_dispatch_agent(
 
     if success:
         # Save to history
-        report_data = report.model_dump()
-        save_report_to_history(user_profile.user_id, report_data)
+        await run_blocking(record_delivery, user_profile.user_id, report)
 
         # Build recipient list for logging
         all_recipients = [user_profile.delivery_email]
@@ -89,3 +90,15 @@ async def run_dispatch_agent(
             "recipient": user_profile.delivery_email,
             "message": "Failed to deliver report",
         }
+
+
+def record_delivery(user_id: str, report: NewsReport):
+    """
+    Save a delivered report to history and mark its URLs as seen
+
+    Args:
+        user_id: User ID
+        report: Delivered NewsReport
+    """
+    save_report_to_history(user_id, report)
+    SeenUrlIndex(user_id).add(article.url for article in report.articles)
@@ -4,8 +4,9 @@ Processes user feedback and updates profile constraints
 """
 from config import settings
 from models.schemas import FeedbackData
-from models.user_profile import UserProfileManager
-from core.utils import generate_content
+from models.user_profile import get_profile_manager
+from core.utils import generate_content, run_blocking
+from core.prompt_budget import PromptBuilder
 
 
 FEEDBACK_AGENT_INSTRUCTION = """
@@ -66,19 +67,21 @@ async def run_feedback_agent(
     Returns:
         Dictionary with constraint updates
     """
-    import asyncio
     import json
 
     # Analyze feedback
-    feedback_prompt = f"""
+    feedback_prompt = (
+        PromptBuilder()
+        .add(f"""
 Analyze this user feedback and extract actionable constraints:
 
 Report ID: {feedback.report_id}
 User ID: {feedback.user_id}
 Rating: {feedback.rating}/5 stars
 
-Feedback Text: {feedback.feedback_text or "No text provided"}
-
+Feedback Text:""")
+        .add(feedback.feedback_text or "No text provided", weight=1)
+        .add(f"""
 Liked Topics: {', '.join(feedback.liked_topics) if feedback.liked_topics else "None specified"}
 Disliked Topics: {', '.join(feedback.disliked_topics) if feedback.disliked_topics else "None specified"}
 Missing Topics: {', '.join(feedback.missing_topics) if feedback.missing_topics else "None specified"}
@@ -102,12 +105,12 @@ Provide constraint updates in this JSON format:
   "other_constraints": {{"key": "value"}},
   "summary": "Brief summary of what we learned"
 }}
-"""
+""")
+        .build()
+    )
 
-    loop = asyncio.get_event_loop()
-    response_text = await loop.run_in_executor(
-        None,
-        lambda: generate_content(feedback_prompt, FEEDBACK_AGENT_INSTRUCTION)
+    response_text = await run_blocking(
+        generate_content, feedback_prompt, FEEDBACK_AGENT_INSTRUCTION
     )
 
     response_text = response_text.strip()
@@ -120,11 +123,9 @@ Provide constraint updates in this JSON format:
 
     constraint_updates = json.loads(response_text.strip())
 
-    # Update user profile
-    profile_manager = UserProfileManager()
-    profile = profile_manager.load_profile(feedback.user_id)
-
-    if profile:
+    # Update user profile. Changes are applied in a function so they can be
+    # re-applied if another worker saves the profile at the same time.
+    def apply_feedback(profile):
         # Add new topics to interests
         if constraint_updates.get("add_to_interests"):
             for topic in constraint_updates["add_to_interests"]:
@@ -149,7 +150,11 @@ Provide constraint updates in this JSON format:
         if constraint_updates.get("other_constraints"):
             new_constraints.update(constraint_updates["other_constraints"])
 
-        profile_manager.update_constraints(feedback.user_id, new_constraints)
+        profile.constraints.update(new_constraints)
+
+    profile_manager = get_profile_manager()
+    if profile_manager.load_profile(feedback.user_id):
+        profile_manager.update_profile(feedback.user_id, apply_feedback)
 
     return {
         "status": "processed",
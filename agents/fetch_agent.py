@@ -2,12 +2,15 @@
 Executive Fetch Agent - Phase 2: Grounded Research
 Fetches and processes actual content from URLs to prevent hallucinations
 """
+import logging
 from typing import List
 
-from config import settings
+from config import settings, log_context
 from models.schemas import SearchResult, FetchedContent
 from tools.fetch_tool import fetch_multiple_urls
-from core.utils import generate_content
+from core.utils import generate_content, run_blocking
+from core.prompt_budget import PromptBuilder
+from core.extractive import condense_text
 
 
 FETCH_AGENT_INSTRUCTION = """
@@ -53,6 +56,7 @@ def create_fetch_agent() -> None:
 async def run_fetch_agent(
     search_results: List[SearchResult],
     max_articles: int = 10,
+    topics: List[str] = None,
 ) -> List[dict]:
     """
     Run the Fetch Agent to retrieve and process content
@@ -60,16 +64,15 @@ async def run_fetch_agent(
     Args:
         search_results: List of SearchResult objects to fetch
         max_articles: Maximum number of articles to process
+        topics: User topics used to pick the relevant passages
 
     Returns:
         List of processed article data
     """
-    import asyncio
-    loop = asyncio.get_event_loop()
-
-    # Fetch content from URLs
+    # Fetch content from URLs (in a worker thread: fetch_multiple_urls
+    # blocks until its own pool has fetched every page)
     urls = [result.url for result in search_results[:max_articles]]
-    fetched_contents = fetch_multiple_urls(urls)
+    fetched_contents = await run_blocking(fetch_multiple_urls, urls)
 
     # Process each fetched content
     processed_articles = []
@@ -78,8 +81,20 @@ async def run_fetch_agent(
         if not fetched.success:
             continue
 
+        # Condense locally so only relevant, quotable passages reach the LLM
+        fetched.condensed_content, fetched.compression_ratio = condense_text(
+            fetched.content,
+            title=fetched.title or search_result.title,
+            topics=(topics or []) + [search_result.query],
+        )
+        logging.getLogger("newspulse.fetch").debug(
+            f"Condensed {fetched.url} to {fetched.compression_ratio:.0%} of its text"
+        )
+
         # Ask the agent to analyze the content
-        analysis_prompt = f"""
+        analysis_prompt = (
+            PromptBuilder(settings.fetch_prompt_token_budget)
+            .add(f"""
 Analyze this fetched article content:
 
 Title: {fetched.title}
@@ -87,9 +102,9 @@ Source: {fetched.source}
 URL: {fetched.url}
 Published: {fetched.published_date or 'Unknown'}
 
-Content:
-{fetched.content[:8000]}  # First 8000 chars to stay within context limits
-
+Content:""")
+            .add(fetched.condensed_content, weight=1)
+            .add("""
 Provide:
 1. Main narrative (2-3 sentences summarizing the core story)
 2. Key facts and data points (bullet list)
@@ -98,13 +113,15 @@ Provide:
 5. Reliability assessment (is this source credible? any red flags?)
 
 Format your response clearly with these sections.
-"""
-
-        response_text = await loop.run_in_executor(
-            None,
-            lambda p=analysis_prompt: generate_content(p, FETCH_AGENT_INSTRUCTION)
+""")
+            .build()
         )
 
+        with log_context(topic=search_result.topic or "-"):
+            response_text = await run_blocking(
+                generate_content, analysis_prompt, FETCH_AGENT_INSTRUCTION
+            )
+
         processed_articles.append({
             "search_result": search_result,
             "fetched_content": fetched,
@@ -2,13 +2,21 @@
 Historical Recommender Agent - Phase 1: Contextual Planning
 Prevents duplicate content and learns from past reports
 """
+import asyncio
+import hashlib
 import json
-from pathlib import Path
+import logging
+import time
 from datetime import datetime, timedelta
 
 from config import settings
 from models.schemas import HistoricalRecommendation
-from core.utils import generate_content
+from models.history_store import get_history_store
+from core.utils import generate_content, run_blocking
+from core.prompt_budget import PromptBuilder
+from core.tracing import set_span_attributes
+from core.metrics import record_cache_lookup
+from core.user_cache import UserRecordCache
 
 
 HISTORICAL_RECOMMENDER_INSTRUCTION = """
@@ -35,6 +43,12 @@ Output format:
 Your analysis ensures that every report provides fresh, novel value.
 """
 
+# Background insight refreshes; strong references keep them from being collected
+_background_tasks = set()
+
+# Last insights per user, keyed on history_digest
+INSIGHTS_CACHE = UserRecordCache("insights")
+
 
 def load_user_history(user_id: str, days_back: int = 30) -> list:
     """
@@ -47,41 +61,31 @@ def load_user_history(user_id: str, days_back: int = 30) -> list:
     Returns:
         List of past reports
     """
-    history_dir = settings.history_dir
-    user_history_file = history_dir / f"{user_id}_history.json"
-
-    if not user_history_file.exists():
-        return []
-
-    with open(user_history_file, "r") as f:
-        all_history = json.load(f)
-
-    # Filter to recent history
     cutoff_date = datetime.utcnow() - timedelta(days=days_back)
-
-    recent_history = [
-        report
-        for report in all_history
-        if datetime.fromisoformat(report["report_date"]) > cutoff_date
-    ]
-
-    return recent_history
+    return get_history_store().load(user_id, since=cutoff_date)
 
 
 async def run_historical_recommender_agent(
-    user_id: str, priority_topics: list[str]
+    user_id: str, priority_topics: list[str], background: bool = True
 ) -> HistoricalRecommendation:
     """
     Run the Historical Recommender Agent
 
+    URLs to exclude are computed locally. The LLM insight text is an
+    optional stage: it is cached per user against a digest of the history
+    and topics, regenerated at most once per refresh interval, and by
+    default refreshed in the background so it never delays a report.
+    The insights are passed to the Search and Writer Agents' prompts.
+
     Args:
         user_id: User ID
         priority_topics: Topics from user profile
+        background: Refresh stale insights in the background (True) or inline
 
     Returns:
         HistoricalRecommendation with URLs to exclude and topics to explore
     """
-    history = load_user_history(user_id)
+    history = await run_blocking(load_user_history, user_id)
 
     # Extract URLs and topics from history
     seen_urls = []
@@ -95,7 +99,61 @@ async def run_historical_recommender_agent(
         if "topics_covered" in report:
             seen_topics.extend(report["topics_covered"])
 
-    prompt = f"""
+    insights = ""
+    if settings.historical_insights_enabled:
+        digest = history_digest(seen_urls, seen_topics, priority_topics)
+        cached = INSIGHTS_CACHE.load(user_id)
+
+        if cached is not None:
+            insights = cached["insights"]
+
+        stale = cached is None or _insights_stale(cached, digest)
+        set_span_attributes(cache_hit=cached is not None, insights_refresh=stale)
+        record_cache_lookup("historical_insights", not stale)
+
+        if stale:
+            refresh = generate_insights(
+                user_id, priority_topics, history, seen_urls, seen_topics, digest
+            )
+            if background:
+                task = asyncio.create_task(_refresh_in_background(refresh))
+                _background_tasks.add(task)
+                task.add_done_callback(_background_tasks.discard)
+            else:
+                insights = await refresh
+
+    return HistoricalRecommendation(
+        recommended_topics=priority_topics,  # Will be enhanced by the agent's suggestions
+        exclude_urls=seen_urls,
+        insights=insights,
+    )
+
+
+async def generate_insights(
+    user_id: str,
+    priority_topics: list[str],
+    history: list,
+    seen_urls: list[str],
+    seen_topics: list[str],
+    digest: str,
+) -> str:
+    """
+    Generate history insights with the LLM and cache them
+
+    Args:
+        user_id: User ID
+        priority_topics: Topics from user profile
+        history: Recent reports
+        seen_urls: URLs already sent
+        seen_topics: Topics already covered
+        digest: History digest the insights are keyed on
+
+    Returns:
+        Insight text
+    """
+    prompt = (
+        PromptBuilder()
+        .add(f"""
 Analyze this user's history and provide recommendations for fresh content:
 
 Priority Topics (from user profile):
@@ -105,9 +163,9 @@ Recent History ({len(history)} reports):
 - Total articles seen: {len(seen_urls)}
 - Topics covered: {', '.join(set(seen_topics))}
 
-URLs to definitely exclude:
-{chr(10).join(seen_urls[:50])}  # Show first 50
-
+URLs to definitely exclude:""")
+        .add(chr(10).join(seen_urls), weight=1, ordered=True)
+        .add("""
 Based on this history:
 1. What related topics should we explore that haven't been covered recently?
 2. What angles or perspectives are missing?
@@ -117,44 +175,72 @@ Provide:
 - Recommended new topics to search (related but fresh)
 - Insights about content gaps
 - Suggestions for novel angles on familiar topics
-"""
+""")
+        .build()
+    )
 
     # Run in thread pool to avoid blocking
-    import asyncio
-    loop = asyncio.get_event_loop()
-    response_text = await loop.run_in_executor(
-        None,
-        lambda: generate_content(prompt, HISTORICAL_RECOMMENDER_INSTRUCTION)
+    response_text = await run_blocking(
+        generate_content, prompt, HISTORICAL_RECOMMENDER_INSTRUCTION
     )
 
-    return HistoricalRecommendation(
-        recommended_topics=priority_topics,  # Will be enhanced by the agent's suggestions
-        exclude_urls=seen_urls,
-        insights=response_text,
+    INSIGHTS_CACHE.save(user_id, {
+        "digest": digest,
+        "generated_at": time.time(),
+        "insights": response_text,
+    })
+
+    return response_text
+
+
+async def _refresh_in_background(refresh) -> str:
+    try:
+        return await refresh
+    except Exception as e:
+        logging.getLogger("newspulse.history").warning(f"History insight refresh failed: {e}")
+        return ""
+
+
+async def drain_background_insights():
+    """Wait for background insight refreshes (call before the event loop exits)"""
+    if _background_tasks:
+        await asyncio.gather(*_background_tasks, return_exceptions=True)
+
+
+def history_digest(
+    seen_urls: list[str], seen_topics: list[str], priority_topics: list[str]
+) -> str:
+    """
+    Digest of the inputs the insight text depends on
+
+    Args:
+        seen_urls: URLs already sent
+        seen_topics: Topics already covered
+        priority_topics: Topics from user profile
+
+    Returns:
+        Hex SHA-256 digest
+    """
+    payload = json.dumps(
+        [sorted(set(seen_urls)), sorted(set(seen_topics)), sorted(priority_topics)]
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def _insights_stale(cached: dict, digest: str) -> bool:
+    """Stale once the history changed, but refreshed at most once per interval"""
+    age_hours = (time.time() - cached.get("generated_at", 0)) / 3600
+    return cached.get("digest") != digest and (
+        age_hours >= settings.historical_insights_refresh_hours
     )
 
 
-def save_report_to_history(user_id: str, report_data: dict):
+def save_report_to_history(user_id: str, report_data):
     """
     Save a completed report to user history
 
     Args:
         user_id: User ID
-        report_data: Report data to save
+        report_data: NewsReport (serialised directly) or report data dict
     """
-    history_dir = settings.history_dir
-    user_history_file = history_dir / f"{user_id}_history.json"
-
-    # Load existing history
-    if user_history_file.exists():
-        with open(user_history_file, "r") as f:
-            history = json.load(f)
-    else:
-        history = []
-
-    # Add new report
-    history.append(report_data)
-
-    # Save updated history
-    with open(user_history_file, "w") as f:
-        json.dump(history, f, indent=2, default=str)
+    get_history_store().append(user_id, report_data)
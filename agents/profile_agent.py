@@ -2,10 +2,16 @@
 Profile Agent - Phase 1: Contextual Planning
 Loads user profile and ensures personalization
 """
+import hashlib
+import json
+
 from config import settings
 from models.schemas import UserProfile
-from models.user_profile import UserProfileManager
-from core.utils import generate_content
+from models.user_profile import get_profile_manager
+from core.utils import generate_content, run_blocking
+from core.tracing import set_span_attributes
+from core.metrics import record_cache_lookup
+from core.user_cache import UserRecordCache
 
 
 PROFILE_AGENT_INSTRUCTION = """
@@ -34,22 +40,82 @@ Be thorough and precise. The quality of the entire report depends on accurate pe
 """
 
 
-async def run_profile_agent(user_id: str) -> dict:
+# Fields the personalization analysis depends on; delivery settings and
+# timestamps change without affecting it
+PROFILE_ANALYSIS_FIELDS = (
+    "name",
+    "role",
+    "company",
+    "industry",
+    "topics_of_interest",
+    "excluded_topics",
+    "preferred_sources",
+    "excluded_sources",
+    "constraints",
+)
+
+# Last analysis per user, keyed on profile_digest
+ANALYSIS_CACHE = UserRecordCache("profile_analysis")
+
+
+async def run_profile_agent(user_id: str, profile: UserProfile = None) -> dict:
     """
     Run the Profile Agent to get user context
 
+    The personalization analysis is cached per user against a digest of
+    the profile's content fields, so the LLM is only called when the
+    profile or its learned constraints change.
+
     Args:
         user_id: User ID to load profile for
+        profile: Already loaded profile (skips loading it again)
 
     Returns:
         Dictionary with user context and personalization requirements
     """
-    profile_manager = UserProfileManager()
-    profile = profile_manager.load_profile(user_id)
+    if profile is None:
+        profile = get_profile_manager().load_profile(user_id)
 
     if profile is None:
         raise ValueError(f"No profile found for user_id: {user_id}")
 
+    digest = profile_digest(profile)
+    cached = ANALYSIS_CACHE.load(user_id)
+
+    cache_hit = cached is not None and cached.get("digest") == digest
+    set_span_attributes(cache_hit=cache_hit)
+    record_cache_lookup("profile_analysis", cache_hit)
+
+    if cache_hit:
+        response_text = cached["analysis"]
+    else:
+        response_text = await generate_profile_analysis(profile)
+        ANALYSIS_CACHE.save(user_id, {"digest": digest, "analysis": response_text})
+
+    return {
+        "user_profile": profile,
+        "personalization_analysis": response_text,
+        "priority_topics": profile.topics_of_interest,
+        "excluded_topics": profile.excluded_topics,
+        "constraints": profile.constraints,
+    }
+
+
+async def generate_profile_analysis(profile: UserProfile) -> str:
+    """
+    Ask the LLM for personalization requirements for a profile
+
+    Args:
+        profile: User profile
+
+    Returns:
+        Personalization analysis text
+    """
+    # Sent whole, one constraint per line: trimming could cut an entry in half
+    constraints = "\n".join(
+        f"- {key}: {value}" for key, value in profile.constraints.items()
+    ) if profile.constraints else "None yet"
+
     prompt = f"""
 Analyze this user profile and provide personalization requirements:
 
@@ -72,7 +138,7 @@ Excluded Sources:
 {chr(10).join(f"- {source}" for source in profile.excluded_sources) if profile.excluded_sources else "None"}
 
 Learned Constraints:
-{profile.constraints if profile.constraints else "None yet"}
+{constraints}
 
 Provide a clear analysis of:
 1. What news topics are most relevant for this user's role
@@ -82,17 +148,25 @@ Provide a clear analysis of:
 """
 
     # Run in thread pool to avoid blocking
-    import asyncio
-    loop = asyncio.get_event_loop()
-    response_text = await loop.run_in_executor(
-        None,
-        lambda: generate_content(prompt, PROFILE_AGENT_INSTRUCTION)
+    response_text = await run_blocking(
+        generate_content, prompt, PROFILE_AGENT_INSTRUCTION
     )
 
-    return {
-        "user_profile": profile,
-        "personalization_analysis": response_text,
-        "priority_topics": profile.topics_of_interest,
-        "excluded_topics": profile.excluded_topics,
-        "constraints": profile.constraints,
-    }
+    return response_text
+
+
+def profile_digest(profile: UserProfile) -> str:
+    """
+    Digest of the profile fields the analysis depends on
+
+    Args:
+        profile: User profile
+
+    Returns:
+        Hex SHA-256 digest
+    """
+    payload = json.dumps(
+        profile.model_dump(include=set(PROFILE_ANALYSIS_FIELDS), mode="json"),
+        sort_keys=True,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
@@ -2,12 +2,14 @@
 Search Agent - Phase 2: Grounded Research
 Performs intelligent search for relevant news articles
 """
-from typing import List
+from typing import List, Union
 
-from config import settings
+from config import settings, log_context
 from models.schemas import SearchResult
+from models.seen_urls import SeenUrlIndex, canonicalize_url
 from tools.search_tool import search_news
-from core.utils import generate_content
+from core.utils import generate_content, run_blocking
+from core.prompt_budget import trim_to_budget
 
 
 SEARCH_AGENT_INSTRUCTION = """
@@ -50,7 +52,7 @@ def create_search_agent() -> None:
 async def run_search_agent(
     priority_topics: List[str],
     user_context: dict,
-    exclude_urls: List[str] = None,
+    exclude_urls: Union[SeenUrlIndex, List[str]] = None,
     max_results_per_topic: int = 5,
 ) -> List[SearchResult]:
     """
@@ -59,17 +61,32 @@ async def run_search_agent(
     Args:
         priority_topics: List of topics to search for
         user_context: User context (role, industry, etc.)
-        exclude_urls: URLs to exclude (already seen)
+        exclude_urls: URLs to exclude (already seen), ideally the user's
+            SeenUrlIndex; plain lists are canonicalised into a set
         max_results_per_topic: Maximum results per topic
 
     Returns:
         List of SearchResult objects
     """
-    exclude_urls = exclude_urls or []
+    if not isinstance(exclude_urls, SeenUrlIndex):
+        exclude_urls = {canonicalize_url(url) for url in exclude_urls or []}
     all_results = []
 
-    import asyncio
-    loop = asyncio.get_event_loop()
+    # The profile analysis goes into every query prompt, so keep it short
+    personalization_notes = ""
+    if user_context.get("personalization_notes"):
+        personalization_notes = "Personalization Notes:\n" + trim_to_budget(
+            user_context["personalization_notes"],
+            settings.search_notes_token_budget,
+        ) + "\n"
+
+    # Gaps and fresh angles from the Historical Recommender, likewise trimmed
+    history_notes = ""
+    if user_context.get("history_insights"):
+        history_notes = "Coverage Insights:\n" + trim_to_budget(
+            user_context["history_insights"],
+            settings.search_notes_token_budget,
+        ) + "\n"
 
     for topic in priority_topics:
         # Generate search query
@@ -77,7 +94,7 @@ async def run_search_agent(
 Generate an effective Google search query for finding recent business news about:
 Topic: {topic}
 User Context: {user_context.get('role', '')} at {user_context.get('company', '')} in {user_context.get('industry', '')}
-
+{personalization_notes}{history_notes}
 Create a search query that will find:
 - Recent news (past 7 days)
 - Business/strategic implications
@@ -87,23 +104,19 @@ Create a search query that will find:
 Return only the search query, nothing else.
 """
 
-        search_query = await loop.run_in_executor(
-            None,
-            lambda: generate_content(query_prompt, SEARCH_AGENT_INSTRUCTION)
-        )
+        with log_context(topic=topic):
+            search_query = await run_blocking(
+                generate_content, query_prompt, SEARCH_AGENT_INSTRUCTION
+            )
         search_query = search_query.strip()
 
-        # Perform the search
-        results = search_news(
-            query=search_query,
-            num_results=max_results_per_topic,
-            days_back=7,
+        # Perform the search and filter out excluded URLs off the event
+        # loop: the search API call and the seen-URL lookups both block
+        filtered_results = await run_blocking(
+            _search_unseen, search_query, max_results_per_topic, exclude_urls
         )
-
-        # Filter out excluded URLs
-        filtered_results = [
-            r for r in results if r.url not in exclude_urls
-        ]
+        for result in filtered_results:
+            result.topic = topic
 
         all_results.extend(filtered_results)
 
@@ -111,8 +124,48 @@ Return only the search query, nothing else.
     seen_urls = set()
     unique_results = []
     for result in all_results:
-        if result.url not in seen_urls:
-            seen_urls.add(result.url)
+        canonical = canonicalize_url(result.url)
+        if canonical not in seen_urls:
+            seen_urls.add(canonical)
             unique_results.append(result)
 
     return unique_results
+
+
+def _search_unseen(
+    query: str, num_results: int, exclude_urls: Union[SeenUrlIndex, set]
+) -> List[SearchResult]:
+    results = search_news(query=query, num_results=num_results, days_back=7)
+    return [r for r in results if canonicalize_url(r.url) not in exclude_urls]
+
+
+async def plan_topic_query(topic: str) -> str:
+    """
+    Search query for a topic with no user context
+
+    Used by research pre-warming, where one search serves every user
+    following the topic.
+
+    Args:
+        topic: Topic of interest
+
+    Returns:
+        Search query
+    """
+    query_prompt = f"""
+Generate an effective Google search query for finding recent business news about:
+Topic: {topic}
+
+Create a search query that will find:
+- Recent news (past 7 days)
+- Business/strategic implications
+- Authoritative sources
+- Relevant to senior executives across industries
+
+Return only the search query, nothing else.
+"""
+    with log_context(topic=topic):
+        search_query = await run_blocking(
+            generate_content, query_prompt, SEARCH_AGENT_INSTRUCTION
+        )
+    return search_query.strip()
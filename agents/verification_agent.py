@@ -2,11 +2,13 @@
 Verification Agent - Phase 3: Verification Loop
 Acts as a quality gate, ensuring all claims are citation-backed
 """
-from typing import List
+from typing import List, Optional
 
 from config import settings
 from models.schemas import NewsReport, Article, VerificationResult
-from core.utils import generate_content
+from core.utils import generate_content, run_blocking
+from core.verification_cache import VerificationCache
+from core.tracing import set_span_attributes
 
 
 VERIFICATION_AGENT_INSTRUCTION = """
@@ -100,24 +102,36 @@ Better to reject and retry than to send unverified content to executives.
 
 async def run_verification_agent(
     report: NewsReport,
+    cache: Optional[VerificationCache] = None,
 ) -> List[VerificationResult]:
     """
     Run the Verification Agent to check report quality
 
+    Only articles the cache hasn't seen are sent to the model.
+
     Args:
         report: NewsReport to verify
+        cache: Optional VerificationCache of earlier results
 
     Returns:
         List of VerificationResult objects, one per article
     """
-    import asyncio
     import json
 
-    loop = asyncio.get_event_loop()
     verification_results = []
 
     for article in report.articles:
+        if cache is not None:
+            cached = cache.get(article)
+            set_span_attributes(
+                cache_hits=cache.hits, cache_misses=cache.misses
+            )
+            if cached is not None:
+                verification_results.append(cached)
+                continue
+
         # Prepare article for verification
+        # Sent whole: trimming the claims or citations would change the verdict
         verification_prompt = f"""
 Verify this article for citation completeness and quality:
 
@@ -156,9 +170,11 @@ Respond in this JSON format:
 Be strict. If in doubt, REJECT and request retry.
 """
 
-        response_text = await loop.run_in_executor(
-            None,
-            lambda p=verification_prompt: generate_content(p, VERIFICATION_AGENT_INSTRUCTION, temperature=0.3)
+        response_text = await run_blocking(
+            generate_content,
+            verification_prompt,
+            VERIFICATION_AGENT_INSTRUCTION,
+            temperature=0.3,
         )
 
         response_text = response_text.strip()
@@ -180,6 +196,9 @@ Be strict. If in doubt, REJECT and request retry.
             retry_suggested=verification_data.get("retry_suggested", False),
         )
 
+        if cache is not None:
+            cache.set(article, result)
+
         verification_results.append(result)
 
     return verification_results
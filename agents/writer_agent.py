@@ -3,12 +3,19 @@ Writer Agent - Phase 3: Verification Loop
 Drafts news summaries with citations
 """
 from typing import List
+import logging
+import threading
 import uuid
 from datetime import datetime
 
 from config import settings
 from models.schemas import NewsReport, Article, Citation, Priority
-from core.utils import generate_content
+from core.json_stream import StreamingJSONParser
+from core.utils import generate_content_stream, run_blocking
+from core.prompt_budget import PromptBuilder, rank_weights
+
+
+logger = logging.getLogger("newspulse.writer")
 
 
 WRITER_AGENT_INSTRUCTION = """
@@ -76,6 +83,8 @@ async def run_writer_agent(
     processed_articles: List[dict],
     user_context: dict,
     max_articles: int = 10,
+    temperature: float = None,
+    max_tokens: int = None,
 ) -> NewsReport:
     """
     Run the Writer Agent to create a news report
@@ -84,27 +93,18 @@ async def run_writer_agent(
         processed_articles: List of processed article data from Fetch Agent
         user_context: User context and personalization data
         max_articles: Maximum articles to include in report
+        temperature: Sampling temperature (default from settings)
+        max_tokens: Output token limit (default from settings)
 
     Returns:
         NewsReport object (may need verification)
     """
-    # Prepare article data for the writer
-    articles_context = []
-    for i, item in enumerate(processed_articles[:max_articles], 1):
-        articles_context.append(f"""
-Article {i}:
-Title: {item['search_result'].title}
-Source: {item['search_result'].source}
-URL: {item['search_result'].url}
-Published: {item['search_result'].published_date or 'Unknown'}
+    # Prepare article data for the writer. Articles arrive in rank order,
+    # so higher-ranked analyses get a larger share of the prompt budget.
+    ranked_articles = processed_articles[:max_articles]
+    builder = PromptBuilder(settings.writer_prompt_token_budget)
 
-Analysis from Fetch Agent:
-{item['analysis']}
-
----
-""")
-
-    prompt = f"""
+    builder.add(f"""
 Create a comprehensive executive news report based on these articles.
 
 User Context:
@@ -112,10 +112,35 @@ User Context:
 - Company: {user_context.get('company', '')}
 - Industry: {user_context.get('industry', '')}
 - Interests: {', '.join(user_context.get('priority_topics', []))}
+""")
+
+    if user_context.get("personalization_notes"):
+        builder.add("Personalization Notes:")
+        builder.add(user_context["personalization_notes"], weight=1)
+
+    if user_context.get("history_insights"):
+        builder.add("Coverage Insights (from the user's past reports):")
+        builder.add(user_context["history_insights"], weight=1)
 
+    builder.add("""
 Articles to analyze:
-{chr(10).join(articles_context)}
+""")
+
+    for i, (item, weight) in enumerate(zip(ranked_articles, rank_weights(len(ranked_articles))), 1):
+        builder.add(f"""
+Article {i}:
+Title: {item['search_result'].title}
+Source: {item['search_result'].source}
+URL: {item['search_result'].url}
+Published: {item['search_result'].published_date or 'Unknown'}
 
+Analysis from Fetch Agent:""")
+        builder.add(item['analysis'], weight=weight)
+        builder.add("""
+---
+""")
+
+    builder.add(f"""
 Create a report with:
 
 1. Executive Summary (2-3 paragraphs covering the big picture)
@@ -163,76 +188,29 @@ Remember:
 - Every factual claim must have a citation
 - Properly escape all special characters in JSON strings
 - Test your JSON is valid before responding
-"""
+""")
+    prompt = builder.build()
 
-    # Generate content asynchronously
+    # Stream the response so complete articles survive a truncated
+    # or malformed tail, and are validated while generation continues
     import asyncio
-    import json
-
-    loop = asyncio.get_event_loop()
-    response_text = await loop.run_in_executor(
-        None,
-        lambda: generate_content(prompt, WRITER_AGENT_INSTRUCTION)
-    )
-
-    # Extract JSON from response (may be wrapped in markdown code block)
-    response_text = response_text.strip()
-    if response_text.startswith("```json"):
-        response_text = response_text[7:]
-    if response_text.startswith("```"):
-        response_text = response_text[3:]
-    if response_text.endswith("```"):
-        response_text = response_text[:-3]
-
-    response_text = response_text.strip()
-
-    # Try to parse JSON with better error handling
-    try:
-        report_data = json.loads(response_text)
-    except json.JSONDecodeError as e:
-        from config import setup_logger
-        logger = setup_logger("WriterAgent")
-        logger.error(f"JSON parsing failed: {e}")
-        logger.error(f"Response preview (first 500 chars): {response_text[:500]}")
-        logger.error(f"Response preview (last 500 chars): {response_text[-500:]}")
-
-        # Try to find and extract valid JSON
-        # Look for the outermost { } brackets
-        start_idx = response_text.find('{')
-        end_idx = response_text.rfind('}')
-
-        if start_idx != -1 and end_idx != -1 and end_idx > start_idx:
-            json_candidate = response_text[start_idx:end_idx + 1]
-            try:
-                report_data = json.loads(json_candidate)
-                logger.info("Successfully recovered JSON after extraction")
-            except json.JSONDecodeError:
-                # If still failing, raise a more helpful error
-                raise ValueError(
-                    f"Writer Agent generated invalid JSON. Error at line {e.lineno}, column {e.colno}. "
-                    f"This is a temporary LLM error - the verification loop will retry."
-                ) from e
-        else:
-            raise ValueError(
-                f"Writer Agent generated invalid JSON: {e}. "
-                f"This is a temporary LLM error - the verification loop will retry."
-            ) from e
 
-    # Convert to NewsReport object
     articles = []
     topics_covered = set()
     skipped_articles = []
 
-    for article_data in report_data.get("articles", []):
-        citations = [
-            Citation(**citation_data)
-            for citation_data in article_data.get("citations", [])
-        ]
+    def add_article(article_data: dict):
+        citations = []
+        for citation_data in article_data.get("citations", []):
+            try:
+                citations.append(Citation(**citation_data))
+            except Exception:
+                continue
 
         # Skip articles without citations - they violate our quality standards
         if not citations or len(citations) == 0:
             skipped_articles.append(article_data.get("title", "Unknown"))
-            continue
+            return
 
         try:
             article = Article(
@@ -245,26 +223,63 @@ Remember:
                 url=article_data["url"],
                 source=article_data["source"],
             )
-
-            articles.append(article)
-
-            # Extract topics
-            for topic in user_context.get('priority_topics', []):
-                if topic.lower() in article.title.lower() or topic.lower() in article.summary.lower():
-                    topics_covered.add(topic)
-
         except Exception as e:
             # Log and skip articles that fail validation
-            from config import setup_logger
-            logger = setup_logger("WriterAgent")
             logger.warning(f"Skipping article '{article_data.get('title', 'Unknown')}' due to validation error: {e}")
             skipped_articles.append(article_data.get("title", "Unknown"))
-            continue
+            return
+
+        articles.append(article)
+
+        # Extract topics
+        for topic in user_context.get('priority_topics', []):
+            if topic.lower() in article.title.lower() or topic.lower() in article.summary.lower():
+                topics_covered.add(topic)
+
+    # Set when the awaiting task is cancelled, so the worker thread
+    # closes the stream instead of paying for tokens nobody will read
+    cancelled = threading.Event()
+
+    def stream_report() -> dict:
+        parser = StreamingJSONParser(array_key="articles")
+        stream = generate_content_stream(
+            prompt,
+            WRITER_AGENT_INSTRUCTION,
+            temperature=temperature,
+            max_tokens=max_tokens,
+        )
+        for chunk in stream:
+            if cancelled.is_set():
+                stream.close()
+                raise asyncio.CancelledError()
+            for article_data in parser.feed(chunk):
+                add_article(article_data)
+
+        emitted = len(parser.items)
+        try:
+            report_data = parser.finish()
+        except ValueError as e:
+            logger.error(f"JSON parsing failed: {e}")
+            logger.error(f"Response preview (first 500 chars): {parser.text[:500]}")
+            raise ValueError(
+                f"Writer Agent generated invalid JSON: {e}. "
+                f"This is a temporary LLM error - the verification loop will retry."
+            ) from e
+
+        # Articles closed by repairing a truncated tail
+        for article_data in parser.items[emitted:]:
+            add_article(article_data)
+
+        return report_data
+
+    try:
+        report_data = await run_blocking(stream_report)
+    except asyncio.CancelledError:
+        cancelled.set()
+        raise
 
     # Log skipped articles if any
     if skipped_articles:
-        from config import setup_logger
-        logger = setup_logger("WriterAgent")
         logger.warning(f"Skipped {len(skipped_articles)} articles without citations: {', '.join(skipped_articles)}")
 
     # Ensure at least some articles made it through
@@ -274,6 +289,12 @@ Remember:
             "The Writer Agent must produce articles with at least one citation each."
         )
 
+    if not report_data.get("executive_summary"):
+        raise ValueError(
+            "Writer Agent output is missing the executive summary. "
+            "This is a temporary LLM error - the verification loop will retry."
+        )
+
     report = NewsReport(
         user_id=user_context.get('user_id', 'unknown'),
         report_date=datetime.utcnow(),
@@ -281,7 +302,7 @@ Remember:
         articles=articles,
         total_articles=len(articles),
         topics_covered=list(topics_covered),
-        report_id=str(uuid.uuid4()),
+        report_id=user_context.get('report_id') or str(uuid.uuid4()),
     )
 
     return report
@@ -0,0 +1,289 @@
+"""
+Pipeline benchmark
+Runs generate_report and each agent offline against recorded fixtures
+(benchmarks/fixtures) with simulated latency, reports p50/p95 latency and
+throughput, and appends the results to benchmarks/results/history.jsonl
+
+Latencies are ``fixed:S``, ``uniform:A:B`` or ``lognormal:MEDIAN:SIGMA``
+in seconds, multiplied by --time-scale. The LLM answers from canned
+fixture responses, synthetic responses, or a replay of recordings made
+with LLM_BACKEND=record (--llm replay --llm-latency recorded). Runs are compared with the last
+recorded run of the same configuration; a p95 more than --threshold
+slower is reported as a regression.
+
+Usage:
+    python benchmarks/bench_pipeline.py [--runs 10] [--concurrency 4]
+        [--llm canned|synthetic|replay] [--llm-latency lognormal:1.5:0.4]
+        [--llm-error-rate 0.0] [--llm-rate-limit-rate 0.0] [--time-scale 0.05]
+        [--fail-on-regression]
+"""
+import argparse
+import asyncio
+import json
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from config import settings, configure_logging
+from models.schemas import UserProfile
+from models.user_profile import get_profile_manager
+from core.orchestrator import NewsPulseOrchestrator
+from agents.profile_agent import generate_profile_analysis
+from agents.historical_recommender_agent import (
+    drain_background_insights,
+    run_historical_recommender_agent,
+)
+from agents.search_agent import run_search_agent
+from agents.fetch_agent import run_fetch_agent
+from agents.writer_agent import run_writer_agent
+from agents.verification_agent import run_verification_agent
+from agents.dispatch_agent import run_dispatch_agent
+
+from offline import LatencyModel, isolated_data_dir, make_llm, offline, percentile
+
+
+RESULTS_PATH = Path(__file__).parent / "results" / "history.jsonl"
+TOPICS = ["AI infrastructure", "Cloud computing", "Semiconductors"]
+
+
+def make_profile(user_id: str) -> UserProfile:
+    return UserProfile(
+        user_id=user_id,
+        name="Bench User",
+        role="CTO",
+        company="Bench Corp",
+        industry="Technology",
+        topics_of_interest=TOPICS,
+        delivery_email=f"{user_id}@example.com",
+    )
+
+
+def summarize(durations: list, wall_s: float, errors: int = 0) -> dict:
+    if not durations:
+        return {"runs": 0, "errors": errors, "p50_s": 0.0, "p95_s": 0.0, "mean_s": 0.0,
+                "throughput_per_min": 0.0}
+    return {
+        "runs": len(durations),
+        "errors": errors,
+        "p50_s": round(percentile(durations, 50), 4),
+        "p95_s": round(percentile(durations, 95), 4),
+        "mean_s": round(sum(durations) / len(durations), 4),
+        "throughput_per_min": round(len(durations) / wall_s * 60, 1) if wall_s else 0.0,
+    }
+
+
+async def timed_batch(make_call, runs: int, concurrency: int) -> dict:
+    """
+    Run ``make_call(i)`` ``runs`` times, at most ``concurrency`` at once
+
+    Failed calls (e.g. simulated LLM errors) are counted, not timed.
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+    durations = []
+    errors = 0
+
+    async def one(i):
+        nonlocal errors
+        async with semaphore:
+            start = time.perf_counter()
+            try:
+                await make_call(i)
+            except Exception:
+                errors += 1
+                return
+            durations.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(runs)))
+    return summarize(durations, time.perf_counter() - start, errors)
+
+
+async def bench_pipeline(runs: int, concurrency: int) -> dict:
+    """generate_report for fresh users (cold caches), then again (warm)"""
+    manager = get_profile_manager()
+    user_ids = [f"bench_user_{i}" for i in range(runs)]
+    for user_id in user_ids:
+        manager.save_profile(make_profile(user_id))
+
+    orchestrator = NewsPulseOrchestrator()
+    results = {}
+    for scenario in ("cold", "warm"):
+        results[f"pipeline.{scenario}"] = await timed_batch(
+            lambda i: orchestrator.generate_report(user_ids[i], deliver=True),
+            runs,
+            concurrency,
+        )
+    await drain_background_insights()
+    return results
+
+
+async def bench_agents(runs: int) -> dict:
+    """Each agent on its own, one call at a time"""
+    profile = make_profile("bench_agents")
+    get_profile_manager().save_profile(profile)
+    user_context = {
+        "user_id": profile.user_id,
+        "role": profile.role,
+        "company": profile.company,
+        "industry": profile.industry,
+        "priority_topics": TOPICS,
+        "personalization_notes": "Focus on capacity, cost and vendor risk.",
+    }
+
+    search_results = await run_search_agent(TOPICS, user_context, exclude_urls=[])
+    processed_articles = await run_fetch_agent(
+        search_results, settings.max_articles_per_report, TOPICS
+    )
+    report = await run_writer_agent(processed_articles, user_context)
+
+    cases = {
+        "agent.profile": lambda i: generate_profile_analysis(profile),
+        # A fresh user each run, so the insight cache misses
+        "agent.historical": lambda i: run_historical_recommender_agent(
+            f"bench_history_{i}", TOPICS, background=False
+        ),
+        "agent.search": lambda i: run_search_agent(TOPICS, user_context, exclude_urls=[]),
+        "agent.fetch": lambda i: run_fetch_agent(
+            search_results, settings.max_articles_per_report, TOPICS
+        ),
+        "agent.writer": lambda i: run_writer_agent(processed_articles, user_context),
+        "agent.verification": lambda i: run_verification_agent(report, cache=None),
+        "agent.dispatch": lambda i: run_dispatch_agent(report, profile),
+    }
+    return {
+        name: await timed_batch(make_call, runs, concurrency=1)
+        for name, make_call in cases.items()
+    }
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True, text=True, check=True,
+            cwd=Path(__file__).parent,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def previous_run(config: dict) -> dict:
+    """The last recorded run with the same configuration, if any"""
+    if not RESULTS_PATH.exists():
+        return None
+    previous = None
+    for line in RESULTS_PATH.read_text().splitlines():
+        entry = json.loads(line)
+        if entry.get("config") == config:
+            previous = entry
+    return previous
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the pipeline offline")
+    parser.add_argument("--runs", type=int, default=10, help="Runs per case")
+    parser.add_argument("--concurrency", type=int, default=4, help="Reports generated at once")
+    parser.add_argument("--llm", choices=["canned", "synthetic", "replay"], default="canned")
+    parser.add_argument("--recordings-dir", type=Path, help="Recordings to replay (default: LLM_RECORDINGS_DIR)")
+    parser.add_argument("--llm-latency", default="lognormal:1.5:0.4")
+    parser.add_argument("--llm-error-rate", type=float, default=0.0, help="Share of LLM calls failing with a 503")
+    parser.add_argument("--llm-rate-limit-rate", type=float, default=0.0, help="Share failing with a 429")
+    parser.add_argument("--search-latency", default="lognormal:0.4:0.3")
+    parser.add_argument("--fetch-latency", default="lognormal:0.3:0.5")
+    parser.add_argument("--smtp-latency", default="fixed:0.2")
+    parser.add_argument("--time-scale", type=float, default=0.05, help="Multiplier for all latencies")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--skip-agents", action="store_true", help="Only benchmark generate_report")
+    parser.add_argument("--threshold", type=float, default=0.2, help="p95 slow-down counted as a regression")
+    parser.add_argument("--fail-on-regression", action="store_true")
+    parser.add_argument("--no-save", action="store_true", help="Don't append to results/history.jsonl")
+    args = parser.parse_args()
+
+    config = {
+        "runs": args.runs,
+        "concurrency": args.concurrency,
+        "llm": args.llm,
+        "llm_latency": args.llm_latency,
+        "llm_error_rate": args.llm_error_rate,
+        "llm_rate_limit_rate": args.llm_rate_limit_rate,
+        "search_latency": args.search_latency,
+        "fetch_latency": args.fetch_latency,
+        "smtp_latency": args.smtp_latency,
+        "time_scale": args.time_scale,
+        "max_articles": settings.max_articles_per_report,
+    }
+    latencies = [
+        LatencyModel(spec, args.time_scale, seed=args.seed + i)
+        for i, spec in enumerate(
+            (args.llm_latency, args.search_latency, args.fetch_latency, args.smtp_latency)
+        )
+    ]
+
+    llm = make_llm(
+        args.llm,
+        latencies[0],
+        recordings_dir=args.recordings_dir,
+        error_rate=args.llm_error_rate,
+        rate_limit_rate=args.llm_rate_limit_rate,
+        seed=args.seed,
+    )
+
+    # The fakes stand in for the live client
+    settings.llm_backend = "live"
+    settings.log_level = "WARNING"
+    settings.trace_path = None
+    configure_logging(level="WARNING")
+
+    with tempfile.TemporaryDirectory() as data_dir, isolated_data_dir(Path(data_dir)), \
+            offline(llm, *latencies[1:]) as fakes:
+        results = asyncio.run(bench_pipeline(args.runs, args.concurrency))
+        if not args.skip_agents:
+            results.update(asyncio.run(bench_agents(args.runs)))
+        calls = {"llm": fakes.llm.calls, "search": fakes.search.calls, "http": fakes.http.calls}
+
+    previous = previous_run(config)
+    regressions = []
+
+    print(f"{'case':<22}{'runs':>6}{'errors':>8}{'p50 s':>10}{'p95 s':>10}{'mean s':>10}{'per min':>10}{'p95 vs last':>13}")
+    for name, result in results.items():
+        change = ""
+        if previous and name in previous["results"]:
+            before = previous["results"][name]["p95_s"]
+            if before:
+                ratio = result["p95_s"] / before - 1
+                change = f"{ratio:+.0%}"
+                if ratio > args.threshold:
+                    regressions.append(name)
+                    change += " !"
+        print(
+            f"{name:<22}{result['runs']:>6}{result['errors']:>8}{result['p50_s']:>10.3f}{result['p95_s']:>10.3f}"
+            f"{result['mean_s']:>10.3f}{result['throughput_per_min']:>10.1f}{change:>13}"
+        )
+    print(f"\nFake calls: {calls}")
+    if previous:
+        print(f"Compared with {previous['commit']} ({previous['timestamp']})")
+
+    if not args.no_save:
+        RESULTS_PATH.parent.mkdir(parents=True, exist_ok=True)
+        with open(RESULTS_PATH, "a", encoding="utf-8") as f:
+            f.write(json.dumps({
+                "timestamp": datetime.utcnow().isoformat(timespec="seconds"),
+                "commit": git_commit(),
+                "config": config,
+                "results": results,
+                "calls": calls,
+            }) + "\n")
+
+    if regressions:
+        print(f"Regressions (p95 > {args.threshold:.0%} slower): {', '.join(regressions)}")
+        if args.fail_on_regression:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+"""
+Serialisation benchmark
+Compares the old model_dump()/json.dump(indent=2) path with models.serialization
+
+Usage:
+    python benchmarks/bench_serialization.py [--reports 1000] [--repeat 5]
+"""
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from models.schemas import Article, Citation, NewsReport, Priority, UserProfile
+from models.serialization import dump_model, dumps, load_model, loads, orjson
+
+
+def make_profile() -> UserProfile:
+    return UserProfile(
+        user_id="bench_user",
+        name="Bench User",
+        role="CTO",
+        company="Bench Corp",
+        industry="Technology",
+        topics_of_interest=[f"Topic {i}" for i in range(10)],
+        excluded_topics=["Sports"],
+        preferred_sources=["example.com"],
+        delivery_email="bench@example.com",
+        constraints={"length_preference": "shorter", "feedback_count": 12},
+    )
+
+
+def make_report(index: int) -> NewsReport:
+    articles = [
+        Article(
+            title=f"Article {index}-{i}",
+            summary="Revenue grew 25% year over year as demand for AI services rose. " * 4,
+            key_insights=[f"Insight {j}" for j in range(4)],
+            citations=[
+                Citation(
+                    claim="Revenue grew 25%",
+                    source_url=f"https://example.com/{index}/{i}",
+                    source_title="Example",
+                    quote="Revenue grew 25% year over year",
+                )
+                for _ in range(3)
+            ],
+            priority=Priority.HIGH,
+            relevance_reason="Directly affects the cloud roadmap.",
+            url=f"https://example.com/{index}/{i}",
+            source="example.com",
+        )
+        for i in range(10)
+    ]
+    return NewsReport(
+        user_id="bench_user",
+        executive_summary="A busy week for AI infrastructure. " * 10,
+        articles=articles,
+        total_articles=len(articles),
+        topics_covered=["AI", "Cloud"],
+        report_id=f"report_{index}",
+    )
+
+
+def timed(func, repeat: int) -> float:
+    """Best wall-clock time of ``repeat`` runs, in milliseconds"""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark JSON serialisation")
+    parser.add_argument("--reports", type=int, default=1000, help="History size")
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per case (best is kept)")
+    args = parser.parse_args()
+
+    profile = make_profile()
+    reports = [make_report(i) for i in range(args.reports)]
+    profile_ops = 1000
+
+    old_profile = json.dumps(profile.model_dump(), indent=2, default=str)
+    new_profile = dump_model(profile, pretty=False)
+    old_history = json.dumps([r.model_dump() for r in reports], indent=2, default=str)
+    new_rows = [dumps(r, pretty=False) for r in reports]
+
+    cases = [
+        (
+            f"profile save x{profile_ops}",
+            lambda: [json.dumps(profile.model_dump(), indent=2, default=str) for _ in range(profile_ops)],
+            lambda: [dump_model(profile, pretty=False) for _ in range(profile_ops)],
+        ),
+        (
+            f"profile load x{profile_ops}",
+            lambda: [UserProfile(**json.loads(old_profile)) for _ in range(profile_ops)],
+            lambda: [load_model(UserProfile, new_profile) for _ in range(profile_ops)],
+        ),
+        (
+            f"history save ({args.reports} reports)",
+            lambda: json.dumps([r.model_dump() for r in reports], indent=2, default=str),
+            lambda: [dumps(r, pretty=False) for r in reports],
+        ),
+        (
+            f"history load ({args.reports} reports)",
+            lambda: json.loads(old_history),
+            lambda: [loads(row) for row in new_rows],
+        ),
+    ]
+
+    print(f"JSON library for plain data: {'orjson' if orjson else 'json'}")
+    print(f"{'case':<32}{'before ms':>12}{'after ms':>12}{'speed-up':>10}")
+    for name, before, after in cases:
+        before_ms = timed(before, args.repeat)
+        after_ms = timed(after, args.repeat)
+        print(f"{name:<32}{before_ms:>12.1f}{after_ms:>12.1f}{before_ms / after_ms:>9.1f}x")
+
+    old_size = len(old_history.encode("utf-8"))
+    new_size = sum(len(row.encode("utf-8")) for row in new_rows)
+    print(f"{'history size (bytes)':<32}{old_size:>12}{new_size:>12}{old_size / new_size:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
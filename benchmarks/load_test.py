@@ -0,0 +1,256 @@
+"""
+Load test
+Generates N synthetic user profiles with overlapping topics and runs the
+batch pipeline against local stand-ins (synthetic LLM, recorded search
+results, a local HTTP server for pages, fake SMTP) at several concurrency
+levels, reporting throughput, latency percentiles, peak RSS, open sockets,
+threads and default-executor queue depth
+
+Sockets include both ends of connections to the local page server, which
+runs in the same process.
+
+Usage:
+    python benchmarks/load_test.py [--users 100] [--concurrency 1,8,32]
+        [--llm-latency lognormal:1.5:0.4] [--time-scale 0.02]
+        [--profile-backend json|sqlite] [--json results.json]
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import resource
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from config import settings, configure_logging
+from models.schemas import UserProfile
+from models.user_profile import get_profile_manager
+from core.orchestrator import NewsPulseOrchestrator
+
+from offline import LatencyModel, LocalWebServer, isolated_data_dir, make_llm, offline, percentile
+
+
+# Ordered by popularity: a few topics are shared by many users, most by few
+TOPIC_POOL = [
+    "Artificial intelligence", "Cloud computing", "Cybersecurity", "Semiconductors",
+    "Interest rates", "Electric vehicles", "Renewable energy", "Supply chain",
+    "Mergers and acquisitions", "Venture capital", "Data privacy regulation",
+    "Quantum computing", "Fintech", "Healthcare technology", "Retail e-commerce",
+    "Commercial real estate", "Oil and gas", "Logistics", "Biotech funding",
+    "Digital advertising", "Telecommunications", "Space industry", "Robotics",
+    "Agritech", "Insurance technology", "Gaming industry", "Streaming media",
+    "Cryptocurrency regulation", "Labor market", "Trade policy",
+]
+ROLES = ["CEO", "CTO", "CFO", "COO", "VP of Engineering", "Head of Strategy", "Product Director"]
+INDUSTRIES = ["Technology", "Finance", "Healthcare", "Retail", "Energy", "Manufacturing", "Media"]
+
+
+def make_profiles(count: int, seed: int) -> list:
+    """Synthetic profiles whose topics follow a Zipf-like popularity curve"""
+    rng = random.Random(seed)
+    weights = [1 / (rank + 1) for rank in range(len(TOPIC_POOL))]
+    profiles = []
+    for i in range(count):
+        topics = []
+        wanted = rng.randint(3, 5)
+        while len(topics) < wanted:
+            topic = rng.choices(TOPIC_POOL, weights)[0]
+            if topic not in topics:
+                topics.append(topic)
+        profiles.append(UserProfile(
+            user_id=f"load_user_{i:05d}",
+            name=f"Load User {i}",
+            role=rng.choice(ROLES),
+            company=f"Company {i % 97}",
+            industry=rng.choice(INDUSTRIES),
+            topics_of_interest=topics,
+            delivery_email=f"load_user_{i}@example.com",
+        ))
+    return profiles
+
+
+class ResourceSampler:
+    """Samples RSS, sockets, threads and executor queue depth in a thread"""
+
+    def __init__(self, loop: asyncio.AbstractEventLoop, interval: float):
+        self.loop = loop
+        self.interval = interval
+        self.peaks = {"rss_mb": 0.0, "sockets": 0, "threads": 0, "executor_queue": 0}
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+        self.sample()
+        return False
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.sample()
+
+    def sample(self):
+        executor = getattr(self.loop, "_default_executor", None)
+        queue = getattr(executor, "_work_queue", None)
+        current = {
+            "rss_mb": rss_mb(),
+            "sockets": open_sockets(),
+            "threads": threading.active_count(),
+            "executor_queue": queue.qsize() if queue is not None else 0,
+        }
+        for key, value in current.items():
+            self.peaks[key] = max(self.peaks[key], value)
+
+
+def rss_mb() -> float:
+    """Current resident set size (peak since start where /proc is unavailable)"""
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024 if sys.platform == "darwin" else 1024)
+
+
+def open_sockets() -> int:
+    """Open socket descriptors of this process (0 where /proc is unavailable)"""
+    try:
+        fds = os.listdir("/proc/self/fd")
+    except OSError:
+        return 0
+    count = 0
+    for fd in fds:
+        try:
+            if os.readlink(f"/proc/self/fd/{fd}").startswith("socket:"):
+                count += 1
+        except OSError:
+            continue
+    return count
+
+
+async def run_level(user_ids: list, concurrency: int, interval: float) -> dict:
+    """Run one batch and summarise it"""
+    orchestrator = NewsPulseOrchestrator()
+    with ResourceSampler(asyncio.get_running_loop(), interval) as sampler:
+        start = time.perf_counter()
+        results = await orchestrator.generate_batch(user_ids, deliver=True, concurrency=concurrency)
+        wall_s = time.perf_counter() - start
+
+    durations = [result["duration_s"] for result in results if result["status"] == "ok"]
+    errors = {}
+    for result in results:
+        if result["status"] == "error":
+            kind = result["error"].split(":", 1)[0]
+            errors[kind] = errors.get(kind, 0) + 1
+    return {
+        "concurrency": concurrency,
+        "ok": len(durations),
+        "errors": errors,
+        "wall_s": round(wall_s, 2),
+        "reports_per_min": round(len(durations) / wall_s * 60, 1),
+        "p50_s": round(percentile(durations, 50), 3),
+        "p95_s": round(percentile(durations, 95), 3),
+        "p99_s": round(percentile(durations, 99), 3),
+        "peak_rss_mb": round(sampler.peaks["rss_mb"], 1),
+        "peak_sockets": sampler.peaks["sockets"],
+        "peak_threads": sampler.peaks["threads"],
+        "peak_executor_queue": sampler.peaks["executor_queue"],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load-test the batch pipeline offline")
+    parser.add_argument("--users", type=int, default=100, help="Synthetic profiles")
+    parser.add_argument("--concurrency", default="1,8,32", help="Comma-separated levels")
+    parser.add_argument("--llm-latency", default="lognormal:1.5:0.4")
+    parser.add_argument("--llm-error-rate", type=float, default=0.0)
+    parser.add_argument("--llm-rate-limit-rate", type=float, default=0.0)
+    parser.add_argument("--search-latency", default="lognormal:0.4:0.3")
+    parser.add_argument("--fetch-latency", default="lognormal:0.3:0.5")
+    parser.add_argument("--smtp-latency", default="fixed:0.2")
+    parser.add_argument("--time-scale", type=float, default=0.02, help="Multiplier for all latencies")
+    parser.add_argument("--profile-backend", choices=["json", "sqlite"], default=settings.profile_backend)
+    parser.add_argument("--sample-interval", type=float, default=0.1, help="Seconds between resource samples")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--json", type=Path, help="Also write the results to this file")
+    args = parser.parse_args()
+
+    levels = [int(level) for level in args.concurrency.split(",")]
+    llm_latency, search_latency, fetch_latency, smtp_latency = [
+        LatencyModel(spec, args.time_scale, seed=args.seed + i)
+        for i, spec in enumerate(
+            (args.llm_latency, args.search_latency, args.fetch_latency, args.smtp_latency)
+        )
+    ]
+    llm = make_llm(
+        "synthetic",
+        llm_latency,
+        error_rate=args.llm_error_rate,
+        rate_limit_rate=args.llm_rate_limit_rate,
+        seed=args.seed,
+    )
+
+    settings.llm_backend = "live"  # The synthetic backend stands in for the live client
+    settings.profile_backend = args.profile_backend
+    settings.log_level = "CRITICAL"
+    settings.trace_path = None
+    configure_logging(level="CRITICAL")
+
+    profiles = make_profiles(args.users, args.seed)
+    topics = {topic for profile in profiles for topic in profile.topics_of_interest}
+    print(
+        f"{args.users} users, {len(topics)} distinct topics, "
+        f"{sum(len(p.topics_of_interest) for p in profiles) / len(profiles):.1f} topics per user"
+    )
+
+    results = []
+    with LocalWebServer(fetch_latency) as web:
+        for concurrency in levels:
+            # A fresh data directory per level, so every level starts cold
+            with tempfile.TemporaryDirectory() as data_dir, isolated_data_dir(Path(data_dir)), \
+                    offline(llm, search_latency, fetch_latency, smtp_latency, web_base_url=web.base_url):
+                manager = get_profile_manager()
+                for profile in profiles:
+                    manager.save_profile(profile)
+                user_ids = [profile.user_id for profile in profiles]
+                results.append(asyncio.run(run_level(user_ids, concurrency, args.sample_interval)))
+
+            result = results[-1]
+            print(
+                f"concurrency {concurrency:>4}: {result['ok']:>5} ok, "
+                f"{sum(result['errors'].values()):>4} failed, {result['reports_per_min']:>8.1f}/min, "
+                f"p50 {result['p50_s']:.2f}s p95 {result['p95_s']:.2f}s p99 {result['p99_s']:.2f}s, "
+                f"RSS {result['peak_rss_mb']:.0f} MB, sockets {result['peak_sockets']}, "
+                f"threads {result['peak_threads']}, executor queue {result['peak_executor_queue']}"
+            )
+            if result["errors"]:
+                print(f"{'':>19}errors: {result['errors']}")
+
+    # Saturation: the first level that adds less than 10% throughput
+    for previous, current in zip(results, results[1:]):
+        if current["reports_per_min"] < previous["reports_per_min"] * 1.1:
+            print(
+                f"\nThroughput saturates at concurrency {previous['concurrency']} "
+                f"({previous['reports_per_min']:.1f} reports/min)"
+            )
+            break
+
+    if args.json:
+        args.json.write_text(json.dumps({"config": vars(args), "results": results}, indent=2, default=str))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,300 @@
+"""
+Offline replay environment for benchmarks
+Serves recorded search responses, saved HTML pages, canned (or synthetic,
+or replayed) LLM responses and a fake SMTP server with simulated latency,
+so the pipeline runs without network access or API keys
+"""
+import json
+import math
+import re
+import threading
+from contextlib import ExitStack, contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Dict, Iterator, List, Optional
+from unittest import mock
+from urllib.parse import urlparse
+
+import requests
+
+from config import settings
+from core.llm_backends import (
+    LatencyModel,
+    ReplayBackend,
+    SyntheticBackend,
+    calling_agent,
+    estimate_usage,
+)
+
+
+FIXTURES_DIR = Path(__file__).parent / "fixtures"
+
+_AGENT_KEYS = {
+    "Profile": "profile",
+    "Historical Recommender": "historical",
+    "Search": "search",
+    "Fetch": "fetch",
+    "Writer": "writer",
+    "Verification": "verification",
+    "Feedback": "feedback",
+}
+
+
+def load_fixture(name: str):
+    """Load a JSON fixture from benchmarks/fixtures"""
+    return json.loads((FIXTURES_DIR / name).read_text())
+
+
+class CannedBackend(SyntheticBackend):
+    """Answers each agent with its recorded response from llm_responses.json"""
+
+    def __init__(self, latency: LatencyModel, responses: Dict[str, object] = None, **kwargs):
+        super().__init__(latency, **kwargs)
+        self.responses = responses or load_fixture("llm_responses.json")
+
+    def _lookup(self, model: str, contents: str):
+        response = self.responses.get(_AGENT_KEYS.get(calling_agent(contents)), "OK")
+        if not isinstance(response, str):
+            response = json.dumps(response)
+        return response, estimate_usage(contents, response), 0.0
+
+
+def make_llm(kind: str, latency: LatencyModel, recordings_dir: Path = None, **kwargs):
+    """
+    LLM stand-in for a benchmark
+
+    Args:
+        kind: "canned" (fixture responses), "synthetic" or "replay"
+        latency: Simulated latency ("recorded" replays recorded latency)
+        recordings_dir: Recordings for replay (defaults to settings)
+        **kwargs: error_rate, rate_limit_rate, seed
+
+    Returns:
+        Client-like backend, with a ``calls`` counter
+    """
+    if kind == "canned":
+        return CannedBackend(latency, **kwargs)
+    if kind == "synthetic":
+        return SyntheticBackend(latency, **kwargs)
+    if kind == "replay":
+        return ReplayBackend(recordings_dir or settings.llm_recordings_dir, latency, **kwargs)
+    raise ValueError(f"Unknown benchmark LLM: {kind}")
+
+
+def fixture_page(url: str, pages_dir: Path = None) -> Optional[bytes]:
+    """Saved HTML for a URL, matched by its last path segment less any -N suffix"""
+    slug = re.sub(r"-\d+$", "", Path(urlparse(url).path).name)
+    page = (pages_dir or FIXTURES_DIR / "pages") / f"{slug}.html"
+    return page.read_bytes() if page.exists() else None
+
+
+class FakeSearchService:
+    """
+    Stands in for the Custom Search service built by googleapiclient
+
+    Each query gets a stable rotation of the recorded results, so
+    different topics return overlapping but not identical result sets.
+    Links get a per-call suffix, as if the news had moved on, so repeat
+    runs for a user aren't starved by its seen-URL index.
+    """
+
+    def __init__(self, latency: LatencyModel, response: dict = None, base_url: str = None):
+        self.latency = latency
+        self.items = (response or load_fixture("custom_search.json")).get("items", [])
+        self.calls = 0
+        if base_url:
+            # Point results at a LocalWebServer instead of the recorded hosts
+            self.items = [
+                {**item, "link": base_url + urlparse(item["link"]).path}
+                for item in self.items
+            ]
+
+    def cse(self):
+        return self
+
+    def list(self, q: str, num: int = 10, **params):
+        self.calls += 1
+        offset = sum(map(ord, q)) % max(len(self.items), 1)
+        items = [
+            {**item, "link": f"{item['link']}-{self.calls}"}
+            for item in (self.items[offset:] + self.items[:offset])[:num]
+        ]
+        return SimpleNamespace(execute=lambda: self._execute(items))
+
+    def _execute(self, items: List[dict]) -> dict:
+        self.latency.sleep()
+        return {"items": items}
+
+
+class FakeHttp:
+    """Serves saved HTML pages by URL slug (less any -N suffix) in place of the HTTP session"""
+
+    def __init__(self, latency: LatencyModel, pages_dir: Path = None):
+        self.latency = latency
+        self.pages_dir = pages_dir or FIXTURES_DIR / "pages"
+        self.calls = 0
+
+    def get(self, url: str, headers=None, timeout=None):
+        self.calls += 1
+        self.latency.sleep()
+
+        content = fixture_page(url, self.pages_dir)
+        response = requests.Response()
+        response.url = url
+        if content is not None:
+            response.status_code = 200
+            response._content = content
+        else:
+            response.status_code = 404
+            response._content = b""
+        return response
+
+
+class LocalWebServer:
+    """
+    Serves the saved pages over real HTTP on 127.0.0.1
+
+    Unlike FakeHttp, fetches open real sockets, so load tests see
+    connection and thread costs.
+    """
+
+    def __init__(self, latency: LatencyModel, pages_dir: Path = None):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                server.latency.sleep()
+                content = fixture_page(self.path, pages_dir)
+                self.send_response(200 if content is not None else 404)
+                self.send_header("Content-Type", "text/html; charset=utf-8")
+                self.send_header("Content-Length", str(len(content or b"")))
+                self.end_headers()
+                self.wfile.write(content or b"")
+
+            def log_message(self, format, *args):
+                pass
+
+        self.latency = latency
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.httpd.daemon_threads = True
+        self.base_url = f"http://127.0.0.1:{self.httpd.server_port}"
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+        return False
+
+
+class FakeSMTP:
+    """Accepts mail like smtplib.SMTP and counts what was sent"""
+
+    sent = 0
+    _lock = threading.Lock()
+
+    def __init__(self, host: str = "", port: int = 0, latency: LatencyModel = None):
+        self.latency = latency
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def starttls(self):
+        pass
+
+    def login(self, username, password):
+        pass
+
+    def sendmail(self, from_addr, to_addrs, msg):
+        if self.latency is not None:
+            self.latency.sleep()
+        with FakeSMTP._lock:
+            FakeSMTP.sent += 1
+
+
+@contextmanager
+def isolated_data_dir(data_dir: Path) -> Iterator[Path]:
+    """
+    Point profiles, history, caches and the database at a scratch directory
+
+    Shared stores are cached per process, so they are reset on the way in
+    and out.
+    """
+    from models.history_store import get_history_store
+    from models.usage_store import get_usage_store
+    from models.user_profile import get_profile_manager
+
+    fields = ("user_profiles_dir", "history_dir", "cache_dir", "database_path")
+    saved = {field: getattr(settings, field) for field in fields}
+
+    def reset_stores():
+        for getter in (get_profile_manager, get_history_store, get_usage_store):
+            getter.cache_clear()
+
+    data_dir = Path(data_dir)
+    settings.user_profiles_dir = data_dir / "user_profiles"
+    settings.history_dir = data_dir / "history"
+    settings.cache_dir = data_dir / "cache"
+    settings.database_path = data_dir / "newspulse.db"
+    for field in ("user_profiles_dir", "history_dir", "cache_dir"):
+        getattr(settings, field).mkdir(parents=True, exist_ok=True)
+    reset_stores()
+    try:
+        yield data_dir
+    finally:
+        for field, value in saved.items():
+            setattr(settings, field, value)
+        reset_stores()
+
+
+@contextmanager
+def offline(
+    llm,
+    search_latency: LatencyModel,
+    fetch_latency: LatencyModel,
+    smtp_latency: LatencyModel,
+    web_base_url: str = None,
+) -> Iterator[SimpleNamespace]:
+    """
+    Replace Gemini, Custom Search, HTTP fetching and SMTP with local fakes
+
+    Args:
+        llm: Client-like LLM backend (see make_llm), used in place of the
+            live Gemini client
+        web_base_url: Fetch pages over HTTP from this LocalWebServer
+            instead of answering fetches in-process
+
+    Yields:
+        Namespace of the fakes (llm, search, http), for call counts
+    """
+    fakes = SimpleNamespace(
+        llm=llm,
+        search=FakeSearchService(search_latency, base_url=web_base_url),
+        http=FakeHttp(fetch_latency),
+    )
+    with ExitStack() as stack:
+        stack.enter_context(mock.patch("core.utils.get_genai_client", lambda: fakes.llm))
+        stack.enter_context(mock.patch("tools.search_tool.get_search_service", lambda: fakes.search))
+        if web_base_url is None:
+            stack.enter_context(mock.patch("tools.fetch_tool.get_http_session", lambda: fakes.http))
+        stack.enter_context(mock.patch(
+            "tools.email_tool.smtplib.SMTP",
+            lambda host, port: FakeSMTP(host, port, latency=smtp_latency),
+        ))
+        yield fakes
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of a list of values"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(math.ceil(pct / 100 * len(ordered)), 1)
+    return ordered[rank - 1]
@@ -1,4 +1,19 @@
 from .settings import settings
-from .logger_config import setup_logger, set_agent_context
+from .logger_config import (
+    setup_logger,
+    configure_logging,
+    set_agent_context,
+    set_log_context,
+    log_context,
+    get_log_context,
+)
 
-__all__ = ["settings", "setup_logger", "set_agent_context"]
+__all__ = [
+    "settings",
+    "setup_logger",
+    "configure_logging",
+    "set_agent_context",
+    "set_log_context",
+    "log_context",
+    "get_log_context",
+]
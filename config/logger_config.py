@@ -1,54 +1,240 @@
 """
 Custom logging configuration for debugging multi-agent flows
-Provides colored, structured logging with agent context tracking
+Queue-based logging with agent context tracking, a coloured console and a JSON-lines sink
 """
+import atexit
+import contextvars
+import copy
+import json
 import logging
+import queue
 import sys
-from typing import Optional
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from pathlib import Path
+from typing import Dict, Iterator, Optional
 from colorlog import ColoredFormatter
 
+from .settings import settings
+
+
+# Per-task logging context. asyncio copies the context into every task it
+# creates, so concurrent pipelines each keep their own values.
+LOG_CONTEXT_DEFAULTS = {
+    "agent": "SYSTEM",
+    "user_id": "-",
+    "report_id": "-",
+    "phase": "-",
+    "topic": "-",
+}
+_log_context: Dict[str, contextvars.ContextVar] = {
+    field: contextvars.ContextVar(f"newspulse_{field}", default=default)
+    for field, default in LOG_CONTEXT_DEFAULTS.items()
+}
 
-class AgentContextFilter(logging.Filter):
-    """Add agent context to log records"""
 
-    def __init__(self):
-        super().__init__()
-        self.agent_context = "SYSTEM"
+class AgentContextFilter(logging.Filter):
+    """Add agent, user, report, phase and topic context to log records"""
 
     def filter(self, record):
-        record.agent = self.agent_context
+        for field, var in _log_context.items():
+            setattr(record, field, var.get())
         return True
 
 
-def setup_logger(name: str = "newspulse", level: str = "INFO") -> logging.Logger:
+def get_log_context() -> Dict[str, str]:
+    """Current logging context as a dictionary"""
+    return {field: var.get() for field, var in _log_context.items()}
+
+
+def set_log_context(**fields: Optional[str]):
     """
-    Set up a colored, structured logger for the application
+    Set logging context fields for the current task
+
+    The values apply to the current asyncio task (or thread) and to
+    tasks it starts afterwards; use ``log_context`` to restore them.
 
     Args:
-        name: Logger name
-        level: Logging level (DEBUG, INFO, WARNING, ERROR, CRITICAL)
+        **fields: agent, user_id, report_id, phase and/or topic
+    """
+    for field, value in fields.items():
+        if field not in _log_context:
+            raise ValueError(f"Unknown log context field: {field}")
+        if value is not None:
+            _log_context[field].set(str(value))
+
+
+@contextmanager
+def log_context(**fields: Optional[str]) -> Iterator[None]:
+    """
+    Set logging context fields for the duration of a block
+
+    Args:
+        **fields: agent, user_id, report_id, phase and/or topic
+    """
+    tokens = []
+    for field, value in fields.items():
+        if field not in _log_context:
+            raise ValueError(f"Unknown log context field: {field}")
+        if value is not None:
+            tokens.append((_log_context[field], _log_context[field].set(str(value))))
+    try:
+        yield
+    finally:
+        for var, token in reversed(tokens):
+            var.reset(token)
+
+
+# Attributes every LogRecord has; anything else was passed via ``extra``
+_RECORD_ATTRIBUTES = set(vars(logging.makeLogRecord({}))) | {"message", "asctime"}
+
+_listener: Optional[QueueListener] = None
+
+
+class JsonLinesFormatter(logging.Formatter):
+    """Format records as one JSON object per line for log aggregation"""
+
+    def format(self, record):
+        entry = {
+            "timestamp": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for field in LOG_CONTEXT_DEFAULTS:
+            entry[field] = getattr(record, field, LOG_CONTEXT_DEFAULTS[field])
+        # Structured fields passed as extra={...}, e.g. duration_s or tokens
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRIBUTES and key not in entry:
+                entry[key] = value
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            entry["exception"] = record.exc_text
+        return json.dumps(entry, default=str)
+
+
+class _ContextQueueHandler(QueueHandler):
+    """QueueHandler that keeps extra fields and exceptions for the sinks"""
+
+    def prepare(self, record):
+        # Merge args into the message here, in the emitting thread, but leave
+        # exc_info for the sinks (the stdlib version flattens it into msg)
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+def configure_logging(
+    level: Optional[str] = None,
+    json_path: Optional[Path] = None,
+    console: bool = True,
+) -> logging.Logger:
+    """
+    Configure application logging once at startup
+
+    Records are put on a queue by the logging call (cheap, never blocks
+    the event loop) and written to the sinks by a background listener
+    thread: the console (coloured when attached to a terminal) and,
+    optionally, a JSON-lines file. Context fields are captured when the
+    record is created, so they are correct for the emitting task.
+
+    Calling it again reconfigures the sinks.
+
+    Args:
+        level: Logging level (defaults to settings)
+        json_path: JSON-lines log file (defaults to settings.log_json_path; None disables)
+        console: Write human-readable logs to stdout
 
     Returns:
-        Configured logger instance
+        The root "newspulse" logger
     """
-    logger = logging.getLogger(name)
-    logger.setLevel(getattr(logging, level.upper()))
+    global _listener
+
+    level = (level or settings.log_level).upper()
+    json_path = json_path or settings.log_json_path
+
+    sinks = []
+    if console:
+        handler = logging.StreamHandler(sys.stdout)
+        handler.setFormatter(_console_formatter(sys.stdout.isatty()))
+        sinks.append(handler)
+    if json_path:
+        json_path = Path(json_path)
+        json_path.parent.mkdir(parents=True, exist_ok=True)
+        handler = logging.FileHandler(json_path, encoding="utf-8")
+        handler.setFormatter(JsonLinesFormatter())
+        sinks.append(handler)
+
+    if _listener is not None:
+        _listener.stop()
+
+    log_queue = queue.SimpleQueue()
+    _listener = QueueListener(log_queue, *sinks, respect_handler_level=True)
+    _listener.start()
+
+    queue_handler = _ContextQueueHandler(log_queue)
+    queue_handler.addFilter(AgentContextFilter())
+
+    logger = logging.getLogger("newspulse")
+    logger.setLevel(getattr(logging, level))
+    for old_handler in list(logger.handlers):
+        logger.removeHandler(old_handler)
+    logger.addHandler(queue_handler)
 
-    # Avoid duplicate handlers
-    if logger.handlers:
-        return logger
+    return logger
 
-    # Create console handler
-    handler = logging.StreamHandler(sys.stdout)
-    handler.setLevel(getattr(logging, level.upper()))
 
-    # Add agent context filter
-    context_filter = AgentContextFilter()
-    handler.addFilter(context_filter)
+def shutdown_logging():
+    """Flush queued records and stop the listener thread"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
 
-    # Create colored formatter
-    formatter = ColoredFormatter(
-        "%(log_color)s%(asctime)s | %(levelname)-8s | [%(agent)s] | %(message)s",
+
+atexit.register(shutdown_logging)
+
+
+def setup_logger(name: str = "newspulse", level: Optional[str] = None) -> logging.Logger:
+    """
+    Get an application logger, configuring logging on first use
+
+    Loggers live under the "newspulse" hierarchy and share its queue
+    pipeline, so they can be created anywhere, including hot paths.
+
+    Args:
+        name: Logger name ("newspulse" or a child such as "newspulse.writer";
+            other names are placed under "newspulse.")
+        level: Logging level (DEBUG, INFO, WARNING, ERROR, CRITICAL) for
+            this logger; None leaves it inheriting the configured level
+
+    Returns:
+        Logger instance
+    """
+    if _listener is None:
+        configure_logging(level)
+
+    if name != "newspulse" and not name.startswith("newspulse."):
+        name = f"newspulse.{name}"
+    logger = logging.getLogger(name)
+    if level:
+        logger.setLevel(level.upper())
+    return logger
+
+
+def _console_formatter(colour: bool) -> logging.Formatter:
+    fmt = "%(asctime)s | %(levelname)-8s | [%(agent)s] %(user_id)s | %(message)s"
+    if not colour:
+        return logging.Formatter(fmt, datefmt="%Y-%m-%d %H:%M:%S")
+
+    return ColoredFormatter(
+        "%(log_color)s" + fmt,
         datefmt="%Y-%m-%d %H:%M:%S",
         log_colors={
             "DEBUG": "cyan",
@@ -61,16 +247,7 @@ def setup_logger(name: str = "newspulse", level: str = "INFO") -> logging.Logger
         style="%",
     )
 
-    handler.setFormatter(formatter)
-    logger.addHandler(handler)
-
-    # Store filter reference for updating context
-    logger.context_filter = context_filter
-
-    return logger
-
 
 def set_agent_context(logger: logging.Logger, agent_name: str):
-    """Update the agent context for logging"""
-    if hasattr(logger, "context_filter"):
-        logger.context_filter.agent_context = agent_name
+    """Update the agent context for logging (for the current task only)"""
+    set_log_context(agent=agent_name)
@@ -24,19 +24,105 @@ class Settings(BaseSettings):
 
     # Application Settings
     log_level: str = "INFO"
+    log_json_path: Optional[Path] = None  # JSON-lines log file, e.g. data/logs/newspulse.jsonl
+    trace_path: Optional[Path] = None  # JSON-lines span export, e.g. data/logs/traces.jsonl
+    metrics_enabled: bool = True
+    metrics_port: Optional[int] = None  # Serve Prometheus metrics at http://METRICS_HOST:PORT/metrics
+    metrics_host: str = "127.0.0.1"
     max_articles_per_report: int = 10
     verification_max_retries: int = 2  # Reduced from 3 for faster testing
+
+    # Speculative verification loop (per-user overrides live in profile constraints)
+    speculative_candidates: int = 1  # Writer candidates launched at once; 1 = serial loop
+    speculative_token_ceiling: int = 0  # Output tokens shared by all candidates; 0 = no ceiling
     report_delivery_time: str = "08:00"
+    batch_concurrency: int = 4  # Reports generated at once by "main.py batch"
+
+    # Delivery scheduler ("main.py schedule"): each profile's delivery_time and
+    # timezone, with report_delivery_time as the fallback for invalid times
+    schedule_concurrency: int = 4  # Reports generated at once
+    schedule_default_duration_s: float = 300  # Assumed report duration until runs are measured
+    schedule_lead_margin: float = 0.25  # Headroom on top of the measured p90 duration
+    schedule_horizon_hours: float = 24
+    schedule_replan_minutes: float = 15  # Reload profiles this often
+
+    # HTTP connection pool for article fetches
+    http_pool_hosts: int = 50  # Hosts with pooled connections
+    http_pool_size: int = 10  # Connections kept per host
+
+    # Worker threads for blocking calls (LLM, search, fetch, storage) made
+    # from async steps; Python's own default is min(32, CPUs + 4)
+    blocking_workers: int = 32
+
+    # Service mode ("main.py serve")
+    service_host: str = "127.0.0.1"
+    service_port: int = 8080
+    service_concurrency: int = 4  # Jobs run at once
+    service_queue_size: int = 100  # Queued jobs before new ones are refused (503)
+    service_job_history: int = 1000  # Finished jobs kept for GET /jobs/<job_id>
+    service_shutdown_timeout: float = 300  # Seconds to drain jobs on shutdown
 
     # Model Configuration
     gemini_model: str = "models/gemini-2.5-flash"  # Latest Gemini model
     temperature: float = 0.7
     max_tokens: int = 8192
 
+    # LLM backend: "live" (Gemini), "record" (live, saving each prompt/response),
+    # "replay" (saved responses only) or "synthetic" (generated, schema-valid responses)
+    llm_backend: str = "live"
+    llm_simulated_latency: str = "recorded"  # recorded, fixed:S, uniform:A:B or lognormal:MEDIAN:SIGMA
+    llm_simulated_error_rate: float = 0.0  # Share of replay/synthetic calls failing with a 503
+    llm_simulated_rate_limit_rate: float = 0.0  # Share failing with a 429
+    llm_simulated_seed: Optional[int] = None
+
+    # Usage accounting (USD per million tokens; output includes thinking tokens)
+    usage_tracking_enabled: bool = True
+    llm_input_cost_per_million: float = 0.30
+    llm_output_cost_per_million: float = 2.50
+
+    # Prompt budgets (estimated input tokens per LLM call)
+    prompt_token_budget: int = 8000
+    fetch_prompt_token_budget: int = 3000
+    writer_prompt_token_budget: int = 32000
+    search_notes_token_budget: int = 400  # Profile analysis included in each search query prompt
+
+    # Extractive condensation of fetched articles (characters kept)
+    condense_target_chars: int = 2500
+
     # Data directories
     data_dir: Path = Path(__file__).parent.parent / "data"
     user_profiles_dir: Path = data_dir / "user_profiles"
     history_dir: Path = data_dir / "history"
+    cache_dir: Path = data_dir / "cache"
+    database_path: Path = data_dir / "newspulse.db"
+    llm_recordings_dir: Path = data_dir / "llm_recordings"
+    reports_dir: Path = data_dir / "reports"  # Profiling artifacts ("generate --profile")
+    profile_sample_interval_ms: float = 10
+    metrics_path: Optional[Path] = data_dir / "logs" / "metrics.prom"  # Written at the end of "main.py batch"
+
+    # Indent JSON written to disk (profiles, caches); compact by default
+    pretty_json: bool = False
+
+    # Profile storage: "json" (one file per user) or "sqlite" (database_path)
+    profile_backend: str = "json"
+    profile_update_retries: int = 5  # Re-applies after an optimistic-concurrency conflict
+
+    # Caching
+    verification_cache_ttl_hours: float = 72
+    historical_insights_enabled: bool = True
+    historical_insights_refresh_hours: float = 24
+
+    # Research pre-warming ("main.py prewarm"): per-topic search, fetch and analysis
+    # reused by every report until it expires
+    research_cache_enabled: bool = True
+    research_cache_ttl_hours: float = 6
+    prewarm_max_results_per_topic: int = 5
+    prewarm_concurrency: int = 4
+    prewarm_lead_minutes: float = 60  # Scheduler pre-warms topics this long before their runs
+
+    # Seen-URL index: switch from an in-memory set to a Bloom filter above this size
+    seen_url_bloom_threshold: int = 50000
+    seen_url_bloom_error_rate: float = 0.001
 
     class Config:
         env_file = ".env"
@@ -48,6 +134,7 @@ class Settings(BaseSettings):
         # Ensure data directories exist
         self.user_profiles_dir.mkdir(parents=True, exist_ok=True)
         self.history_dir.mkdir(parents=True, exist_ok=True)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
 
     def validate_api_keys(self):
         """Validate that required API keys are set"""
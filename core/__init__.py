@@ -1,5 +1,15 @@
-from .loop_agent import VerificationLoop
-from .orchestrator import NewsPulseOrchestrator
 from .utils import get_genai_client, generate_content
 
 __all__ = ["VerificationLoop", "NewsPulseOrchestrator", "get_genai_client", "generate_content"]
+
+
+def __getattr__(name):
+    # Imported lazily: the orchestrator and loop import the agents, which
+    # themselves import core.utils, so eager imports here form a cycle
+    if name == "VerificationLoop":
+        from .loop_agent import VerificationLoop
+        return VerificationLoop
+    if name == "NewsPulseOrchestrator":
+        from .orchestrator import NewsPulseOrchestrator
+        return NewsPulseOrchestrator
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,128 @@
+"""
+Extractive condensation of fetched article text
+Scores sentences locally with TF-IDF so only the passages that matter reach the LLM
+"""
+import re
+from typing import List, Tuple
+
+import numpy as np
+
+from config import settings
+from core.prompt_budget import score_sentence, split_sentences
+
+
+_WORD = re.compile(r"[a-z0-9][a-z0-9'\-]*")
+
+_STOPWORDS = frozenset("""
+a about above after again against all also am an and any are as at be because been
+before being below between both but by can could did do does doing down during each
+few for from further had has have having he her here hers him his how i if in into is
+it its itself just me more most my no nor not now of off on once only or other our
+ours out over own said same she should so some such than that the their theirs them
+then there these they this those through to too under until up very was we were what
+when where which while who whom why will with would you your
+""".split())
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    Lower-case content words of a text
+
+    Args:
+        text: Text to tokenize
+
+    Returns:
+        List of tokens with stopwords removed
+    """
+    return [
+        word for word in _WORD.findall(text.lower())
+        if len(word) > 1 and word not in _STOPWORDS
+    ]
+
+
+def _tfidf_matrix(
+    documents: List[List[str]], vocabulary: dict
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Build an L2-normalised TF-IDF matrix and the IDF vector"""
+    counts = np.zeros((len(documents), len(vocabulary)), dtype=np.float32)
+    rows = [i for i, doc in enumerate(documents) for _ in doc]
+    cols = [vocabulary[token] for doc in documents for token in doc]
+    np.add.at(counts, (rows, cols), 1.0)
+
+    doc_freq = np.count_nonzero(counts, axis=0)
+    idf = np.log((1.0 + len(documents)) / (1.0 + doc_freq)) + 1.0
+
+    tfidf = np.log1p(counts) * idf
+    norms = np.linalg.norm(tfidf, axis=1, keepdims=True)
+    return tfidf / np.maximum(norms, 1e-9), idf
+
+
+def condense_text(
+    text: str,
+    title: str = "",
+    topics: List[str] = None,
+    target_chars: int = None,
+) -> Tuple[str, float]:
+    """
+    Condense article text to its most relevant sentences
+
+    Each sentence is scored by TF-IDF cosine similarity to the article
+    title and the user's topics, plus its similarity to the article as a
+    whole, plus a bonus for quotes and figures (citation material) and a
+    penalty for site boilerplate. The best sentences are kept, in their
+    original order, until the target length is reached. Repeated
+    sentences are kept at most once.
+
+    Args:
+        text: Extracted article text
+        title: Article title
+        topics: User topics to score against
+        target_chars: Approximate length of the condensed text (defaults to settings)
+
+    Returns:
+        Tuple of (condensed_text, compression_ratio)
+    """
+    target_chars = target_chars or settings.condense_target_chars
+
+    if len(text) <= target_chars:
+        return text, 1.0
+
+    # Repeated lines (share bars, related-link lists) are kept once
+    sentences = list(dict.fromkeys(split_sentences(text)))
+    if not sentences:
+        # Whitespace only: nothing to keep
+        return "", 0.0
+    documents = [tokenize(sentence) for sentence in sentences]
+    query = tokenize(" ".join([title] + list(topics or [])))
+
+    vocabulary = {}
+    for token in (t for doc in documents + [query] for t in doc):
+        vocabulary.setdefault(token, len(vocabulary))
+
+    if not vocabulary:
+        condensed = text[:target_chars]
+        return condensed, len(condensed) / len(text)
+
+    matrix, idf = _tfidf_matrix(documents, vocabulary)
+
+    # Query vector shares the document IDF weights
+    query_vector = np.zeros(len(vocabulary), dtype=np.float32)
+    for token in query:
+        query_vector[vocabulary[token]] += 1.0
+    query_vector = np.log1p(query_vector) * idf
+    query_vector /= max(np.linalg.norm(query_vector), 1e-9)
+
+    centroid = matrix.mean(axis=0)
+    centroid /= max(np.linalg.norm(centroid), 1e-9)
+
+    heuristics = np.array([score_sentence(s) for s in sentences], dtype=np.float32)
+    scores = matrix @ query_vector + 0.5 * (matrix @ centroid) + 0.25 * heuristics
+
+    lengths = np.array([len(s) + 1 for s in sentences])
+    order = np.argsort(-scores, kind="stable")
+    within_budget = np.cumsum(lengths[order]) <= target_chars
+    within_budget[0] = True  # Always keep the best sentence
+    keep = np.sort(order[within_budget])
+
+    condensed = "\n".join(sentences[i] for i in keep)
+    return condensed, len(condensed) / len(text)
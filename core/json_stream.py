@@ -0,0 +1,368 @@
+"""
+Incremental, fault-tolerant JSON parsing for streamed model output
+Salvages every complete article when the Writer Agent's JSON is truncated or malformed
+"""
+import json
+from typing import List, Optional
+
+
+_VALID_ESCAPES = set('"\\/bfnrt')
+_HEX_DIGITS = set("0123456789abcdefABCDEF")
+_CONTROL_ESCAPES = {"\n": "\\n", "\r": "\\r", "\t": "\\t", "\b": "\\b", "\f": "\\f"}
+_PYTHON_LITERALS = {"True": "true", "False": "false", "None": "null"}
+_WHITESPACE = " \t\r\n"
+
+
+class _Frame:
+    """An open JSON container while scanning"""
+
+    def __init__(self, kind: str, start: int):
+        self.kind = kind  # "{" or "["
+        self.start = start  # Output index of the opening bracket
+        self.member_start = start + 1  # Output index where the current member begins
+        self.state = self.initial_state
+        self.members = 0  # Completed members so far
+        self.key: Optional[str] = None  # Key of the member being parsed (objects only)
+        self.literal_start: Optional[int] = None
+
+    @property
+    def initial_state(self) -> str:
+        return "key" if self.kind == "{" else "value"
+
+    @property
+    def closer(self) -> str:
+        return "}" if self.kind == "{" else "]"
+
+
+class StreamingJSONParser:
+    """
+    Incremental, fault-tolerant parser for a streamed JSON document
+
+    Text is repaired as it arrives:
+    - Raw newlines and control characters inside strings are escaped
+    - Stray quotes inside strings are escaped, invalid escapes are doubled
+    - Trailing and duplicate commas are dropped, missing commas inserted
+    - A truncated tail is cut back to the last complete member and closed
+
+    Every object that closes directly inside the ``array_key`` array of the
+    root object is emitted as soon as its closing brace arrives, so callers
+    can validate articles while the model is still generating.
+
+    Usage:
+        parser = StreamingJSONParser("articles")
+        for chunk in stream:
+            for article in parser.feed(chunk):
+                ...
+        report_data = parser.finish()
+    """
+
+    def __init__(self, array_key: str = "articles"):
+        self.array_key = array_key
+        self.items: List[dict] = []
+
+        self._buffer = ""
+        self._pos = 0
+        self._out: List[str] = []
+        self._stack: List[_Frame] = []
+        self._started = False
+        self._done = False
+
+        self._in_string = False
+        self._string_is_key = False
+        self._escape = False
+        self._key_chars: List[str] = []
+
+    @property
+    def text(self) -> str:
+        """Repaired JSON text produced so far"""
+        return "".join(self._out)
+
+    def feed(self, chunk: str) -> List[dict]:
+        """
+        Feed the next chunk of model output
+
+        Args:
+            chunk: Raw text chunk from the model stream
+
+        Returns:
+            Array items that were completed by this chunk
+        """
+        emitted = len(self.items)
+        self._buffer += chunk
+        self._scan(final=False)
+        return self.items[emitted:]
+
+    def finish(self) -> dict:
+        """
+        Flush the stream, repairing a truncated tail
+
+        Returns:
+            The parsed (and repaired) root object
+
+        Raises:
+            ValueError: If no usable JSON object could be recovered
+        """
+        self._scan(final=True)
+
+        if not self._started:
+            raise ValueError("No JSON object found in model output")
+
+        if not self._done:
+            if self._in_string:
+                # A string cut off mid-way is never trusted
+                self._in_string = False
+                self._escape = False
+                self._rollback_member(self._stack[-1])
+            while self._stack:
+                self._close()
+
+        try:
+            data = json.loads(self.text)
+        except json.JSONDecodeError as e:
+            if self.items:
+                return {self.array_key: list(self.items)}
+            raise ValueError(f"Could not repair model JSON: {e}") from e
+
+        if not isinstance(data, dict):
+            return {self.array_key: data if isinstance(data, list) else []}
+        return data
+
+    # ----- Scanning -----
+
+    def _scan(self, final: bool):
+        buf = self._buffer
+        while self._pos < len(buf) and not self._done:
+            ch = buf[self._pos]
+
+            if not self._started:
+                # Skip prose and markdown fences before the document
+                if ch in "{[":
+                    self._started = True
+                    self._open(ch)
+                self._pos += 1
+                continue
+
+            if self._in_string:
+                if not self._string_char(ch, final):
+                    break  # Need more input to decide
+            else:
+                self._structural_char(ch)
+            self._pos += 1
+
+    def _peek(self, index: int) -> Optional[str]:
+        """Next non-whitespace character at or after index, if any"""
+        buf = self._buffer
+        while index < len(buf):
+            if buf[index] not in _WHITESPACE:
+                return buf[index]
+            index += 1
+        return None
+
+    def _string_char(self, ch: str, final: bool) -> bool:
+        out = self._out
+
+        if self._escape:
+            if ch == "u":
+                digits = self._buffer[self._pos + 1:self._pos + 5]
+                if len(digits) < 4 and not final:
+                    return False
+                if len(digits) == 4 and all(d in _HEX_DIGITS for d in digits):
+                    out.append("u")
+                else:
+                    out.append("\\u")
+            elif ch in _VALID_ESCAPES:
+                out.append(ch)
+            else:
+                out.append("\\" + ch)
+            self._escape = False
+            if self._string_is_key:
+                self._key_chars.append(ch)
+            return True
+
+        if ch == "\\":
+            self._escape = True
+            out.append("\\")
+            return True
+
+        if ch == '"':
+            nxt = self._peek(self._pos + 1)
+            if nxt is None and not final:
+                return False
+            terminators = ":" if self._string_is_key else ',}]"'
+            if nxt is None or nxt in terminators:
+                out.append('"')
+                self._in_string = False
+                self._end_string()
+            else:
+                # Unescaped quote inside the string
+                out.append('\\"')
+                if self._string_is_key:
+                    self._key_chars.append(ch)
+            return True
+
+        if ch < " ":
+            out.append(_CONTROL_ESCAPES.get(ch, "\\u%04x" % ord(ch)))
+        else:
+            out.append(ch)
+        if self._string_is_key:
+            self._key_chars.append(ch)
+        return True
+
+    def _structural_char(self, ch: str):
+        frame = self._stack[-1]
+
+        if frame.state == "literal":
+            if ch in _WHITESPACE or ch in ',}]:"':
+                self._end_literal(frame)
+            else:
+                self._out.append(ch)
+                return
+
+        if ch in _WHITESPACE:
+            self._out.append(ch)
+        elif ch == '"':
+            if frame.state == "comma":
+                self._next_member(frame)
+            if frame.state not in ("key", "value"):
+                return  # Stray quote where no string can start
+            self._in_string = True
+            self._string_is_key = frame.state == "key"
+            self._key_chars = []
+            frame.state = "string"
+            self._out.append('"')
+        elif ch in "{[":
+            if frame.state == "comma" and frame.kind == "[":
+                self._next_member(frame)
+            if frame.state != "value":
+                return
+            frame.state = "nested"
+            self._open(ch)
+        elif ch in "}]":
+            self._close()
+        elif ch == ":":
+            if frame.kind == "{" and frame.state == "colon":
+                self._out.append(ch)
+                frame.state = "value"
+        elif ch == ",":
+            if frame.state == "comma":
+                self._out.append(ch)
+                self._next_member(frame, emit_comma=False)
+        else:
+            if frame.state == "comma" and frame.kind == "[":
+                self._next_member(frame)
+            if frame.state != "value":
+                return  # Garbage outside any value
+            frame.state = "literal"
+            frame.literal_start = len(self._out)
+            self._out.append(ch)
+
+    # ----- Structure bookkeeping -----
+
+    def _open(self, ch: str):
+        self._out.append(ch)
+        self._stack.append(_Frame(ch, len(self._out) - 1))
+
+    def _close(self):
+        frame = self._stack[-1]
+
+        if frame.state == "literal":
+            self._end_literal(frame)
+        if frame.state in ("colon", "value") and frame.kind == "{":
+            # Key without a value
+            self._rollback_member(frame)
+        elif frame.state in ("key", "value"):
+            # Nothing after the last comma: drop the trailing comma
+            self._strip_trailing_comma()
+
+        self._out.append(frame.closer)
+
+        if frame.members and self._is_array_item(frame):
+            raw = "".join(self._out[frame.start:])
+            try:
+                item = json.loads(raw)
+            except json.JSONDecodeError:
+                item = None
+            if isinstance(item, dict):
+                self.items.append(item)
+
+        self._stack.pop()
+        if not self._stack:
+            self._done = True
+        else:
+            self._value_done(self._stack[-1])
+
+    def _is_array_item(self, frame: _Frame) -> bool:
+        stack = self._stack
+        return (
+            frame.kind == "{"
+            and len(stack) == 3
+            and stack[0].kind == "{"
+            and stack[0].key == self.array_key
+            and stack[1].kind == "["
+        )
+
+    def _next_member(self, frame: _Frame, emit_comma: bool = True):
+        if emit_comma:
+            self._out.append(",")
+        frame.member_start = len(self._out)
+        frame.state = frame.initial_state
+        frame.key = None
+
+    def _end_string(self):
+        frame = self._stack[-1]
+        if self._string_is_key:
+            frame.key = "".join(self._key_chars)
+            frame.state = "colon"
+        else:
+            self._value_done(frame)
+
+    def _end_literal(self, frame: _Frame):
+        literal = "".join(self._out[frame.literal_start:])
+        if literal in _PYTHON_LITERALS:
+            del self._out[frame.literal_start:]
+            literal = _PYTHON_LITERALS[literal]
+            self._out.append(literal)
+        try:
+            json.loads(literal)
+        except json.JSONDecodeError:
+            self._rollback_member(frame)
+            return
+        self._value_done(frame)
+
+    def _value_done(self, frame: _Frame):
+        frame.state = "comma"
+        frame.members += 1
+
+    def _rollback_member(self, frame: _Frame):
+        """Discard the incomplete member the frame is currently parsing"""
+        del self._out[frame.member_start:]
+        self._strip_trailing_comma()
+        frame.key = None
+        frame.state = "comma" if frame.members else frame.initial_state
+        if frame.members:
+            frame.member_start = len(self._out)
+
+    def _strip_trailing_comma(self):
+        out = self._out
+        end = len(out)
+        while end and out[end - 1] in _WHITESPACE:
+            end -= 1
+        if end and out[end - 1] == ",":
+            del out[end - 1:]
+
+
+def parse_json_lenient(text: str, array_key: str = "articles") -> dict:
+    """
+    Parse possibly malformed or truncated model JSON in one call
+
+    Args:
+        text: Raw model output (may include markdown fences)
+        array_key: Root key whose array items should be salvaged
+
+    Returns:
+        Parsed root object
+    """
+    parser = StreamingJSONParser(array_key)
+    parser.feed(text)
+    return parser.finish()
+
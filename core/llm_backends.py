@@ -0,0 +1,367 @@
+"""
+LLM backends
+Record, replay and synthetic stand-ins for the Gemini client, for
+deterministic load tests and for reproducing production runs offline
+"""
+import hashlib
+import json
+import math
+import random
+import re
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Callable, Iterator, List, Optional
+
+from google.genai import errors
+
+from config import settings
+from models.atomic_io import atomic_write
+from models.serialization import dumps, loads
+from core.prompt_budget import estimate_tokens
+
+
+BACKENDS = ("live", "record", "replay", "synthetic")
+
+# Matches the "You are the <name> Agent" line each agent's instruction starts with
+_AGENT_PATTERN = re.compile(r"You are the (?:Executive )?([\w ]+?) Agent")
+_WRITER_ARTICLE = re.compile(r"Article \d+:\nTitle: (.*)\nSource: (.*)\nURL: (.*)")
+
+# Characters per simulated stream chunk
+_CHUNK_CHARS = 200
+
+
+class RecordingNotFoundError(LookupError):
+    """Raised in replay mode when a prompt was never recorded"""
+
+
+class LatencyModel:
+    """
+    Simulated latency distribution
+
+    Specs are ``fixed:S``, ``uniform:A:B`` or ``lognormal:MEDIAN:SIGMA``,
+    in seconds, or ``recorded`` to reuse the latency saved with a
+    recording. Samples are multiplied by ``scale``.
+    """
+
+    def __init__(self, spec: str, scale: float = 1.0, seed: Optional[int] = None):
+        kind, *params = spec.split(":")
+        if kind not in ("recorded", "fixed", "uniform", "lognormal"):
+            raise ValueError(f"Unknown latency distribution: {spec}")
+        self.spec = spec
+        self.kind = kind
+        self.params = [float(p) for p in params]
+        self.scale = scale
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def sample(self, recorded: float = 0.0) -> float:
+        """
+        One latency sample in (scaled) seconds
+
+        Args:
+            recorded: Latency of the recording, used by the ``recorded`` spec
+        """
+        with self._lock:
+            if self.kind == "recorded":
+                value = recorded
+            elif self.kind == "fixed":
+                value = self.params[0]
+            elif self.kind == "uniform":
+                value = self._random.uniform(*self.params)
+            else:
+                median, sigma = self.params
+                value = self._random.lognormvariate(math.log(median), sigma)
+        return value * self.scale
+
+    def sleep(self, recorded: float = 0.0) -> float:
+        """Sleep for one sample; returns the time slept"""
+        delay = self.sample(recorded)
+        time.sleep(delay)
+        return delay
+
+
+def prompt_key(model: str, contents: str) -> str:
+    """
+    Recording key for a request
+
+    Only the model and prompt text are hashed, so sampling settings (such
+    as speculative candidates' temperatures) replay the same response.
+    """
+    return hashlib.sha256(f"{model}\n{contents}".encode("utf-8")).hexdigest()
+
+
+def calling_agent(contents: str) -> Optional[str]:
+    """Name of the agent whose instruction starts the prompt, e.g. "Writer" """
+    match = _AGENT_PATTERN.search(contents[:500])
+    return match.group(1) if match else None
+
+
+def make_response(text: str, usage: Optional[dict] = None) -> SimpleNamespace:
+    """A response shaped like the genai client's (``text``, ``usage_metadata``)"""
+    return SimpleNamespace(
+        text=text,
+        usage_metadata=SimpleNamespace(**usage) if usage else None,
+    )
+
+
+def estimate_usage(contents: str, text: str) -> dict:
+    prompt_tokens = estimate_tokens(contents)
+    output_tokens = estimate_tokens(text)
+    return {
+        "prompt_token_count": prompt_tokens,
+        "candidates_token_count": output_tokens,
+        "total_token_count": prompt_tokens + output_tokens,
+    }
+
+
+class _SimulatedModels:
+    """
+    Shared behaviour of the offline backends
+
+    Subclasses provide ``_lookup(model, contents)`` returning the response
+    text, its usage and the recorded latency; this class adds simulated
+    latency, failures and streaming.
+    """
+
+    def __init__(
+        self,
+        latency: LatencyModel,
+        error_rate: float = 0.0,
+        rate_limit_rate: float = 0.0,
+        seed: Optional[int] = None,
+    ):
+        self.models = self
+        self.latency = latency
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.calls = 0
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def generate_content(self, model: str, contents: str, config=None):
+        self._count()
+        text, usage, recorded_latency = self._lookup(model, contents)
+        self.latency.sleep(recorded_latency)
+        self._maybe_fail()
+        return make_response(text, usage)
+
+    def generate_content_stream(self, model: str, contents: str, config=None):
+        self._count()
+        text, usage, recorded_latency = self._lookup(model, contents)
+        chunks = [text[i:i + _CHUNK_CHARS] for i in range(0, len(text), _CHUNK_CHARS)] or [""]
+
+        # About a third of the latency is time to first token
+        delay = self.latency.sample(recorded_latency)
+        time.sleep(delay * 0.3)
+        self._maybe_fail()
+        for i, chunk in enumerate(chunks):
+            if i:
+                time.sleep(delay * 0.7 / len(chunks))
+            yield make_response(chunk, usage if i == len(chunks) - 1 else None)
+
+    def _count(self):
+        with self._lock:
+            self.calls += 1
+
+    def _maybe_fail(self):
+        with self._lock:
+            roll = self._random.random()
+        if roll < self.rate_limit_rate:
+            raise errors.ClientError(429, {"error": {
+                "code": 429,
+                "message": "Simulated rate limit",
+                "status": "RESOURCE_EXHAUSTED",
+            }})
+        if roll < self.rate_limit_rate + self.error_rate:
+            raise errors.ServerError(503, {"error": {
+                "code": 503,
+                "message": "Simulated server error",
+                "status": "UNAVAILABLE",
+            }})
+
+    def _lookup(self, model: str, contents: str):
+        raise NotImplementedError
+
+
+class ReplayBackend(_SimulatedModels):
+    """Serves responses saved by RecordingBackend, keyed by prompt hash"""
+
+    def __init__(self, recordings_dir: Path, latency: LatencyModel, **kwargs):
+        super().__init__(latency, **kwargs)
+        self.recordings_dir = Path(recordings_dir)
+
+    def _lookup(self, model: str, contents: str):
+        key = prompt_key(model, contents)
+        path = self.recordings_dir / f"{key}.json"
+        try:
+            recording = loads(path.read_bytes())
+        except FileNotFoundError:
+            raise RecordingNotFoundError(
+                f"No recorded response for prompt {key[:12]} in {self.recordings_dir}; "
+                "record one with LLM_BACKEND=record"
+            ) from None
+        return recording["text"], recording.get("usage"), recording.get("latency_s", 0.0)
+
+
+class SyntheticBackend(_SimulatedModels):
+    """
+    Generates responses locally
+
+    The Writer and Verification agents get schema-valid JSON built from
+    the articles in the prompt; other agents get short placeholder text.
+    """
+
+    def _lookup(self, model: str, contents: str):
+        agent = calling_agent(contents)
+        if agent == "Writer":
+            text = json.dumps(synthetic_report(contents))
+        elif agent == "Verification":
+            text = json.dumps({
+                "is_verified": True,
+                "issues_found": [],
+                "missing_citations": [],
+                "feedback": "All claims are cited.",
+                "retry_suggested": False,
+            })
+        elif agent == "Search":
+            topic = re.search(r"Topic: (.*)", contents)
+            text = f"{topic.group(1) if topic else 'business'} news this week"
+        else:
+            text = (
+                f"Synthetic {agent or 'model'} response. "
+                "Key facts, quotes and implications would appear here."
+            )
+        return text, estimate_usage(contents, text), 0.0
+
+
+def synthetic_report(contents: str) -> dict:
+    """A Writer Agent report citing the articles listed in the prompt"""
+    articles = []
+    for i, (title, source, url) in enumerate(_WRITER_ARTICLE.findall(contents)):
+        articles.append({
+            "title": title,
+            "summary": f"{title}. This development matters for the reader's priorities.",
+            "key_insights": ["Review exposure to this development", "Monitor follow-up reports"],
+            "citations": [{
+                "claim": title,
+                "source_url": url,
+                "source_title": title,
+                "quote": title,
+            }],
+            "priority": ("HIGH", "MEDIUM", "LOW")[min(i, 2)],
+            "relevance_reason": "Matches the reader's topics of interest.",
+            "url": url,
+            "source": source,
+        })
+    return {
+        "executive_summary": f"This report covers {len(articles)} developments.",
+        "articles": articles,
+    }
+
+
+class RecordingBackend:
+    """
+    Calls the live client and saves every prompt/response pair
+
+    Recordings are written to ``recordings_dir/<prompt hash>.json`` for
+    ReplayBackend; a later call with the same prompt overwrites the
+    earlier recording.
+    """
+
+    def __init__(self, client_factory: Callable, recordings_dir: Path):
+        self.models = self
+        self.client_factory = client_factory
+        self.recordings_dir = Path(recordings_dir)
+
+    def generate_content(self, model: str, contents: str, config=None):
+        start = time.perf_counter()
+        response = self.client_factory().models.generate_content(
+            model=model, contents=contents, config=config
+        )
+        self._save(model, contents, response.text, response, time.perf_counter() - start)
+        return response
+
+    def generate_content_stream(self, model: str, contents: str, config=None):
+        start = time.perf_counter()
+        stream = self.client_factory().models.generate_content_stream(
+            model=model, contents=contents, config=config
+        )
+        parts: List[str] = []
+        last = None
+        for chunk in stream:
+            parts.append(chunk.text or "")
+            if chunk.usage_metadata is not None:
+                last = chunk
+            yield chunk
+        # Only complete streams are saved; a truncated one would replay as truncated
+        self._save(model, contents, "".join(parts), last, time.perf_counter() - start)
+
+    def _save(self, model: str, contents: str, text: str, response, latency_s: float):
+        usage = getattr(response, "usage_metadata", None)
+        key = prompt_key(model, contents)
+        self.recordings_dir.mkdir(parents=True, exist_ok=True)
+        atomic_write(self.recordings_dir / f"{key}.json", dumps({
+            "key": key,
+            "model": model,
+            "agent": calling_agent(contents),
+            "prompt": contents,
+            "text": text,
+            "usage": {
+                "prompt_token_count": usage.prompt_token_count,
+                "candidates_token_count": usage.candidates_token_count,
+                "total_token_count": usage.total_token_count,
+            } if usage else None,
+            "latency_s": round(latency_s, 3),
+            "recorded_at": datetime.utcnow().isoformat(),
+        }), durable=False)
+
+
+_backends = {}
+_backends_lock = threading.Lock()
+
+
+def get_backend(name: str, live_factory: Callable):
+    """
+    Client-like object for a backend name
+
+    Replay and synthetic backends are shared per process, so their
+    simulated failures follow one seeded sequence.
+
+    Args:
+        name: One of BACKENDS
+        live_factory: Returns a live genai client
+
+    Returns:
+        Object with ``models.generate_content`` and ``models.generate_content_stream``
+    """
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown LLM backend: {name} (expected one of {', '.join(BACKENDS)})")
+    if name == "live":
+        return live_factory()
+    if name == "record":
+        return RecordingBackend(live_factory, settings.llm_recordings_dir)
+
+    config = (
+        name,
+        settings.llm_recordings_dir,
+        settings.llm_simulated_latency,
+        settings.llm_simulated_error_rate,
+        settings.llm_simulated_rate_limit_rate,
+        settings.llm_simulated_seed,
+    )
+    with _backends_lock:
+        if config not in _backends:
+            options = dict(
+                latency=LatencyModel(settings.llm_simulated_latency, seed=settings.llm_simulated_seed),
+                error_rate=settings.llm_simulated_error_rate,
+                rate_limit_rate=settings.llm_simulated_rate_limit_rate,
+                seed=settings.llm_simulated_seed,
+            )
+            if name == "replay":
+                _backends[config] = ReplayBackend(settings.llm_recordings_dir, **options)
+            else:
+                _backends[config] = SyntheticBackend(**options)
+        return _backends[config]
@@ -3,13 +3,16 @@ Verification Loop Agent
 Implements the self-correction loop where the Verification Agent
 audits the Writer Agent and forces retries if quality standards aren't met
 """
-from typing import Tuple
+from typing import List, Tuple
+import asyncio
 import logging
 
 from config import settings
 from models.schemas import NewsReport
 from agents.writer_agent import run_writer_agent
 from agents.verification_agent import run_verification_agent, check_report_verified
+from core.verification_cache import VerificationCache
+from core.tracing import span
 
 
 class VerificationLoop:
@@ -20,14 +23,24 @@ class VerificationLoop:
     can audit itself and retry when quality standards aren't met.
     """
 
-    def __init__(self, max_retries: int = None):
+    def __init__(
+        self,
+        max_retries: int = None,
+        candidates: int = None,
+        token_ceiling: int = None,
+    ):
         """
         Initialize the verification loop
 
         Args:
             max_retries: Maximum retry attempts (defaults to settings)
+            candidates: Writer candidates to run speculatively (defaults to settings)
+            token_ceiling: Output tokens shared by all candidates (defaults to settings)
         """
         self.max_retries = max_retries or settings.verification_max_retries
+        self.candidates = max(candidates or settings.speculative_candidates, 1)
+        self.token_ceiling = token_ceiling or settings.speculative_token_ceiling
+        self.cache = VerificationCache()
         self.logger = logging.getLogger("newspulse")
 
     async def run(
@@ -53,49 +66,182 @@ class VerificationLoop:
         Returns:
             Tuple of (NewsReport, success_flag)
         """
+        if self.candidates > 1:
+            return await self.run_speculative(
+                processed_articles=processed_articles,
+                user_context=user_context,
+                max_articles=max_articles,
+            )
+
         retry_count = 0
         feedback_context = ""
 
         while retry_count <= self.max_retries:
-            self.logger.info(
-                f"Verification loop attempt {retry_count + 1}/{self.max_retries + 1}"
-            )
+            with span(
+                "verification.attempt", attempt=retry_count + 1
+            ) as attempt_span:
+                self.logger.info(
+                    f"Verification loop attempt {retry_count + 1}/{self.max_retries + 1}"
+                )
 
-            try:
-                # Phase 1: Writer Agent creates report
-                self.logger.info("Writer Agent: Drafting report...")
-                if feedback_context:
-                    self.logger.info(f"Applying feedback: {feedback_context}")
+                try:
+                    # Phase 1: Writer Agent creates report
+                    self.logger.info("Writer Agent: Drafting report...")
+                    if feedback_context:
+                        self.logger.info(f"Applying feedback: {feedback_context}")
 
-                # Add feedback to user context if retrying
-                if feedback_context:
-                    user_context["writer_feedback"] = feedback_context
+                    # Add feedback to user context if retrying
+                    if feedback_context:
+                        user_context["writer_feedback"] = feedback_context
 
-                report = await run_writer_agent(
-                    processed_articles=processed_articles,
-                    user_context=user_context,
-                    max_articles=max_articles,
+                    report = await run_writer_agent(
+                        processed_articles=processed_articles,
+                        user_context=user_context,
+                        max_articles=max_articles,
+                    )
+
+                    # Phase 2: Verification Agent audits
+                    self.logger.info("Verification Agent: Auditing report...")
+                    verification_results = await run_verification_agent(
+                        report, cache=self.cache
+                    )
+
+                except (ValueError, Exception) as e:
+                    # Writer agent failed (e.g., JSON parsing error, validation error)
+                    self.logger.warning(f"✗ Writer Agent error: {str(e)}")
+                    attempt_span.set_attribute("outcome", "error")
+
+                    if retry_count >= self.max_retries:
+                        self.logger.error(
+                            f"Max retries ({self.max_retries}) reached after Writer Agent errors."
+                        )
+                        raise
+
+                    # Prepare feedback for retry
+                    feedback_context = error_feedback(e)
+                    retry_count += 1
+                    continue
+
+                # Phase 3: Check if verified
+                is_verified, feedback_summary = check_report_verified(
+                    verification_results
                 )
 
-                # Phase 2: Verification Agent audits
-                self.logger.info("Verification Agent: Auditing report...")
-                verification_results = await run_verification_agent(report)
+                attempt_span.set_attribute("outcome", "verified" if is_verified else "rejected")
+
+                if is_verified:
+                    self.logger.info("✓ Report verified successfully!")
+                    return report, True
 
-            except (ValueError, Exception) as e:
-                # Writer agent failed (e.g., JSON parsing error, validation error)
-                self.logger.warning(f"✗ Writer Agent error: {str(e)}")
+                # Phase 4: Not verified, prepare for retry
+                self.logger.warning(f"✗ Verification failed. Issues found:")
+                self.logger.warning(feedback_summary)
 
                 if retry_count >= self.max_retries:
                     self.logger.error(
-                        f"Max retries ({self.max_retries}) reached after Writer Agent errors."
+                        f"Max retries ({self.max_retries}) reached. Returning unverified report."
                     )
-                    raise
+                    return report, False
+
+                # Prepare feedback for next iteration
+                feedback_context = rejection_feedback(feedback_summary)
+
+                retry_count += 1
+
+        # Should not reach here, but just in case
+        return report, False
+
+    async def run_speculative(
+        self,
+        processed_articles: list,
+        user_context: dict,
+        max_articles: int = 10,
+    ) -> Tuple[NewsReport, bool]:
+        """
+        Run the verification loop speculatively
+
+        Launches several Writer candidates at once with different sampling
+        temperatures, verifies each as soon as it finishes, and returns the
+        first one that passes. The remaining candidates are cancelled,
+        which closes their model streams. Trades tokens for tail latency:
+        the worst case is one writer plus one verification instead of
+        (max_retries + 1) of each.
+
+        Args:
+            processed_articles: Articles from Fetch Agent
+            user_context: User context for personalization
+            max_articles: Max articles in report
 
-                # Prepare feedback for retry
-                feedback_context = f"""
+        Returns:
+            Tuple of (NewsReport, success_flag)
+        """
+        temperatures = candidate_temperatures(self.candidates)
+        max_tokens = None
+        if self.token_ceiling:
+            max_tokens = min(self.token_ceiling // self.candidates, settings.max_tokens)
+
+        self.logger.info(
+            f"Speculative verification: {self.candidates} candidates "
+            f"at temperatures {', '.join(f'{t:.2f}' for t in temperatures)}"
+        )
+
+        async def attempt(temperature: float) -> Tuple[NewsReport, bool, str]:
+            with span("verification.candidate", temperature=temperature) as candidate_span:
+                report = await run_writer_agent(
+                    processed_articles=processed_articles,
+                    user_context=user_context,
+                    max_articles=max_articles,
+                    temperature=temperature,
+                    max_tokens=max_tokens,
+                )
+                verification_results = await run_verification_agent(
+                    report, cache=self.cache
+                )
+                is_verified, feedback_summary = check_report_verified(verification_results)
+                candidate_span.set_attribute(
+                    "outcome", "verified" if is_verified else "rejected"
+                )
+                return report, is_verified, feedback_summary
+
+        tasks = [asyncio.create_task(attempt(t)) for t in temperatures]
+        fallback = None
+        last_error = None
+
+        try:
+            for finished in asyncio.as_completed(tasks):
+                try:
+                    report, is_verified, feedback_summary = await finished
+                except Exception as e:
+                    self.logger.warning(f"✗ Writer candidate error: {str(e)}")
+                    last_error = e
+                    continue
+
+                if is_verified:
+                    self.logger.info("✓ Speculative candidate verified successfully!")
+                    return report, True
+
+                self.logger.warning("✗ Speculative candidate rejected. Issues found:")
+                self.logger.warning(feedback_summary)
+                fallback = fallback or report
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+        if fallback is None:
+            self.logger.error("All speculative writer candidates failed.")
+            raise last_error
+
+        self.logger.error("No speculative candidate verified. Returning unverified report.")
+        return fallback, False
+
+
+def error_feedback(error: Exception) -> str:
+    """Writer retry instructions after a failed attempt (e.g. invalid JSON)"""
+    return f"""
 PREVIOUS ATTEMPT FAILED
 
-Error: {str(e)}
+Error: {str(error)}
 
 Instructions:
 - Ensure you output valid JSON
@@ -105,30 +251,11 @@ Instructions:
 
 Try again with proper formatting.
 """
-                retry_count += 1
-                continue
-
-            # Phase 3: Check if verified
-            is_verified, feedback_summary = check_report_verified(
-                verification_results
-            )
-
-            if is_verified:
-                self.logger.info("✓ Report verified successfully!")
-                return report, True
 
-            # Phase 4: Not verified, prepare for retry
-            self.logger.warning(f"✗ Verification failed. Issues found:")
-            self.logger.warning(feedback_summary)
-
-            if retry_count >= self.max_retries:
-                self.logger.error(
-                    f"Max retries ({self.max_retries}) reached. Returning unverified report."
-                )
-                return report, False
 
-            # Prepare feedback for next iteration
-            feedback_context = f"""
+def rejection_feedback(feedback_summary: str) -> str:
+    """Writer retry instructions after the Verification Agent rejected a report"""
+    return f"""
 PREVIOUS ATTEMPT REJECTED
 
 Verification Issues:
@@ -143,10 +270,28 @@ Instructions:
 Try again with these corrections applied.
 """
 
-            retry_count += 1
 
-        # Should not reach here, but just in case
-        return report, False
+def candidate_temperatures(count: int, base: float = None) -> List[float]:
+    """
+    Sampling temperatures for speculative writer candidates
+
+    The first candidate uses the base temperature; the others alternate
+    below and above it so the candidates differ.
+
+    Args:
+        count: Number of candidates
+        base: Base temperature (defaults to settings)
+
+    Returns:
+        List of temperatures, one per candidate
+    """
+    base = base if base is not None else settings.temperature
+    temperatures = []
+    for i in range(count):
+        step = (i + 1) // 2 * 0.2
+        offset = -step if i % 2 else step
+        temperatures.append(round(min(max(base + offset, 0.1), 1.0), 2))
+    return temperatures
 
 
 async def run_verification_loop(
@@ -157,6 +302,9 @@ async def run_verification_loop(
     """
     Convenience function to run the verification loop
 
+    Speculative mode is enabled per user through the profile constraints
+    ``speculative_candidates`` and ``speculative_token_ceiling``.
+
     Args:
         processed_articles: Articles from Fetch Agent
         user_context: User context
@@ -165,7 +313,11 @@ async def run_verification_loop(
     Returns:
         Tuple of (NewsReport, success_flag)
     """
-    loop = VerificationLoop()
+    constraints = user_context.get("constraints") or {}
+    loop = VerificationLoop(
+        candidates=constraints.get("speculative_candidates"),
+        token_ceiling=constraints.get("speculative_token_ceiling"),
+    )
     return await loop.run(
         processed_articles=processed_articles,
         user_context=user_context,
@@ -0,0 +1,405 @@
+"""
+Metrics
+In-process counters, gauges and histograms, rendered in the Prometheus
+text format and served over a local HTTP endpoint
+
+Most metrics are derived from finished tracing spans (phases, LLM calls,
+searches, fetches, verification attempts, email sends), so the hot paths
+that already open spans need no extra instrumentation. Updates are a
+dictionary lookup and an addition under a lock.
+"""
+import bisect
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from config import settings
+from models.atomic_io import atomic_write
+
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Seconds; LLM calls and whole reports dominate the upper buckets
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) and not value.is_integer() else str(int(value))
+
+
+class _Metric:
+    """A metric family: one value (or histogram) per combination of labels"""
+
+    kind = ""
+
+    def __init__(self, name: str, help: str, labels: Sequence[str] = ()):
+        self.name = name
+        self.help = help
+        self.label_names = tuple(labels)
+        self._children: Dict[Tuple[str, ...], object] = {}
+        self._lock = threading.Lock()
+
+    def labels(self, *values, **kwargs):
+        """The child for one combination of label values"""
+        if kwargs:
+            values = tuple(kwargs[name] for name in self.label_names)
+        key = tuple(str(value) for value in values)
+        child = self._children.get(key)
+        if child is None:
+            with self._lock:
+                child = self._children.setdefault(key, self._new_child())
+        return child
+
+    def _new_child(self):
+        raise NotImplementedError
+
+    def _samples(self) -> List[str]:
+        raise NotImplementedError
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        lines.extend(self._samples())
+        return "\n".join(lines)
+
+    def clear(self):
+        with self._lock:
+            self._children.clear()
+
+
+class _Value:
+    __slots__ = ("value", "_lock")
+
+    def __init__(self):
+        self.value = 0.0
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1):
+        with self._lock:
+            self.value += amount
+
+    def dec(self, amount: float = 1):
+        with self._lock:
+            self.value -= amount
+
+    def set(self, value: float):
+        with self._lock:
+            self.value = value
+
+
+class Counter(_Metric):
+    """A value that only goes up"""
+
+    kind = "counter"
+
+    def _new_child(self):
+        return _Value()
+
+    def inc(self, amount: float = 1):
+        self.labels().inc(amount)
+
+    def _samples(self) -> List[str]:
+        return [
+            f"{self.name}{_format_labels(self.label_names, key)} {_format_value(child.value)}"
+            for key, child in sorted(self._children.items())
+        ]
+
+
+class Gauge(Counter):
+    """A value that goes up and down"""
+
+    kind = "gauge"
+
+    def dec(self, amount: float = 1):
+        self.labels().dec(amount)
+
+    def set(self, value: float):
+        self.labels().set(value)
+
+
+class _HistogramValue:
+    __slots__ = ("bounds", "counts", "sum", "_lock")
+
+    def __init__(self, bounds: Sequence[float]):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float):
+        index = bisect.bisect_left(self.bounds, value)
+        with self._lock:
+            self.counts[index] += 1
+            self.sum += value
+
+
+class Histogram(_Metric):
+    """Observations counted into cumulative buckets"""
+
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, labels: Sequence[str] = (), buckets=LATENCY_BUCKETS):
+        super().__init__(name, help, labels)
+        self.buckets = tuple(sorted(buckets))
+
+    def _new_child(self):
+        return _HistogramValue(self.buckets)
+
+    def observe(self, value: float):
+        self.labels().observe(value)
+
+    def _samples(self) -> List[str]:
+        lines = []
+        for key, child in sorted(self._children.items()):
+            with child._lock:
+                counts = list(child.counts)
+                total = child.sum
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                le = f'le="{_format_value(bound)}"'
+                lines.append(
+                    f"{self.name}_bucket{_format_labels(self.label_names, key, le)} {cumulative}"
+                )
+            labels = _format_labels(self.label_names, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(round(total, 6))}")
+            lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+class MetricsRegistry:
+    """The metric families of a process"""
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+
+    def register(self, metric: _Metric) -> _Metric:
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric already registered: {metric.name}")
+        self._metrics[metric.name] = metric
+        if not metric.label_names:
+            # Unlabelled metrics are exposed as 0 before their first update
+            metric.labels()
+        return metric
+
+    def counter(self, name: str, help: str, labels: Sequence[str] = ()) -> Counter:
+        return self.register(Counter(name, help, labels))
+
+    def gauge(self, name: str, help: str, labels: Sequence[str] = ()) -> Gauge:
+        return self.register(Gauge(name, help, labels))
+
+    def histogram(self, name: str, help: str, labels: Sequence[str] = (), buckets=LATENCY_BUCKETS) -> Histogram:
+        return self.register(Histogram(name, help, labels, buckets))
+
+    def render(self) -> str:
+        """All metrics in the Prometheus text exposition format"""
+        return "\n".join(metric.render() for metric in self._metrics.values()) + "\n"
+
+    def clear(self):
+        """Drop every recorded value (the families stay registered)"""
+        for metric in self._metrics.values():
+            metric.clear()
+            if not metric.label_names:
+                metric.labels()
+
+
+REGISTRY = MetricsRegistry()
+
+REPORTS_IN_FLIGHT = REGISTRY.gauge(
+    "newspulse_reports_in_flight", "Reports being generated"
+)
+REPORTS = REGISTRY.counter(
+    "newspulse_reports_total", "Finished reports by outcome", ["status"]
+)
+REPORT_DURATION = REGISTRY.histogram(
+    "newspulse_report_duration_seconds", "Time to generate a report"
+)
+PHASE_DURATION = REGISTRY.histogram(
+    "newspulse_phase_duration_seconds", "Time per report phase (task graph step)", ["phase"]
+)
+LLM_REQUESTS = REGISTRY.counter(
+    "newspulse_llm_requests_total", "LLM calls by agent and error class", ["agent", "error"]
+)
+LLM_DURATION = REGISTRY.histogram(
+    "newspulse_llm_request_duration_seconds", "LLM call latency", ["agent"]
+)
+LLM_TOKENS = REGISTRY.counter(
+    "newspulse_llm_tokens_total", "LLM tokens by agent", ["agent", "kind"]
+)
+SEARCH_REQUESTS = REGISTRY.counter(
+    "newspulse_search_requests_total", "Custom Search calls by error class", ["error"]
+)
+SEARCH_DURATION = REGISTRY.histogram(
+    "newspulse_search_duration_seconds", "Custom Search latency"
+)
+FETCH_REQUESTS = REGISTRY.counter(
+    "newspulse_fetch_requests_total", "Article fetches by error class", ["error"]
+)
+FETCH_DURATION = REGISTRY.histogram(
+    "newspulse_fetch_duration_seconds", "Article fetch latency, retries included"
+)
+CACHE_LOOKUPS = REGISTRY.counter(
+    "newspulse_cache_lookups_total", "Cache lookups by cache and result", ["cache", "result"]
+)
+VERIFICATION_ATTEMPTS = REGISTRY.counter(
+    "newspulse_verification_attempts_total",
+    "Writer/verification attempts by attempt number (or speculative) and outcome",
+    ["attempt", "outcome"],
+)
+EMAIL_SENDS = REGISTRY.counter(
+    "newspulse_email_sends_total", "Report emails by error class", ["error"]
+)
+EMAIL_DURATION = REGISTRY.histogram(
+    "newspulse_email_send_duration_seconds", "SMTP send latency"
+)
+
+SERVICE_JOBS_QUEUED = REGISTRY.gauge(
+    "newspulse_service_jobs_queued", "Service jobs waiting for a worker"
+)
+SERVICE_JOBS = REGISTRY.counter(
+    "newspulse_service_jobs_total", "Finished service jobs by kind and status", ["kind", "status"]
+)
+
+
+def record_cache_lookup(cache: str, hit: bool):
+    """Count a lookup in one of the pipeline's caches"""
+    if settings.metrics_enabled:
+        CACHE_LOOKUPS.labels(cache, "hit" if hit else "miss").inc()
+
+
+def _error_class(span) -> str:
+    """Exception type that ended a span ("none" for success)"""
+    if span.status != "ERROR":
+        return "none"
+    return span.attributes.get("error.type") or span.status_message.split(":", 1)[0] or "error"
+
+
+def observe_span(span):
+    """
+    Update the metrics derived from a finished span
+
+    Called by the tracer for every span it closes; spans without a
+    metric mapping cost one dictionary lookup.
+    """
+    if not settings.metrics_enabled:
+        return
+    handler = _SPAN_HANDLERS.get(span.name)
+    if handler is None and span.name.startswith("step."):
+        handler = _observe_step
+    if handler is not None:
+        handler(span)
+
+
+def _observe_report(span):
+    REPORTS.labels("error" if span.status == "ERROR" else "ok").inc()
+    REPORT_DURATION.observe(span.duration)
+
+
+def _observe_step(span):
+    PHASE_DURATION.labels(span.name[len("step."):]).observe(span.duration)
+
+
+def _observe_llm(span):
+    agent = span.attributes.get("agent", "-")
+    LLM_REQUESTS.labels(agent, _error_class(span)).inc()
+    LLM_DURATION.labels(agent).observe(span.duration)
+    for kind in ("prompt", "output"):
+        tokens = span.attributes.get(f"llm.{kind}_tokens")
+        if tokens:
+            LLM_TOKENS.labels(agent, kind).inc(tokens)
+
+
+def _observe_search(span):
+    SEARCH_REQUESTS.labels(_error_class(span)).inc()
+    SEARCH_DURATION.observe(span.duration)
+
+
+def _observe_fetch(span):
+    FETCH_REQUESTS.labels(_error_class(span)).inc()
+    FETCH_DURATION.observe(span.duration)
+
+
+def _observe_verification(span):
+    attempt = span.attributes.get("attempt", "speculative")
+    outcome = span.attributes.get("outcome")
+    if outcome is None:
+        # Speculative candidates are cancelled once another one passes
+        outcome = "cancelled" if _error_class(span) == "CancelledError" else "error"
+    VERIFICATION_ATTEMPTS.labels(attempt, outcome).inc()
+
+
+def _observe_email(span):
+    EMAIL_SENDS.labels(_error_class(span)).inc()
+    EMAIL_DURATION.observe(span.duration)
+
+
+_SPAN_HANDLERS = {
+    "report.generate": _observe_report,
+    "llm.generate_content": _observe_llm,
+    "llm.generate_content_stream": _observe_llm,
+    "search.google": _observe_search,
+    "http.fetch": _observe_fetch,
+    "verification.attempt": _observe_verification,
+    "verification.candidate": _observe_verification,
+    "smtp.send": _observe_email,
+}
+
+
+def render() -> str:
+    """The process's metrics in the Prometheus text format"""
+    return REGISTRY.render()
+
+
+def write_metrics(path: Path) -> Path:
+    """Write the current metrics to a file (e.g. at the end of a batch)"""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    atomic_write(path, render(), durable=False)
+    return path
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split("?", 1)[0] != "/metrics":
+            self.send_error(404)
+            return
+        body = render().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", CONTENT_TYPE)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_metrics_server(port: int, host: Optional[str] = None) -> ThreadingHTTPServer:
+    """
+    Serve GET /metrics from a daemon thread
+
+    Args:
+        port: Port to listen on (0 picks a free one)
+        host: Interface to bind (defaults to settings.metrics_host)
+
+    Returns:
+        The running server; ``server_port`` is the bound port and
+        ``shutdown()`` stops it
+    """
+    server = ThreadingHTTPServer((host or settings.metrics_host, port), _MetricsHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="newspulse-metrics", daemon=True).start()
+    return server
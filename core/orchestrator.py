@@ -2,20 +2,33 @@
 NewsPulse AI Orchestrator
 Coordinates the 5-phase multi-agent workflow
 """
+import asyncio
 import logging
-from typing import Optional
+import time
+import uuid
+from typing import List, Optional
 
-from config import settings, setup_logger, set_agent_context
-from models.schemas import NewsReport
-from models.user_profile import UserProfileManager
+from config import settings, setup_logger, set_agent_context, set_log_context, log_context
+from models.schemas import NewsReport, UserProfile
+from models.user_profile import get_profile_manager
+from models.seen_urls import SeenUrlIndex, canonicalize_url
+from models.usage_store import get_usage_store
 
 from agents.profile_agent import run_profile_agent
-from agents.historical_recommender_agent import run_historical_recommender_agent
+from agents.historical_recommender_agent import (
+    run_historical_recommender_agent,
+    drain_background_insights,
+)
 from agents.search_agent import run_search_agent
 from agents.fetch_agent import run_fetch_agent
 from agents.dispatch_agent import run_dispatch_agent
 
 from core.loop_agent import run_verification_loop
+from core.task_graph import TaskGraph
+from core.research_cache import ResearchCache
+from core.tracing import span, set_span_attributes
+from core.metrics import REPORTS_IN_FLIGHT
+from core.utils import run_blocking
 
 
 class NewsPulseOrchestrator:
@@ -40,7 +53,9 @@ class NewsPulseOrchestrator:
         self.logger = setup_logger(
             "newspulse", level=log_level or settings.log_level
         )
-        self.profile_manager = UserProfileManager()
+        self.profile_manager = get_profile_manager()
+        self.research_cache = ResearchCache()
+        self.last_timings = {}
 
     async def generate_report(
         self, user_id: str, deliver: bool = True
@@ -48,7 +63,10 @@ class NewsPulseOrchestrator:
         """
         Generate a complete news report for a user
 
-        This is the main entry point that orchestrates all agents.
+        This is the main entry point that orchestrates all agents. The
+        phases run as a task graph, so steps that don't depend on each
+        other (profile analysis, history analysis, the seen-URL index)
+        run concurrently.
 
         Args:
             user_id: User ID to generate report for
@@ -57,81 +75,344 @@ class NewsPulseOrchestrator:
         Returns:
             Generated NewsReport
         """
+        # Every log line from this run (including concurrent steps and
+        # executor threads) carries the user and report IDs
+        report_id = str(uuid.uuid4())
+        with log_context(user_id=user_id, report_id=report_id, agent="SYSTEM"), span(
+            "report.generate", user_id=user_id, report_id=report_id, deliver=deliver
+        ):
+            REPORTS_IN_FLIGHT.inc()
+            try:
+                return await self._generate_report(user_id, report_id, deliver)
+            finally:
+                REPORTS_IN_FLIGHT.dec()
+
+    async def generate_batch(
+        self,
+        user_ids: List[str],
+        deliver: bool = True,
+        concurrency: int = None,
+    ) -> List[dict]:
+        """
+        Generate reports for many users, a bounded number at a time
+
+        A failed report is recorded and does not stop the batch.
+
+        Args:
+            user_ids: Users to generate reports for
+            deliver: Whether to deliver the reports via email
+            concurrency: Reports in flight at once (defaults to settings)
+
+        Returns:
+            One result per user, in order: user_id, status ("ok" or
+            "error"), report_id, duration_s and error
+        """
+        semaphore = asyncio.Semaphore(concurrency or settings.batch_concurrency)
+
+        async def run_one(user_id: str) -> dict:
+            async with semaphore:
+                start = time.perf_counter()
+                try:
+                    report = await self.generate_report(user_id, deliver=deliver)
+                except Exception as e:
+                    self.logger.error(f"Report for {user_id} failed: {e}")
+                    return {
+                        "user_id": user_id,
+                        "status": "error",
+                        "report_id": None,
+                        "duration_s": time.perf_counter() - start,
+                        "error": f"{type(e).__name__}: {e}",
+                    }
+                return {
+                    "user_id": user_id,
+                    "status": "ok",
+                    "report_id": report.report_id,
+                    "duration_s": time.perf_counter() - start,
+                    "error": None,
+                }
+
+        results = await asyncio.gather(*(run_one(user_id) for user_id in user_ids))
+
+        # History insights refresh off each report's critical path; let them finish
+        await drain_background_insights()
+        return results
+
+    async def deliver_report(self, report: NewsReport) -> dict:
+        """
+        Deliver a report generated with ``deliver=False``
+
+        Lets a caller (such as the scheduler) generate ahead of time and
+        send at the delivery time.
+
+        Args:
+            report: Report to deliver
+
+        Returns:
+            Delivery result from the Dispatch Agent
+        """
+        with log_context(user_id=report.user_id, report_id=report.report_id, agent="SYSTEM"), span(
+            "report.deliver", user_id=report.user_id, report_id=report.report_id
+        ):
+            profile = self.profile_manager.load_profile(report.user_id)
+            if profile is None:
+                raise ValueError(f"No profile found for user_id: {report.user_id}")
+            return await self._run_dispatch(report, profile)
+
+    async def _generate_report(
+        self, user_id: str, report_id: str, deliver: bool
+    ) -> NewsReport:
         self.logger.info(f"=== Starting NewsPulse AI for user: {user_id} ===")
 
-        # ===== PHASE 1: CONTEXTUAL PLANNING =====
+        graph = self.build_report_graph(deliver=deliver)
+        try:
+            results = await graph.run(user_id=user_id, report_id=report_id)
+        finally:
+            # Kept for failed runs too, so a profile shows how far it got
+            self.last_timings = graph.timings
+
+        self.logger.info(
+            "Step timings: "
+            + ", ".join(
+                f"{name} {timing['duration']:.2f}s"
+                for name, timing in sorted(
+                    graph.timings.items(), key=lambda item: item[1]["start"]
+                )
+            ),
+            extra={
+                "timings": graph.timings,
+                "duration_s": max(
+                    (timing["end"] for timing in graph.timings.values()), default=0
+                ),
+            },
+        )
+
+        self.logger.info(f"=== NewsPulse AI completed for user: {user_id} ===")
+
+        return results["report"]
+
+    def build_report_graph(self, deliver: bool = True) -> TaskGraph:
+        """
+        Build the report pipeline as a dependency graph
+
+        Phase 1 needs only the stored profile, so the Profile Agent's LLM
+        analysis and the Historical Recommender run side by side instead
+        of one after the other.
+
+        Args:
+            deliver: Whether to include the dispatch step
+
+        Returns:
+            TaskGraph taking ``user_id`` as its initial input
+        """
+        graph = TaskGraph()
+
+        # Phase 1: Contextual Planning
+        graph.add("profile", self._load_profile, inputs=["user_id"])
+        graph.add("profile_analysis", self._run_profile, inputs=["user_id", "profile"])
+        graph.add("history", self._run_history, inputs=["user_id", "profile"])
+        graph.add("seen_urls", self._load_seen_urls, inputs=["user_id"])
+
+        # Phase 2: Grounded Research
+        graph.add(
+            "user_context",
+            self._build_user_context,
+            inputs=["user_id", "report_id", "profile", "profile_analysis", "history"],
+        )
+        graph.add("cached_research", self._load_cached_research, inputs=["user_context", "seen_urls"])
+        graph.add(
+            "search_results",
+            self._run_search,
+            inputs=["user_context", "seen_urls", "cached_research"],
+        )
+        graph.add(
+            "processed_articles",
+            self._run_fetch,
+            inputs=["user_context", "search_results", "cached_research"],
+        )
+
+        # Phase 3: Verification Loop
+        graph.add("report", self._run_verification_loop, inputs=["user_context", "processed_articles"])
+
+        # Phase 4: Dispatch
+        if deliver:
+            graph.add("delivery", self._run_dispatch, inputs=["report", "profile"])
+        else:
+            self.logger.info("Skipping delivery (deliver=False)")
+
+        return graph
+
+    # ===== PHASE 1: CONTEXTUAL PLANNING =====
+
+    def _load_profile(self, user_id: str) -> UserProfile:
+        set_log_context(phase="planning")
         self.logger.info(">>> PHASE 1: Contextual Planning")
 
-        # Step 1.1: Profile Agent
-        set_agent_context(self.logger, "ProfileAgent")
-        self.logger.info("Running Profile Agent...")
-        profile_data = await run_profile_agent(user_id)
-        user_profile = profile_data["user_profile"]
-        priority_topics = profile_data["priority_topics"]
+        profile = self.profile_manager.load_profile(user_id)
+        if profile is None:
+            raise ValueError(f"No profile found for user_id: {user_id}")
 
         self.logger.info(
-            f"User context loaded: {user_profile.role} at {user_profile.company}"
+            f"User context loaded: {profile.role} at {profile.company}"
         )
-        self.logger.info(f"Priority topics: {', '.join(priority_topics)}")
+        self.logger.info(f"Priority topics: {', '.join(profile.topics_of_interest)}")
+        return profile
+
+    async def _run_profile(self, user_id: str, profile: UserProfile) -> dict:
+        set_log_context(phase="planning")
+        set_agent_context(self.logger, "ProfileAgent")
+        self.logger.info("Running Profile Agent...")
+        return await run_profile_agent(user_id, profile=profile)
+
+    async def _run_history(self, user_id: str, profile: UserProfile) -> str:
+        # Seen URLs are filtered by the seen-URL index; the history is
+        # only needed for its insights
+        if not settings.historical_insights_enabled:
+            return ""
 
-        # Step 1.2: Historical Recommender Agent
+        set_log_context(phase="planning")
         set_agent_context(self.logger, "HistoricalRecommender")
         self.logger.info("Running Historical Recommender Agent...")
         historical_rec = await run_historical_recommender_agent(
-            user_id, priority_topics
+            user_id, profile.topics_of_interest
         )
 
         self.logger.info(
-            f"Historical analysis: {len(historical_rec.exclude_urls)} URLs to exclude"
+            f"Historical analysis: {len(historical_rec.exclude_urls)} recent URLs"
         )
+        return historical_rec.insights
 
-        # ===== PHASE 2: GROUNDED RESEARCH =====
-        self.logger.info(">>> PHASE 2: Grounded Research")
+    def _load_seen_urls(self, user_id: str) -> SeenUrlIndex:
+        seen_urls = SeenUrlIndex(user_id)
+        # Count (and backfill from history) here, off the event loop, rather
+        # than on first use in an async step
+        len(seen_urls)
+        return seen_urls
 
-        # Step 2.1: Search Agent
-        set_agent_context(self.logger, "SearchAgent")
-        self.logger.info("Running Search Agent...")
+    # ===== PHASE 2: GROUNDED RESEARCH =====
 
-        user_context = {
+    def _build_user_context(
+        self,
+        user_id: str,
+        report_id: str,
+        profile: UserProfile,
+        profile_analysis: dict,
+        history: str,
+    ) -> dict:
+        return {
             "user_id": user_id,
-            "role": user_profile.role,
-            "company": user_profile.company,
-            "industry": user_profile.industry,
-            "priority_topics": priority_topics,
-            "constraints": user_profile.constraints,
+            "report_id": report_id,
+            "role": profile.role,
+            "company": profile.company,
+            "industry": profile.industry,
+            "priority_topics": profile.topics_of_interest,
+            "constraints": profile.constraints,
+            "personalization_notes": profile_analysis["personalization_analysis"],
+            "history_insights": history,
         }
 
+    async def _load_cached_research(self, user_context: dict, seen_urls: SeenUrlIndex) -> dict:
+        """Pre-warmed articles per topic, minus those the user has seen"""
+        set_log_context(phase="research")
+        self.logger.info(">>> PHASE 2: Grounded Research")
+        if not settings.research_cache_enabled:
+            return {}
+
+        def unseen_articles(topic: str) -> list:
+            return [
+                article
+                for article in self.research_cache.get(topic) or []
+                if article["search_result"].url not in seen_urls
+            ]
+
+        cached_research = {}
+        for topic in user_context["priority_topics"]:
+            # Reading and validating the cached JSON is blocking work
+            articles = await run_blocking(unseen_articles, topic)
+            # A topic whose cached articles were all seen is researched live
+            if articles:
+                cached_research[topic] = articles
+
+        if cached_research:
+            self.logger.info(
+                f"Using pre-warmed research for {len(cached_research)} of "
+                f"{len(user_context['priority_topics'])} topics"
+            )
+        return cached_research
+
+    async def _run_search(
+        self, user_context: dict, seen_urls: SeenUrlIndex, cached_research: dict
+    ) -> list:
+        set_log_context(phase="research")
+        topics = [t for t in user_context["priority_topics"] if t not in cached_research]
+        if not topics:
+            return []
+
+        set_agent_context(self.logger, "SearchAgent")
+        self.logger.info("Running Search Agent...")
+        self.logger.info(f"Excluding {len(seen_urls)} previously sent URLs")
+
         search_results = await run_search_agent(
-            priority_topics=priority_topics,
+            priority_topics=topics,
             user_context=user_context,
-            exclude_urls=historical_rec.exclude_urls,
+            exclude_urls=seen_urls,
             max_results_per_topic=5,
         )
 
         self.logger.info(f"Found {len(search_results)} relevant articles")
 
-        if not search_results:
+        if not search_results and not cached_research:
             self.logger.warning("No search results found. Cannot generate report.")
             raise ValueError("No search results found")
 
-        # Step 2.2: Fetch Agent
-        set_agent_context(self.logger, "FetchAgent")
-        self.logger.info("Running Fetch Agent to retrieve content...")
+        return search_results
+
+    async def _run_fetch(
+        self, user_context: dict, search_results: list, cached_research: dict
+    ) -> list:
+        set_log_context(phase="research")
+        fetched_articles = []
+        if search_results:
+            set_agent_context(self.logger, "FetchAgent")
+            self.logger.info("Running Fetch Agent to retrieve content...")
+
+            fetched_articles = await run_fetch_agent(
+                search_results=search_results,
+                max_articles=settings.max_articles_per_report,
+                topics=user_context["priority_topics"],
+            )
 
-        processed_articles = await run_fetch_agent(
-            search_results=search_results,
-            max_articles=settings.max_articles_per_report,
-        )
+            self.logger.info(
+                f"Successfully fetched and processed {len(fetched_articles)} articles"
+            )
 
-        self.logger.info(
-            f"Successfully fetched and processed {len(processed_articles)} articles"
-        )
+        # Cached and live articles in topic order, without cross-topic duplicates
+        by_topic = {topic: [] for topic in user_context["priority_topics"]}
+        for article in fetched_articles:
+            by_topic.setdefault(article["search_result"].topic, []).append(article)
+        by_topic.update(cached_research)
+
+        processed_articles = []
+        seen = set()
+        for articles in by_topic.values():
+            for article in articles:
+                canonical = canonicalize_url(article["search_result"].url)
+                if canonical not in seen:
+                    seen.add(canonical)
+                    processed_articles.append(article)
+        processed_articles = processed_articles[:settings.max_articles_per_report]
 
         if not processed_articles:
             self.logger.warning("No articles fetched successfully.")
             raise ValueError("Failed to fetch any article content")
 
-        # ===== PHASE 3: VERIFICATION LOOP =====
+        return processed_articles
+
+    # ===== PHASE 3: VERIFICATION LOOP =====
+
+    async def _run_verification_loop(
+        self, user_context: dict, processed_articles: list
+    ) -> NewsReport:
+        set_log_context(phase="verification")
         self.logger.info(">>> PHASE 3: Verification Loop")
 
         set_agent_context(self.logger, "VerificationLoop")
@@ -143,6 +424,16 @@ class NewsPulseOrchestrator:
             max_articles=settings.max_articles_per_report,
         )
 
+        set_span_attributes(verified=is_verified, articles=len(report.articles))
+
+        # Every LLM call for the report has been made by now
+        if settings.usage_tracking_enabled:
+            report.usage = get_usage_store().report_totals(report.report_id)
+            set_span_attributes(
+                total_tokens=report.usage["total_tokens"],
+                cost_usd=report.usage["cost_usd"],
+            )
+
         if is_verified:
             self.logger.info("✓ Report successfully verified!")
         else:
@@ -150,31 +441,31 @@ class NewsPulseOrchestrator:
                 "⚠ Report generated but not fully verified after max retries"
             )
 
-        # ===== PHASE 4: DISPATCH =====
-        if deliver:
-            self.logger.info(">>> PHASE 4: Dispatch")
+        return report
 
-            set_agent_context(self.logger, "DispatchAgent")
-            self.logger.info("Running Dispatch Agent...")
+    # ===== PHASE 4: DISPATCH =====
 
-            delivery_result = await run_dispatch_agent(
-                report=report, user_profile=user_profile
-            )
+    async def _run_dispatch(self, report: NewsReport, profile: UserProfile) -> dict:
+        set_log_context(phase="dispatch")
+        self.logger.info(">>> PHASE 4: Dispatch")
 
-            if delivery_result["status"] == "delivered":
-                self.logger.info(
-                    f"✓ Report delivered to {delivery_result['recipient']}"
-                )
-            else:
-                self.logger.error(
-                    f"✗ Failed to deliver report: {delivery_result['message']}"
-                )
-        else:
-            self.logger.info("Skipping delivery (deliver=False)")
+        set_agent_context(self.logger, "DispatchAgent")
+        self.logger.info("Running Dispatch Agent...")
 
-        self.logger.info(f"=== NewsPulse AI completed for user: {user_id} ===")
+        delivery_result = await run_dispatch_agent(
+            report=report, user_profile=profile
+        )
 
-        return report
+        if delivery_result["status"] == "delivered":
+            self.logger.info(
+                f"✓ Report delivered to {delivery_result['recipient']}"
+            )
+        else:
+            self.logger.error(
+                f"✗ Failed to deliver report: {delivery_result['message']}"
+            )
+
+        return delivery_result
 
     async def process_feedback(self, feedback_data):
         """
@@ -183,17 +474,21 @@ class NewsPulseOrchestrator:
         Args:
             feedback_data: FeedbackData object
         """
-        self.logger.info(f">>> PHASE 5: Processing Feedback")
-
-        from agents.feedback_agent import run_feedback_agent
+        with log_context(
+            user_id=feedback_data.user_id,
+            report_id=feedback_data.report_id,
+            phase="feedback",
+            agent="FeedbackAgent",
+        ):
+            self.logger.info(f">>> PHASE 5: Processing Feedback")
 
-        set_agent_context(self.logger, "FeedbackAgent")
+            from agents.feedback_agent import run_feedback_agent
 
-        result = await run_feedback_agent(feedback_data)
+            result = await run_feedback_agent(feedback_data)
 
-        self.logger.info(f"Feedback processed: {result['summary']}")
+            self.logger.info(f"Feedback processed: {result['summary']}")
 
-        return result
+            return result
 
     def create_user_profile(
         self,
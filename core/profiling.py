@@ -0,0 +1,219 @@
+"""
+Run profiling
+Sampling profiler for one report run: thread and asyncio task stacks,
+memory growth, and thread and executor queue depth over time
+"""
+import asyncio
+import html
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from pathlib import Path
+from typing import Dict, List
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    return f"{code.co_name} ({Path(code.co_filename).name}:{frame.f_lineno})"
+
+
+def _thread_stack(frame) -> List[str]:
+    """Labels from the outermost frame to the innermost"""
+    labels = []
+    while frame is not None:
+        labels.append(_frame_label(frame))
+        frame = frame.f_back
+    labels.reverse()
+    return labels
+
+
+def _task_stack(task: asyncio.Task) -> List[str]:
+    """
+    Labels along a task's await chain, ending with what it waits on
+
+    A suspended coroutine has no thread stack, so this is how time spent
+    awaiting the LLM, executor or network shows up in the profile.
+    """
+    labels = []
+    awaitable = task.get_coro()
+    while awaitable is not None:
+        frame = getattr(awaitable, "cr_frame", None) or getattr(awaitable, "gi_frame", None)
+        if frame is None:
+            break
+        labels.append(_frame_label(frame))
+        awaitable = getattr(awaitable, "cr_await", None) or getattr(awaitable, "gi_yieldfrom", None)
+
+    if isinstance(awaitable, asyncio.Task):
+        labels.append(f"[await task {awaitable.get_name()}]")
+    elif isinstance(awaitable, asyncio.Future):
+        labels.append("[await future]")
+    return labels
+
+
+class RunProfiler:
+    """
+    Samples a running report in a background thread
+
+    Every interval it records the stack of each thread and the await
+    chain of each asyncio task (as folded stacks, ready for flamegraph.pl
+    or speedscope), plus thread count and default-executor queue depth.
+    tracemalloc snapshots taken at start and stop give memory growth by
+    source line.
+
+    Use as a context manager around the run, from inside the event loop.
+    """
+
+    def __init__(self, loop: asyncio.AbstractEventLoop = None, interval: float = 0.01):
+        self.loop = loop or asyncio.get_running_loop()
+        self.interval = interval
+        self.stacks: Counter = Counter()
+        self.timeline: List[dict] = []
+        self.samples = 0
+        self.started = 0.0
+        self.duration = 0.0
+        self.memory_diff = []
+        self._snapshot = None
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="newspulse-profiler", daemon=True)
+
+    def __enter__(self):
+        self._started_tracemalloc = not tracemalloc.is_tracing()
+        if self._started_tracemalloc:
+            tracemalloc.start()
+        self._snapshot = tracemalloc.take_snapshot()
+        self.started = time.perf_counter()
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+        self.duration = time.perf_counter() - self.started
+
+        after = tracemalloc.take_snapshot()
+        self.memory_diff = after.compare_to(self._snapshot, "lineno")
+        if self._started_tracemalloc:
+            tracemalloc.stop()
+        return False
+
+    def _run(self):
+        own_thread = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            self._sample(own_thread)
+
+    def _sample(self, own_thread: int):
+        names = {thread.ident: thread.name for thread in threading.enumerate()}
+        for ident, frame in sys._current_frames().items():
+            if ident == own_thread:
+                continue
+            stack = [f"thread {names.get(ident, ident)}"] + _thread_stack(frame)
+            self.stacks[";".join(stack)] += 1
+
+        try:
+            tasks = list(asyncio.all_tasks(self.loop))
+        except RuntimeError:
+            # The loop's task set changed while being read; skip this sample
+            tasks = []
+        for task in tasks:
+            stack = _task_stack(task)
+            if stack:
+                self.stacks[";".join([f"task {task.get_name()}"] + stack)] += 1
+
+        executor = getattr(self.loop, "_default_executor", None)
+        queue = getattr(executor, "_work_queue", None)
+        self.timeline.append({
+            "t": round(time.perf_counter() - self.started, 3),
+            "threads": threading.active_count(),
+            "executor_queue": queue.qsize() if queue is not None else 0,
+            "tasks": len(tasks),
+        })
+        self.samples += 1
+
+    def folded(self) -> str:
+        """Samples as folded stacks ("frame;frame;frame count" per line)"""
+        return "".join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+
+    def top_frames(self, limit: int = 25) -> List[tuple]:
+        """
+        Frames by share of samples they appear in (inclusive)
+
+        Returns:
+            List of (label, samples) tuples
+        """
+        inclusive = Counter()
+        for stack, count in self.stacks.items():
+            for label in set(stack.split(";")[1:]):
+                inclusive[label] += count
+        return inclusive.most_common(limit)
+
+    def write(self, output_dir: Path, timings: Dict[str, dict] = None, title: str = "") -> Dict[str, Path]:
+        """
+        Write the folded stacks and an HTML summary
+
+        Args:
+            output_dir: Directory for the artifacts
+            timings: Step timings from TaskGraph (start, end, duration)
+            title: Heading for the HTML summary
+
+        Returns:
+            Paths of the written files, keyed "folded" and "html"
+        """
+        output_dir = Path(output_dir)
+        output_dir.mkdir(parents=True, exist_ok=True)
+        paths = {
+            "folded": output_dir / "profile.folded",
+            "html": output_dir / "profile.html",
+        }
+        paths["folded"].write_text(self.folded(), encoding="utf-8")
+        paths["html"].write_text(self._html(timings or {}, title), encoding="utf-8")
+        return paths
+
+    def _html(self, timings: Dict[str, dict], title: str) -> str:
+        total = max([self.duration] + [t["end"] for t in timings.values()]) or 1.0
+        phases = "".join(
+            f"<tr><td>{html.escape(name)}</td><td>{t['duration']:.2f}s</td>"
+            f"<td><div class='bar' style='margin-left:{t['start'] / total * 100:.1f}%;"
+            f"width:{max(t['duration'] / total * 100, 0.3):.1f}%'></div></td></tr>"
+            for name, t in sorted(timings.items(), key=lambda item: item[1]["start"])
+        )
+        frames = "".join(
+            f"<tr><td>{count / max(self.samples, 1):.0%}</td><td><code>{html.escape(label)}</code></td></tr>"
+            for label, count in self.top_frames()
+        )
+        memory = "".join(
+            f"<tr><td>{stat.size_diff / 1024:+.1f} KiB</td><td>{stat.count_diff:+d}</td>"
+            f"<td><code>{html.escape(str(stat.traceback[0]))}</code></td></tr>"
+            for stat in self.memory_diff[:20]
+        )
+        timeline = "".join(
+            f"<tr><td>{point['t']:.2f}s</td><td>{point['threads']}</td>"
+            f"<td>{point['executor_queue']}</td><td>{point['tasks']}</td></tr>"
+            for point in self.timeline[:: max(len(self.timeline) // 50, 1)]
+        )
+        peak_queue = max((point["executor_queue"] for point in self.timeline), default=0)
+        peak_threads = max((point["threads"] for point in self.timeline), default=0)
+
+        return f"""<!DOCTYPE html>
+<html><head><meta charset="utf-8"><title>{html.escape(title)}</title>
+<style>
+body {{ font-family: sans-serif; margin: 2em; color: #333; }}
+table {{ border-collapse: collapse; margin-bottom: 2em; width: 100%; }}
+td, th {{ border-bottom: 1px solid #eee; padding: 4px 8px; text-align: left; font-size: 13px; }}
+.bar {{ background: #667eea; height: 12px; border-radius: 2px; }}
+</style></head><body>
+<h1>{html.escape(title)}</h1>
+<p>{self.duration:.2f}s wall clock, {self.samples} samples every {self.interval * 1000:.0f} ms,
+peak {peak_threads} threads, peak executor queue {peak_queue}.
+Full stacks are in <code>profile.folded</code> (flamegraph.pl or speedscope).</p>
+<h2>Phases</h2>
+<table><tr><th>Step</th><th>Duration</th><th>Timeline</th></tr>{phases}</table>
+<h2>Where time goes (threads and awaiting tasks)</h2>
+<table><tr><th>Samples</th><th>Frame</th></tr>{frames}</table>
+<h2>Memory growth</h2>
+<table><tr><th>Size</th><th>Blocks</th><th>Allocated at</th></tr>{memory}</table>
+<h2>Threads and executor queue</h2>
+<table><tr><th>Time</th><th>Threads</th><th>Executor queue</th><th>Tasks</th></tr>{timeline}</table>
+</body></html>
+"""
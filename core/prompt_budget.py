@@ -0,0 +1,250 @@
+"""
+Prompt budget planning for NewsPulse AI
+Keeps every LLM prompt inside a predictable token budget by trimming low-value sentences first
+"""
+import logging
+import re
+from typing import Callable, List, Optional
+
+from config import settings
+
+
+# Gemini averages roughly four characters of English text per token
+CHARS_PER_TOKEN = 4
+
+_SENTENCE_SPLIT = re.compile(r"(?<=[.!?])\s+(?=[\"'A-Z0-9(])|\n+")
+_BOILERPLATE = re.compile(
+    r"\b(cookies?|subscribe|sign up|newsletter|advertisement|all rights reserved|"
+    r"click here|read more|share this|follow us|privacy policy|terms of use)\b",
+    re.IGNORECASE,
+)
+_QUOTE = re.compile(r"[\"“”]")
+_DIGIT = re.compile(r"\d")
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Estimate the number of tokens in a piece of text
+
+    Args:
+        text: Text to measure
+
+    Returns:
+        Approximate token count
+    """
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+
+def split_sentences(text: str) -> List[str]:
+    """
+    Split text into sentences and lines
+
+    Args:
+        text: Text to split
+
+    Returns:
+        Non-empty sentences in original order
+    """
+    return [s.strip() for s in _SENTENCE_SPLIT.split(text) if s and s.strip()]
+
+
+def score_sentence(sentence: str) -> float:
+    """
+    Heuristic value of a sentence for an analyst prompt
+
+    Quotes and figures are what citations are built from, so they score
+    high; short fragments and site boilerplate score low.
+
+    Args:
+        sentence: Sentence to score
+
+    Returns:
+        Relative value (higher is more valuable)
+    """
+    words = len(sentence.split())
+    score = min(words / 20.0, 1.0)
+
+    if words < 4:
+        score -= 1.0
+    if _QUOTE.search(sentence):
+        score += 1.0
+    if _DIGIT.search(sentence):
+        score += 0.5
+    if _BOILERPLATE.search(sentence):
+        score -= 2.0
+
+    return score
+
+
+def trim_to_budget(
+    text: str,
+    max_tokens: int,
+    scorer: Optional[Callable[[str], float]] = score_sentence,
+) -> str:
+    """
+    Trim text to a token budget, dropping the lowest-value sentences first
+
+    Args:
+        text: Text to trim
+        max_tokens: Token budget for the text
+        scorer: Sentence scoring function, or None to drop from the end
+            (for ranked lists such as URLs)
+
+    Returns:
+        Trimmed text with surviving sentences in original order
+    """
+    if estimate_tokens(text) <= max_tokens:
+        return text
+    if max_tokens <= 0:
+        return ""
+
+    sentences = split_sentences(text)
+    costs = [estimate_tokens(s) + 1 for s in sentences]
+    total = sum(costs)
+
+    # Lowest score first; among equals, later sentences go first
+    if scorer is None:
+        drop_order = range(len(sentences) - 1, -1, -1)
+    else:
+        scores = [scorer(s) for s in sentences]
+        drop_order = sorted(range(len(sentences)), key=lambda i: (scores[i], -i))
+
+    dropped = set()
+    for i in drop_order:
+        if total <= max_tokens:
+            break
+        dropped.add(i)
+        total -= costs[i]
+
+    kept = [s for i, s in enumerate(sentences) if i not in dropped]
+    if not kept and sentences:
+        # Nothing fits whole: keep the head of the best sentence
+        best = sentences[list(drop_order)[-1]]
+        kept = [best[: max_tokens * CHARS_PER_TOKEN]]
+
+    return "\n".join(kept)
+
+
+def rank_weights(count: int) -> List[float]:
+    """
+    Budget weights for a ranked list, proportional to rank
+
+    The first item gets ``count`` shares and the last gets one.
+
+    Args:
+        count: Number of ranked items
+
+    Returns:
+        List of weights in rank order
+    """
+    return [float(count - i) for i in range(count)]
+
+
+class PromptBuilder:
+    """
+    Builds a prompt from sections that share one token budget
+
+    Fixed sections (weight 0) are always kept verbatim. The rest of the
+    budget is shared between weighted sections in proportion to their
+    weight; budget a section does not need is handed to the others, and
+    sections that still don't fit lose their lowest-value sentences.
+
+    Usage:
+        prompt = (
+            PromptBuilder(settings.prompt_token_budget)
+            .add("Analyze this article:")
+            .add(article_text, weight=1)
+            .build()
+        )
+    """
+
+    def __init__(self, max_tokens: int = None):
+        """
+        Initialize the builder
+
+        Args:
+            max_tokens: Token budget for the whole prompt (defaults to settings)
+        """
+        self.max_tokens = max_tokens or settings.prompt_token_budget
+        self.sections: List[dict] = []
+        self.logger = logging.getLogger("newspulse")
+
+    def add(
+        self, text: str, weight: float = 0.0, ordered: bool = False
+    ) -> "PromptBuilder":
+        """
+        Add a section to the prompt
+
+        Args:
+            text: Section text
+            weight: Budget share (0 keeps the section fixed and untrimmed)
+            ordered: Section is a ranked list; trim from the end
+
+        Returns:
+            The builder, for chaining
+        """
+        self.sections.append({
+            "text": text,
+            "weight": max(weight, 0.0),
+            "ordered": ordered,
+        })
+        return self
+
+    def allocate(self) -> List[int]:
+        """
+        Compute the token allowance of every section
+
+        Returns:
+            Token allowance per section, in insertion order
+        """
+        needs = [estimate_tokens(s["text"]) for s in self.sections]
+        allowance = list(needs)
+
+        fixed_tokens = sum(
+            need for need, s in zip(needs, self.sections) if not s["weight"]
+        )
+        remaining = self.max_tokens - fixed_tokens
+        if remaining < 0:
+            self.logger.warning(
+                f"Fixed prompt sections need ~{fixed_tokens} tokens, "
+                f"over the {self.max_tokens} token budget"
+            )
+            remaining = 0
+
+        open_sections = [i for i, s in enumerate(self.sections) if s["weight"]]
+
+        # Water-filling: satisfy sections that need less than their share,
+        # then split what's left among the rest
+        while open_sections:
+            total_weight = sum(self.sections[i]["weight"] for i in open_sections)
+            satisfied = [
+                i for i in open_sections
+                if needs[i] <= remaining * self.sections[i]["weight"] / total_weight
+            ]
+            if not satisfied:
+                for i in open_sections:
+                    allowance[i] = int(remaining * self.sections[i]["weight"] / total_weight)
+                break
+            for i in satisfied:
+                allowance[i] = needs[i]
+                remaining -= needs[i]
+                open_sections.remove(i)
+
+        return allowance
+
+    def build(self) -> str:
+        """
+        Assemble the prompt within budget
+
+        Returns:
+            Prompt text
+        """
+        parts = []
+        for section, allowance in zip(self.sections, self.allocate()):
+            text = section["text"]
+            if section["weight"]:
+                scorer = None if section["ordered"] else score_sentence
+                text = trim_to_budget(text, allowance, scorer=scorer)
+            parts.append(text)
+
+        return "\n".join(parts)
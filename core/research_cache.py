@@ -0,0 +1,214 @@
+"""
+Research cache and pre-warming
+Runs query planning, search, fetch and analysis once per topic ahead of
+the delivery window, so a report at delivery time only needs the writer,
+verification and dispatch
+"""
+import asyncio
+import hashlib
+import logging
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from config import settings, log_context
+from models.schemas import FetchedContent, SearchResult
+from models.atomic_io import atomic_write
+from models.serialization import dumps, loads
+from models.user_profile import get_profile_manager
+from agents.search_agent import plan_topic_query
+from agents.fetch_agent import run_fetch_agent
+from tools.search_tool import search_news
+from core.metrics import record_cache_lookup
+from core.tracing import span, set_span_attributes
+from core.utils import run_blocking
+
+
+def topic_key(topic: str) -> str:
+    """Hex SHA-256 of a topic, ignoring case and surrounding whitespace"""
+    normalized = " ".join(topic.lower().split())
+    return hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+
+
+class ResearchCache:
+    """
+    Processed articles per topic, persisted to disk
+
+    Entries hold what the writer needs from the Fetch Agent: the search
+    result, the condensed content and the analysis. The raw page text is
+    not kept. Entries expire after the configured TTL, after which the
+    topic is researched live again.
+    """
+
+    def __init__(self, cache_dir: Optional[Path] = None, ttl_hours: float = None):
+        """
+        Initialize the cache
+
+        Args:
+            cache_dir: Directory for cached research (defaults to settings)
+            ttl_hours: Lifetime of cached research (defaults to settings)
+        """
+        self.cache_dir = cache_dir or settings.cache_dir / "research"
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.ttl_seconds = (
+            ttl_hours if ttl_hours is not None else settings.research_cache_ttl_hours
+        ) * 3600
+
+    def _path(self, topic: str) -> Path:
+        return self.cache_dir / f"{topic_key(topic)}.json"
+
+    def get(self, topic: str) -> Optional[List[dict]]:
+        """
+        Look up the cached research for a topic
+
+        Args:
+            topic: Topic of interest
+
+        Returns:
+            Processed articles in run_fetch_agent's format, or None if
+            the topic is not cached or has expired
+        """
+        articles = self._load(topic)
+        record_cache_lookup("research", articles is not None)
+        return articles
+
+    def set(self, topic: str, query: str, articles: List[dict]):
+        """
+        Store the research for a topic
+
+        Args:
+            topic: Topic of interest
+            query: Search query the articles were found with
+            articles: Processed articles from run_fetch_agent
+        """
+        record = {
+            "cached_at": time.time(),
+            "topic": topic,
+            "query": query,
+            "articles": [
+                {
+                    "search_result": article["search_result"].model_dump(mode="json"),
+                    "fetched_content": article["fetched_content"].model_dump(
+                        mode="json", exclude={"content"}
+                    ),
+                    "analysis": article["analysis"],
+                }
+                for article in articles
+            ],
+        }
+        atomic_write(self._path(topic), dumps(record), durable=False)
+
+    def _load(self, topic: str) -> Optional[List[dict]]:
+        path = self._path(topic)
+        try:
+            with open(path, "rb") as f:
+                record = loads(f.read())
+        except (OSError, ValueError):
+            return None
+
+        if time.time() - record.get("cached_at", 0) > self.ttl_seconds:
+            path.unlink(missing_ok=True)
+            return None
+
+        articles = []
+        for entry in record["articles"]:
+            fetched = entry["fetched_content"]
+            fetched["content"] = fetched.get("condensed_content") or ""
+            articles.append({
+                "search_result": SearchResult.model_validate(entry["search_result"]),
+                "fetched_content": FetchedContent.model_validate(fetched),
+                "analysis": entry["analysis"],
+            })
+        return articles
+
+
+def active_topics() -> List[str]:
+    """
+    Topics of interest across all profiles, most followed first
+
+    Topics are matched ignoring case; the first spelling seen is kept.
+    """
+    counts: Counter = Counter()
+    spellings: Dict[str, str] = {}
+    for profile in get_profile_manager().load_profiles().values():
+        for topic in profile.topics_of_interest:
+            key = topic_key(topic)
+            spellings.setdefault(key, topic)
+            counts[key] += 1
+    return [spellings[key] for key, _ in counts.most_common()]
+
+
+async def prewarm_topic(
+    topic: str, max_results: int = None, cache: Optional[ResearchCache] = None
+) -> dict:
+    """
+    Research one topic and store it in the research cache
+
+    Args:
+        topic: Topic of interest
+        max_results: Search results to fetch and analyse (defaults to settings)
+        cache: Cache to fill (defaults to the shared research cache)
+
+    Returns:
+        Summary: topic, query, articles and duration_s
+    """
+    cache = cache or ResearchCache()
+    max_results = max_results or settings.prewarm_max_results_per_topic
+    start = time.perf_counter()
+
+    with log_context(topic=topic), span("research.prewarm", topic=topic):
+        query = await plan_topic_query(topic)
+        results = await run_blocking(search_news, query, max_results, 7)
+        for result in results:
+            result.topic = topic
+
+        # run_fetch_agent fetches in a worker thread, so topics researched
+        # at once by prewarm_topics overlap
+        articles = await run_fetch_agent(results, max_articles=max_results, topics=[topic])
+        set_span_attributes(articles=len(articles))
+        if articles:
+            await run_blocking(cache.set, topic, query, articles)
+
+    return {
+        "topic": topic,
+        "query": query,
+        "articles": len(articles),
+        "duration_s": round(time.perf_counter() - start, 2),
+    }
+
+
+async def prewarm_topics(
+    topics: Optional[List[str]] = None,
+    max_results_per_topic: int = None,
+    concurrency: int = None,
+) -> List[dict]:
+    """
+    Pre-warm the research cache for a set of topics
+
+    Args:
+        topics: Topics to research (defaults to every active topic)
+        max_results_per_topic: Search results per topic (defaults to settings)
+        concurrency: Topics researched at once (defaults to settings)
+
+    Returns:
+        One summary per topic, in order; failed topics carry an ``error``
+    """
+    logger = logging.getLogger("newspulse.prewarm")
+    topics = topics if topics is not None else await run_blocking(active_topics)
+    cache = ResearchCache()
+    semaphore = asyncio.Semaphore(concurrency or settings.prewarm_concurrency)
+
+    async def run_one(topic: str) -> dict:
+        async with semaphore:
+            try:
+                summary = await prewarm_topic(topic, max_results_per_topic, cache)
+            except Exception as e:
+                logger.error(f"Pre-warming '{topic}' failed: {e}")
+                return {"topic": topic, "articles": 0, "error": f"{type(e).__name__}: {e}"}
+        logger.info(
+            f"Pre-warmed '{topic}': {summary['articles']} articles in {summary['duration_s']}s"
+        )
+        return summary
+
+    return await asyncio.gather(*(run_one(topic) for topic in topics))
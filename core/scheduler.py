@@ -0,0 +1,365 @@
+"""
+Delivery scheduler
+Runs each user's report so it is ready at their own delivery_time in
+their own timezone, instead of generating every report at once from a
+single cron job
+"""
+import asyncio
+import heapq
+import math
+import signal
+import time
+from collections import deque
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import List, Optional
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+from config import settings, setup_logger
+from models.atomic_io import atomic_write
+from models.schemas import UserProfile
+from models.serialization import dumps, loads
+from models.user_profile import get_profile_manager
+from agents.historical_recommender_agent import drain_background_insights
+from core.orchestrator import NewsPulseOrchestrator
+from core.research_cache import ResearchCache, prewarm_topics, topic_key
+from core.utils import run_blocking
+
+
+def parse_delivery_time(value: str) -> tuple:
+    """(hour, minute) from an "HH:MM" string"""
+    hour, minute = (int(part) for part in value.strip().split(":"))
+    if not (0 <= hour < 24 and 0 <= minute < 60):
+        raise ValueError(f"Invalid delivery time: {value}")
+    return hour, minute
+
+
+def next_delivery(profile: UserProfile, now: datetime) -> datetime:
+    """
+    The profile's next delivery time after ``now``, in UTC
+
+    Uses the profile's delivery_time and timezone, falling back to
+    settings.report_delivery_time and UTC when either is invalid.
+
+    Args:
+        profile: User profile
+        now: Current time (timezone-aware)
+
+    Returns:
+        Timezone-aware UTC datetime
+    """
+    try:
+        hour, minute = parse_delivery_time(profile.delivery_time)
+    except ValueError:
+        hour, minute = parse_delivery_time(settings.report_delivery_time)
+    try:
+        zone = ZoneInfo(profile.timezone)
+    except (ZoneInfoNotFoundError, ValueError):
+        zone = timezone.utc
+
+    local_now = now.astimezone(zone)
+    delivery = local_now.replace(hour=hour, minute=minute, second=0, microsecond=0)
+    if delivery <= local_now:
+        # Build the next day's time from the date, so DST changes keep the wall-clock time
+        tomorrow = local_now.date() + timedelta(days=1)
+        delivery = datetime(tomorrow.year, tomorrow.month, tomorrow.day, hour, minute, tzinfo=zone)
+    return delivery.astimezone(timezone.utc)
+
+
+class DurationEstimator:
+    """
+    Report duration estimate from recent measured runs
+
+    The estimate is the 90th percentile of the last ``window`` runs, or
+    settings.schedule_default_duration_s before any run is measured.
+    Durations are persisted, so a restarted scheduler keeps its estimate.
+    """
+
+    def __init__(self, path: Optional[Path] = None, window: int = 50):
+        self.path = path or settings.cache_dir / "report_durations.json"
+        self.durations: deque = deque(maxlen=window)
+        try:
+            self.durations.extend(loads(self.path.read_bytes()))
+        except (FileNotFoundError, ValueError):
+            pass
+
+    def observe(self, duration_s: float):
+        self.durations.append(round(duration_s, 3))
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        atomic_write(self.path, dumps(list(self.durations)), durable=False)
+
+    def estimate(self) -> float:
+        if not self.durations:
+            return settings.schedule_default_duration_s
+        ordered = sorted(self.durations)
+        return ordered[max(math.ceil(0.9 * len(ordered)) - 1, 0)]
+
+
+def plan_runs(
+    profiles: List[UserProfile],
+    now: datetime,
+    duration_s: float,
+    concurrency: int,
+    horizon: timedelta,
+) -> List[dict]:
+    """
+    Start times for each upcoming delivery within the horizon
+
+    Works backwards from the latest delivery: each run takes the
+    ``concurrency`` slot that is free latest and starts ``duration_s``
+    before the earlier of its delivery time and that slot's next run. Users
+    sharing a delivery time are therefore staggered back through the
+    preceding window, never more than ``concurrency`` at once, and each
+    finishes by its delivery time if runs take no longer than estimated.
+
+    Args:
+        profiles: Profiles to schedule
+        now: Current time (timezone-aware)
+        duration_s: Expected duration of one report, headroom included
+        concurrency: Reports generated at once
+        horizon: How far ahead to schedule
+
+    Returns:
+        Runs sorted by start time: user_id, deliver_at and start_at (UTC)
+    """
+    deliveries = []
+    for profile in profiles:
+        deliver_at = next_delivery(profile, now)
+        if deliver_at - now <= horizon:
+            deliveries.append((deliver_at, profile.user_id))
+    deliveries.sort(reverse=True)
+
+    # Max-heap (negated timestamps) of when each slot is next needed
+    slots = [-math.inf] * concurrency
+    runs = []
+    for deliver_at, user_id in deliveries:
+        free_until = -heapq.heappop(slots)
+        start = min(deliver_at.timestamp(), free_until) - duration_s
+        heapq.heappush(slots, -start)
+        runs.append({
+            "user_id": user_id,
+            "deliver_at": deliver_at,
+            "start_at": datetime.fromtimestamp(start, timezone.utc),
+        })
+
+    runs.sort(key=lambda run: (run["start_at"], run["user_id"]))
+    return runs
+
+
+class DeliveryScheduler:
+    """
+    Generates reports ahead of each user's delivery time and sends them on time
+
+    Plans are rebuilt every settings.schedule_replan_minutes, so new,
+    edited and deleted profiles are picked up: runs not yet started are
+    replaced by the new plan, while started runs are left to finish. Runs whose start time has passed (for
+    example after a restart) start at once. A report is generated without
+    delivery, held until its delivery time, then dispatched.
+
+    Topics of runs starting within settings.prewarm_lead_minutes are
+    researched ahead of time (see core.research_cache), so those runs
+    only need the writer and verification.
+    """
+
+    def __init__(
+        self,
+        orchestrator: Optional[NewsPulseOrchestrator] = None,
+        concurrency: int = None,
+        horizon_hours: float = None,
+        estimator: Optional[DurationEstimator] = None,
+    ):
+        self.orchestrator = orchestrator or NewsPulseOrchestrator()
+        self.concurrency = concurrency or settings.schedule_concurrency
+        self.horizon = timedelta(hours=horizon_hours or settings.schedule_horizon_hours)
+        self.estimator = estimator or DurationEstimator()
+        self.logger = setup_logger("newspulse.scheduler", level=settings.log_level)
+        self.results: List[dict] = []
+        self._semaphore = asyncio.Semaphore(self.concurrency)
+        self._queue: List[tuple] = []
+        self._started = set()
+        self._prewarmed = set()
+        self._research_cache = ResearchCache()
+        self._tasks = set()
+
+    def lead_time_s(self) -> float:
+        """Expected report duration plus settings.schedule_lead_margin"""
+        return self.estimator.estimate() * (1 + settings.schedule_lead_margin)
+
+    def plan(self, now: Optional[datetime] = None) -> List[dict]:
+        """Upcoming runs for every profile (see plan_runs)"""
+        now = now or datetime.now(timezone.utc)
+        profiles = list(get_profile_manager().load_profiles().values())
+        return plan_runs(profiles, now, self.lead_time_s(), self.concurrency, self.horizon)
+
+    def replan(self, now: Optional[datetime] = None) -> int:
+        """
+        Replace the queued (not yet started) runs with a fresh plan
+
+        A user whose delivery time or timezone changed keeps only the new
+        run, and a deleted profile's run is dropped.
+
+        Returns:
+            Number of runs added that were not queued before
+        """
+        now = now or datetime.now(timezone.utc)
+        # Started runs can't be planned again once their delivery time has passed
+        self._started = {key for key in self._started if key[1] > now}
+        self._prewarmed = {key for key in self._prewarmed if key[1] > now}
+        queued = {(user_id, deliver_at) for _, deliver_at, user_id in self._queue}
+
+        self._queue = [
+            (run["start_at"], run["deliver_at"], run["user_id"])
+            for run in self.plan(now)
+            if (run["user_id"], run["deliver_at"]) not in self._started
+        ]
+        heapq.heapify(self._queue)
+        return sum((user_id, deliver_at) not in queued for _, deliver_at, user_id in self._queue)
+
+    async def run(self, stop: Optional[asyncio.Event] = None, once: bool = False):
+        """
+        Start runs as they come due until ``stop`` is set
+
+        Args:
+            stop: Event that ends the loop; running reports are awaited
+            once: Only run what is planned now (within the horizon), then return
+        """
+        stop = stop or asyncio.Event()
+        self.replan()
+        next_replan = time.monotonic() + settings.schedule_replan_minutes * 60
+        if self._queue:
+            self.logger.info(
+                f"{len(self._queue)} reports planned; first starts at "
+                f"{self._queue[0][0]:%Y-%m-%d %H:%M} UTC "
+                f"(lead time {self.lead_time_s():.0f}s, {self.concurrency} at once)"
+            )
+
+        while not stop.is_set():
+            now = datetime.now(timezone.utc)
+            self._prewarm_upcoming(now)
+            while self._queue and self._queue[0][0] <= now:
+                _, deliver_at, user_id = heapq.heappop(self._queue)
+                self._started.add((user_id, deliver_at))
+                task = asyncio.create_task(self._run_one(user_id, deliver_at))
+                self._tasks.add(task)
+                task.add_done_callback(self._tasks.discard)
+
+            if once and not self._queue:
+                break
+            if not once and time.monotonic() >= next_replan:
+                added = self.replan()
+                next_replan = time.monotonic() + settings.schedule_replan_minutes * 60
+                if added:
+                    self.logger.info(f"Replanned: {added} new runs")
+                continue
+
+            wait_s = settings.schedule_replan_minutes * 60
+            if self._queue:
+                wait_s = min(wait_s, (self._queue[0][0] - now).total_seconds())
+            next_prewarm = self._next_prewarm()
+            if next_prewarm is not None:
+                wait_s = min(wait_s, (next_prewarm - now).total_seconds())
+            if not once:
+                wait_s = min(wait_s, max(next_replan - time.monotonic(), 0))
+            try:
+                await asyncio.wait_for(stop.wait(), timeout=max(wait_s, 0))
+            except asyncio.TimeoutError:
+                pass
+
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+        await drain_background_insights()
+
+    def _prewarm_enabled(self) -> bool:
+        return settings.research_cache_enabled and settings.prewarm_lead_minutes > 0
+
+    def _next_prewarm(self) -> Optional[datetime]:
+        """When the earliest queued run not yet pre-warmed comes within the lead time"""
+        if not self._prewarm_enabled():
+            return None
+        lead = timedelta(minutes=settings.prewarm_lead_minutes)
+        starts = [
+            start_at - lead
+            for start_at, deliver_at, user_id in self._queue
+            if (user_id, deliver_at) not in self._prewarmed
+        ]
+        return min(starts, default=None)
+
+    def _prewarm_upcoming(self, now: datetime):
+        """Research the uncached topics of runs starting within the lead time"""
+        if not self._prewarm_enabled():
+            return
+        until = now + timedelta(minutes=settings.prewarm_lead_minutes)
+        upcoming = [
+            (user_id, deliver_at)
+            for start_at, deliver_at, user_id in self._queue
+            # Runs already due start now; pre-warming them would only duplicate work
+            if now < start_at <= until and (user_id, deliver_at) not in self._prewarmed
+        ]
+        if not upcoming:
+            return
+        self._prewarmed.update(upcoming)
+
+        task = asyncio.create_task(self._prewarm([user_id for user_id, _ in upcoming]))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _prewarm(self, user_ids: List[str]):
+        def uncached_topics() -> List[str]:
+            manager = get_profile_manager()
+            topics = {}
+            for profile in manager.load_profiles(user_ids).values():
+                for topic in profile.topics_of_interest:
+                    topics.setdefault(topic_key(topic), topic)
+            return [topic for topic in topics.values() if self._research_cache.get(topic) is None]
+
+        topics = await run_blocking(uncached_topics)
+        if topics:
+            self.logger.info(f"Pre-warming {len(topics)} topics for {len(user_ids)} upcoming runs")
+            await prewarm_topics(topics)
+
+    async def _run_one(self, user_id: str, deliver_at: datetime):
+        result = {"user_id": user_id, "deliver_at": deliver_at, "report_id": None}
+        try:
+            async with self._semaphore:
+                start = time.perf_counter()
+                report = await self.orchestrator.generate_report(user_id, deliver=False)
+                self.estimator.observe(time.perf_counter() - start)
+            result["report_id"] = report.report_id
+
+            wait_s = (deliver_at - datetime.now(timezone.utc)).total_seconds()
+            if wait_s > 0:
+                await asyncio.sleep(wait_s)
+            delivery = await self.orchestrator.deliver_report(report)
+            result["status"] = delivery["status"]
+        except Exception as e:
+            self.logger.error(f"Scheduled report for {user_id} failed: {e}")
+            result["status"] = "error"
+            result["error"] = f"{type(e).__name__}: {e}"
+
+        result["delivered_at"] = datetime.now(timezone.utc)
+        lateness_s = (result["delivered_at"] - deliver_at).total_seconds()
+        result["late_s"] = round(max(lateness_s, 0), 1)
+        if result["status"] != "error" and lateness_s > 60:
+            self.logger.warning(f"Report for {user_id} delivered {lateness_s:.0f}s late")
+        self.results.append(result)
+
+
+async def run_scheduler(concurrency: int = None, horizon_hours: float = None, once: bool = False):
+    """
+    Run the scheduler until SIGINT or SIGTERM (or, with ``once``, until
+    the runs planned now are delivered)
+
+    Returns:
+        The scheduler, whose ``results`` list each finished run
+    """
+    scheduler = DeliveryScheduler(concurrency=concurrency, horizon_hours=horizon_hours)
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(sig, stop.set)
+        except NotImplementedError:
+            pass
+
+    await scheduler.run(stop, once=once)
+    return scheduler
@@ -0,0 +1,389 @@
+"""
+Service mode
+A long-running process with an HTTP API, so every report reuses the
+already-imported modules, the LLM client, the search service, the HTTP
+connection pool and the stores instead of paying a cold start
+
+Endpoints (JSON unless noted):
+    POST /reports        {"user_id": "...", "deliver": true}  -> 202 job
+    POST /feedback       FeedbackData fields                  -> 202 job
+    GET  /jobs/<job_id>  job status and result
+    GET  /health         queue and worker state
+    GET  /metrics        Prometheus text format
+"""
+import asyncio
+import json
+import logging
+import signal
+import time
+import uuid
+from collections import OrderedDict
+from datetime import datetime
+from http import HTTPStatus
+from typing import Optional, Tuple, Union
+
+from pydantic import ValidationError
+
+from config import settings, setup_logger
+from models.schemas import FeedbackData
+from models.user_profile import get_profile_manager
+from models.history_store import get_history_store
+from models.usage_store import get_usage_store
+from core import metrics
+from agents.historical_recommender_agent import drain_background_insights
+from core.orchestrator import NewsPulseOrchestrator
+from core.utils import get_llm_client, run_blocking
+from tools.fetch_tool import get_http_session
+
+
+MAX_BODY_BYTES = 1024 * 1024
+# Seconds to wait for a client to send its request
+REQUEST_TIMEOUT = 30
+
+
+class ServiceUnavailable(Exception):
+    """Raised when a job can't be accepted (queue full or shutting down)"""
+
+
+def warm_up(logger: logging.Logger):
+    """
+    Create the shared clients and stores before the first request
+
+    A missing API key is logged rather than raised, so the service can
+    still serve health checks and replayed or synthetic backends.
+    """
+    get_profile_manager()
+    get_history_store()
+    get_usage_store()
+    get_http_session()
+    try:
+        get_llm_client()
+    except ValueError as e:
+        logger.warning(f"LLM client not ready: {e}")
+
+
+class NewsPulseService:
+    """
+    Job queue and HTTP front end around one warm orchestrator
+
+    Jobs wait in a bounded queue and ``concurrency`` workers run them.
+    When the queue is full, or the service is shutting down, new jobs
+    are refused with 503 so callers can retry elsewhere or later.
+    """
+
+    def __init__(
+        self,
+        orchestrator: Optional[NewsPulseOrchestrator] = None,
+        concurrency: int = None,
+        queue_size: int = None,
+    ):
+        self.orchestrator = orchestrator or NewsPulseOrchestrator()
+        self.concurrency = concurrency or settings.service_concurrency
+        self.queue: asyncio.Queue = asyncio.Queue(queue_size or settings.service_queue_size)
+        self.jobs: "OrderedDict[str, dict]" = OrderedDict()
+        self.accepting = False
+        self.running = 0
+        self.logger = setup_logger("newspulse.service", level=settings.log_level)
+        self._workers = []
+        self._server: Optional[asyncio.AbstractServer] = None
+
+    async def start(self, host: str = None, port: int = None) -> int:
+        """
+        Warm up, start the workers and listen for requests
+
+        Returns:
+            The bound port (useful with port 0)
+        """
+        warm_up(self.logger)
+        self._workers = [
+            asyncio.create_task(self._worker(), name=f"service-worker-{i}")
+            for i in range(self.concurrency)
+        ]
+        self._server = await asyncio.start_server(
+            self._handle_connection,
+            host or settings.service_host,
+            settings.service_port if port is None else port,
+        )
+        self.accepting = True
+        bound_port = self._server.sockets[0].getsockname()[1]
+        self.logger.info(
+            f"Service listening on {host or settings.service_host}:{bound_port} "
+            f"({self.concurrency} workers, queue of {self.queue.maxsize})"
+        )
+        return bound_port
+
+    async def shutdown(self, timeout: float = None):
+        """
+        Stop accepting jobs, let queued and running ones finish, then stop
+
+        Jobs still unfinished after ``timeout`` seconds are cancelled.
+        """
+        timeout = settings.service_shutdown_timeout if timeout is None else timeout
+        self.accepting = False
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+
+        self.logger.info(
+            f"Shutting down: {self.running} running, {self.queue.qsize()} queued"
+        )
+        try:
+            await asyncio.wait_for(self.queue.join(), timeout)
+        except asyncio.TimeoutError:
+            self.logger.warning(f"Jobs still running after {timeout:.0f}s; cancelling them")
+
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+
+        # Anything left in the queue never started
+        while not self.queue.empty():
+            job, _ = self.queue.get_nowait()
+            metrics.SERVICE_JOBS_QUEUED.dec()
+            self._finish(job, "cancelled", error="Service shut down before the job started")
+            self.queue.task_done()
+
+        await drain_background_insights()
+
+    def submit(self, kind: str, run, **fields) -> dict:
+        """
+        Queue a job
+
+        Args:
+            kind: Job kind ("report" or "feedback")
+            run: Coroutine function called with no arguments; its return
+                value (a dict) becomes the job's result
+            **fields: Extra fields for the job record (e.g. user_id)
+
+        Returns:
+            The job record
+
+        Raises:
+            ServiceUnavailable: The queue is full or the service is stopping
+        """
+        if not self.accepting:
+            raise ServiceUnavailable("Service is shutting down")
+
+        job = {
+            "job_id": str(uuid.uuid4()),
+            "kind": kind,
+            "status": "queued",
+            **fields,
+            "submitted_at": datetime.now().isoformat(),
+            "started_at": None,
+            "finished_at": None,
+            "duration_s": None,
+            "result": None,
+            "error": None,
+        }
+        try:
+            self.queue.put_nowait((job, run))
+        except asyncio.QueueFull:
+            raise ServiceUnavailable(f"Job queue is full ({self.queue.maxsize} waiting)") from None
+
+        self.jobs[job["job_id"]] = job
+        metrics.SERVICE_JOBS_QUEUED.inc()
+        self._trim_jobs()
+        return job
+
+    async def _worker(self):
+        while True:
+            job, run = await self.queue.get()
+            metrics.SERVICE_JOBS_QUEUED.dec()
+            self.running += 1
+            job["status"] = "running"
+            job["started_at"] = datetime.now().isoformat()
+            start = time.perf_counter()
+            try:
+                result = await run()
+            except asyncio.CancelledError:
+                self._finish(job, "cancelled", start, error="Cancelled at shutdown")
+                raise
+            except Exception as e:
+                self.logger.error(f"Job {job['job_id']} ({job['kind']}) failed: {e}")
+                self._finish(job, "error", start, error=f"{type(e).__name__}: {e}")
+            else:
+                self._finish(job, "done", start, result=result)
+            finally:
+                self.running -= 1
+                self.queue.task_done()
+
+    def _finish(self, job: dict, status: str, start: float = None, result=None, error: str = None):
+        job["status"] = status
+        job["finished_at"] = datetime.now().isoformat()
+        if start is not None:
+            job["duration_s"] = round(time.perf_counter() - start, 3)
+        job["result"] = result
+        job["error"] = error
+        metrics.SERVICE_JOBS.labels(job["kind"], status).inc()
+
+    def _trim_jobs(self):
+        """Forget the oldest finished jobs beyond settings.service_job_history"""
+        excess = len(self.jobs) - settings.service_job_history
+        if excess <= 0:
+            return
+        for job_id in [
+            job_id for job_id, job in self.jobs.items()
+            if job["status"] in ("done", "error", "cancelled")
+        ][:excess]:
+            del self.jobs[job_id]
+
+    def submit_report(self, user_id: str, deliver: bool = True) -> dict:
+        async def run():
+            report = await self.orchestrator.generate_report(user_id, deliver=deliver)
+            return {
+                "report_id": report.report_id,
+                "total_articles": report.total_articles,
+                "topics_covered": report.topics_covered,
+                "usage": report.usage,
+            }
+
+        return self.submit("report", run, user_id=user_id, deliver=deliver)
+
+    def submit_feedback(self, feedback: FeedbackData) -> dict:
+        async def run():
+            return await self.orchestrator.process_feedback(feedback)
+
+        return self.submit(
+            "feedback", run, user_id=feedback.user_id, report_id=feedback.report_id
+        )
+
+    def health(self) -> dict:
+        return {
+            "status": "ok" if self.accepting else "stopping",
+            "running": self.running,
+            "queued": self.queue.qsize(),
+            "workers": self.concurrency,
+            "queue_size": self.queue.maxsize,
+        }
+
+    async def handle(self, method: str, path: str, body: bytes) -> Tuple[int, Union[dict, str]]:
+        """
+        Route one request
+
+        Returns:
+            HTTP status and the response: a dict (sent as JSON) or text
+        """
+        path = path.split("?", 1)[0].rstrip("/") or "/"
+
+        if method == "GET" and path == "/health":
+            return HTTPStatus.OK, self.health()
+        if method == "GET" and path == "/metrics":
+            return HTTPStatus.OK, metrics.render()
+        if method == "GET" and path.startswith("/jobs/"):
+            job = self.jobs.get(path[len("/jobs/"):])
+            if job is None:
+                return HTTPStatus.NOT_FOUND, {"error": "Unknown job"}
+            return HTTPStatus.OK, job
+
+        if method == "POST" and path in ("/reports", "/feedback"):
+            try:
+                payload = json.loads(body or b"{}")
+            except ValueError:
+                return HTTPStatus.BAD_REQUEST, {"error": "Body must be JSON"}
+            if not isinstance(payload, dict):
+                return HTTPStatus.BAD_REQUEST, {"error": "Body must be a JSON object"}
+
+            try:
+                if path == "/reports":
+                    user_id = payload.get("user_id")
+                    if not user_id:
+                        return HTTPStatus.BAD_REQUEST, {"error": "user_id is required"}
+                    profile = await run_blocking(get_profile_manager().load_profile, user_id)
+                    if profile is None:
+                        return HTTPStatus.NOT_FOUND, {"error": f"No profile for user_id: {user_id}"}
+                    job = self.submit_report(user_id, deliver=bool(payload.get("deliver", True)))
+                else:
+                    try:
+                        feedback = FeedbackData.model_validate(payload)
+                    except ValidationError as e:
+                        return HTTPStatus.BAD_REQUEST, {"error": str(e)}
+                    job = self.submit_feedback(feedback)
+            except ServiceUnavailable as e:
+                return HTTPStatus.SERVICE_UNAVAILABLE, {"error": str(e)}
+            return HTTPStatus.ACCEPTED, job
+
+        if path in ("/health", "/metrics", "/reports", "/feedback") or path.startswith("/jobs/"):
+            return HTTPStatus.METHOD_NOT_ALLOWED, {"error": f"{method} not allowed on {path}"}
+        return HTTPStatus.NOT_FOUND, {"error": "Not found"}
+
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """Serve one HTTP/1.1 request per connection"""
+        try:
+            try:
+                method, path, body = await asyncio.wait_for(_read_request(reader), REQUEST_TIMEOUT)
+            except (ValueError, asyncio.IncompleteReadError, asyncio.TimeoutError) as e:
+                status, response = HTTPStatus.BAD_REQUEST, {"error": str(e) or "Malformed request"}
+            else:
+                try:
+                    status, response = await self.handle(method, path, body)
+                except Exception as e:
+                    self.logger.error(f"{method} {path} failed: {e}")
+                    status, response = HTTPStatus.INTERNAL_SERVER_ERROR, {"error": str(e)}
+
+            if isinstance(response, str):
+                content, content_type = response.encode("utf-8"), metrics.CONTENT_TYPE
+            else:
+                content, content_type = json.dumps(response, default=str).encode("utf-8"), "application/json"
+            status = HTTPStatus(status)
+            writer.write(
+                f"HTTP/1.1 {status.value} {status.phrase}\r\n"
+                f"Content-Type: {content_type}\r\n"
+                f"Content-Length: {len(content)}\r\n"
+                "Connection: close\r\n\r\n".encode("latin-1") + content
+            )
+            await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+
+async def _read_request(reader: asyncio.StreamReader) -> Tuple[str, str, bytes]:
+    request_line = (await reader.readline()).decode("latin-1").strip()
+    parts = request_line.split(" ")
+    if len(parts) != 3:
+        raise ValueError("Malformed request line")
+    method, path, _ = parts
+
+    headers = {}
+    while True:
+        line = (await reader.readline()).decode("latin-1")
+        if line in ("\r\n", "\n", ""):
+            break
+        name, _, value = line.partition(":")
+        headers[name.strip().lower()] = value.strip()
+
+    length = int(headers.get("content-length") or 0)
+    if length > MAX_BODY_BYTES:
+        raise ValueError(f"Body larger than {MAX_BODY_BYTES} bytes")
+    body = await reader.readexactly(length) if length else b""
+    return method.upper(), path, body
+
+
+async def run_service(host: str = None, port: int = None, concurrency: int = None):
+    """
+    Run the service until SIGINT or SIGTERM, then shut down gracefully
+
+    Args:
+        host: Interface to bind (default: SERVICE_HOST)
+        port: Port to listen on (default: SERVICE_PORT)
+        concurrency: Jobs run at once (default: SERVICE_CONCURRENCY)
+    """
+    service = NewsPulseService(concurrency=concurrency)
+    await service.start(host, port)
+
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(sig, stop.set)
+        except NotImplementedError:
+            # Windows: Ctrl+C raises KeyboardInterrupt instead
+            pass
+
+    try:
+        await stop.wait()
+    finally:
+        await service.shutdown()
+    return service
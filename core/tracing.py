@@ -0,0 +1,288 @@
+"""
+Tracing
+Nested timing spans exported as OpenTelemetry-shaped JSON lines
+"""
+import atexit
+import contextvars
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+from config import settings
+from core.metrics import observe_span
+
+
+_current_span: contextvars.ContextVar = contextvars.ContextVar(
+    "newspulse_span", default=None
+)
+
+
+class Span:
+    """
+    A timed operation within a trace
+
+    Spans nest through a context variable, so a span opened inside
+    another (in the same task, a child task or an executor thread started
+    with ``run_blocking``) becomes its child.
+    """
+
+    __slots__ = (
+        "name", "trace_id", "span_id", "parent_id",
+        "start_ns", "end_ns", "attributes", "status", "status_message",
+    )
+
+    def __init__(self, name: str, parent: Optional["Span"] = None, **attributes):
+        self.name = name
+        self.trace_id = parent.trace_id if parent else os.urandom(16).hex()
+        self.span_id = os.urandom(8).hex()
+        self.parent_id = parent.span_id if parent else None
+        self.start_ns = time.time_ns()
+        self.end_ns: Optional[int] = None
+        self.attributes: Dict[str, Any] = {}
+        self.status = "UNSET"
+        self.status_message = ""
+        self.set_attributes(**attributes)
+
+    @property
+    def duration(self) -> float:
+        """Duration in seconds (so far, if still open)"""
+        end_ns = self.end_ns or time.time_ns()
+        return (end_ns - self.start_ns) / 1e9
+
+    def set_attribute(self, key: str, value: Any):
+        if value is not None:
+            self.attributes[key] = value
+
+    def set_attributes(self, **attributes):
+        for key, value in attributes.items():
+            self.set_attribute(key, value)
+
+    def set_error(self, error: BaseException):
+        self.status = "ERROR"
+        self.status_message = f"{type(error).__name__}: {error}"
+
+    def to_otlp(self) -> dict:
+        """The span in OTLP/JSON span shape"""
+        return {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "parentSpanId": self.parent_id or "",
+            "name": self.name,
+            "kind": "SPAN_KIND_INTERNAL",
+            "startTimeUnixNano": str(self.start_ns),
+            "endTimeUnixNano": str(self.end_ns or time.time_ns()),
+            "attributes": [
+                {"key": key, "value": _otlp_value(value)}
+                for key, value in self.attributes.items()
+            ],
+            "status": {
+                "code": f"STATUS_CODE_{self.status}",
+                "message": self.status_message,
+            },
+        }
+
+
+class JsonLinesSpanExporter:
+    """
+    Appends finished spans to a JSON-lines file
+
+    Spans are buffered and written when a trace's root span ends (or the
+    buffer fills), so the write happens once per report rather than once
+    per span.
+    """
+
+    def __init__(self, path: Path, buffer_size: int = 256):
+        self.path = Path(path)
+        self.buffer_size = buffer_size
+        self._buffer: List[dict] = []
+        self._lock = threading.Lock()
+
+    def export(self, span: Span):
+        with self._lock:
+            self._buffer.append({
+                "resource": {"service.name": "newspulse"},
+                **span.to_otlp(),
+            })
+            if span.parent_id is None or len(self._buffer) >= self.buffer_size:
+                self._flush_locked()
+
+    def flush(self):
+        with self._lock:
+            self._flush_locked()
+
+    def _flush_locked(self):
+        if not self._buffer:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.path, "a", encoding="utf-8") as f:
+            for entry in self._buffer:
+                f.write(json.dumps(entry, default=str) + "\n")
+        self._buffer.clear()
+
+
+_exporter: Optional[JsonLinesSpanExporter] = None
+_exporter_lock = threading.Lock()
+
+
+def get_exporter() -> Optional[JsonLinesSpanExporter]:
+    """Exporter for settings.trace_path, or None when tracing export is off"""
+    global _exporter
+    if settings.trace_path is None:
+        return None
+    with _exporter_lock:
+        if _exporter is None or _exporter.path != Path(settings.trace_path):
+            if _exporter is not None:
+                _exporter.flush()
+            _exporter = JsonLinesSpanExporter(settings.trace_path)
+        return _exporter
+
+
+def current_span() -> Optional[Span]:
+    """The innermost open span, if any"""
+    return _current_span.get()
+
+
+def set_span_attributes(**attributes):
+    """Add attributes to the innermost open span (no-op outside a span)"""
+    current = _current_span.get()
+    if current is not None:
+        current.set_attributes(**attributes)
+
+
+def start_span(name: str, **attributes) -> Span:
+    """
+    Open a span without making it current
+
+    For work whose lifetime does not follow a block, such as a stream
+    consumed elsewhere; close it with ``end_span``.
+
+    Args:
+        name: Span name
+        **attributes: Initial attributes (None values are skipped)
+
+    Returns:
+        The open Span, a child of the current span
+    """
+    return Span(name, parent=_current_span.get(), **attributes)
+
+
+def end_span(current: Span, error: Optional[BaseException] = None):
+    """
+    Close a span and export it
+
+    Args:
+        current: Span to close
+        error: Exception that ended the operation, if any
+    """
+    if current.end_ns is not None:
+        return
+    if error is not None:
+        current.set_error(error)
+    elif current.status == "UNSET":
+        current.status = "OK"
+    current.end_ns = time.time_ns()
+    observe_span(current)
+
+    exporter = get_exporter()
+    if exporter is not None:
+        exporter.export(current)
+
+
+@contextmanager
+def span(name: str, **attributes) -> Iterator[Span]:
+    """
+    Record a span around a block
+
+    The span is current for the block, so spans opened inside it become
+    its children. It is marked as an error if the block raises
+    (cancellation included) and exported when it ends.
+
+    Args:
+        name: Span name, e.g. "llm.generate_content"
+        **attributes: Initial attributes (None values are skipped)
+
+    Yields:
+        The open Span, for adding attributes
+    """
+    current = start_span(name, **attributes)
+    token = _current_span.set(current)
+    try:
+        yield current
+    except BaseException as e:
+        _current_span.reset(token)
+        end_span(current, e)
+        raise
+    _current_span.reset(token)
+    end_span(current)
+
+
+def load_trace(path: Path, report_id: str = None) -> List[dict]:
+    """
+    Load the spans of one trace from a JSON-lines export
+
+    Args:
+        path: Span export file
+        report_id: Report whose trace to load (defaults to the latest trace)
+
+    Returns:
+        Spans of the trace, in export order
+    """
+    spans = [json.loads(line) for line in Path(path).read_text().splitlines() if line]
+    roots = [s for s in spans if not s["parentSpanId"]]
+    if report_id is not None:
+        roots = [
+            s for s in roots
+            if {"key": "report_id", "value": {"stringValue": report_id}} in s["attributes"]
+        ]
+    if not roots:
+        return []
+    trace_id = roots[-1]["traceId"]
+    return [s for s in spans if s["traceId"] == trace_id]
+
+
+def critical_path(spans: List[dict]) -> List[dict]:
+    """
+    The chain of spans that determined a trace's end time
+
+    Starting from the root, repeatedly follows the child that finished
+    last; shortening anything else would not make the report faster.
+
+    Args:
+        spans: Spans of one trace
+
+    Returns:
+        Spans from the root down
+    """
+    children: Dict[str, List[dict]] = {}
+    for entry in spans:
+        children.setdefault(entry["parentSpanId"], []).append(entry)
+
+    path = []
+    level = children.get("", [])
+    while level:
+        last = max(level, key=lambda entry: int(entry["endTimeUnixNano"]))
+        path.append(last)
+        level = children.get(last["spanId"], [])
+    return path
+
+
+def _otlp_value(value: Any) -> dict:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    if isinstance(value, (list, tuple)):
+        return {"arrayValue": {"values": [_otlp_value(v) for v in value]}}
+    return {"stringValue": str(value)}
+
+
+@atexit.register
+def _flush_on_exit():
+    if _exporter is not None:
+        _exporter.flush()
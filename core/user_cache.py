@@ -0,0 +1,60 @@
+"""
+Per-user record cache
+Small JSON records, such as an LLM analysis and the digest of the inputs
+it was generated from, stored one file per user
+"""
+from pathlib import Path
+from typing import Optional
+
+from config import settings
+from models.atomic_io import atomic_write
+from models.serialization import dumps, loads
+
+
+class UserRecordCache:
+    """
+    One JSON record per user under ``settings.cache_dir / name``
+
+    The directory is resolved on each call, so a changed
+    settings.cache_dir (e.g. in tests and benchmarks) takes effect.
+    """
+
+    def __init__(self, name: str):
+        """
+        Initialize the cache
+
+        Args:
+            name: Subdirectory of settings.cache_dir
+        """
+        self.name = name
+
+    @property
+    def cache_dir(self) -> Path:
+        return settings.cache_dir / self.name
+
+    def load(self, user_id: str) -> Optional[dict]:
+        """
+        Load a user's record
+
+        Args:
+            user_id: User ID
+
+        Returns:
+            The stored record, or None if missing or unreadable
+        """
+        try:
+            with open(self.cache_dir / f"{user_id}.json", "rb") as f:
+                return loads(f.read())
+        except (OSError, ValueError):
+            return None
+
+    def save(self, user_id: str, record: dict):
+        """
+        Store a user's record, replacing any earlier one
+
+        Args:
+            user_id: User ID
+            record: JSON-serialisable record
+        """
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        atomic_write(self.cache_dir / f"{user_id}.json", dumps(record, pretty=False), durable=False)
@@ -1,15 +1,58 @@
 """
 Utility functions for NewsPulse AI
 """
+import asyncio
+import contextvars
+import functools
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import Any, Callable, Iterator
+
 from google import genai
 from google.genai import types
-from config import settings
+from config import settings, get_log_context
+from core.tracing import end_span, span, start_span
+from core.llm_backends import get_backend
+
+
+# Event loops whose default executor has been sized by run_blocking
+_sized_loops = weakref.WeakSet()
+
+
+async def run_blocking(func: Callable[..., Any], *args, **kwargs) -> Any:
+    """
+    Run a blocking call in the default executor without blocking the event loop
+
+    Unlike ``loop.run_in_executor``, the caller's context variables (such
+    as the logging context) are carried into the worker thread. The
+    loop's default executor is sized by settings.blocking_workers, since
+    the calls are I/O-bound and every report in flight makes them.
+
+    Args:
+        func: Blocking callable
+        *args: Positional arguments for func
+        **kwargs: Keyword arguments for func
+
+    Returns:
+        func's return value
+    """
+    loop = asyncio.get_running_loop()
+    if loop not in _sized_loops:
+        loop.set_default_executor(ThreadPoolExecutor(max_workers=settings.blocking_workers))
+        _sized_loops.add(loop)
+    context = contextvars.copy_context()
+    call = functools.partial(context.run, func, *args, **kwargs)
+    return await loop.run_in_executor(None, call)
 
 
 def get_genai_client():
     """
     Get configured Google genai client
 
+    One client is kept per API key, so its connection pool stays warm
+    across calls (and across reports in service mode).
+
     Returns:
         Configured genai.Client instance
     """
@@ -19,8 +62,23 @@ def get_genai_client():
             "Please set GOOGLE_API_KEY in your .env file"
         )
 
-    client = genai.Client(api_key=settings.google_api_key)
-    return client
+    return _genai_client(settings.google_api_key)
+
+
+@lru_cache(maxsize=None)
+def _genai_client(api_key: str):
+    return genai.Client(api_key=api_key)
+
+
+def get_llm_client():
+    """
+    Get the client for the configured LLM backend (settings.llm_backend)
+
+    Returns:
+        The live genai client, or a record/replay/synthetic stand-in with
+        the same ``models.generate_content(_stream)`` interface
+    """
+    return get_backend(settings.llm_backend, get_genai_client)
 
 
 def generate_content(
@@ -41,21 +99,139 @@ def generate_content(
     Returns:
         Generated text response
     """
-    client = get_genai_client()
+    client = get_llm_client()
+    request = _build_request(prompt, system_instruction, temperature, max_tokens)
 
+    with span("llm.generate_content", **_llm_span_attributes(request)) as current:
+        response = client.models.generate_content(**request)
+        current.set_attributes(**_usage_attributes(response))
+        _record_usage(request["model"], response, current.duration)
+
+    return response.text
+
+
+def generate_content_stream(
+    prompt: str,
+    system_instruction: str = None,
+    temperature: float = None,
+    max_tokens: int = None,
+) -> Iterator[str]:
+    """
+    Generate content using Gemini model, yielding text as it is produced
+
+    Args:
+        prompt: The prompt to send to the model
+        system_instruction: Optional system instruction to prepend
+        temperature: Sampling temperature (default from settings)
+        max_tokens: Maximum tokens to generate (default from settings)
+
+    Yields:
+        Text chunks in generation order
+    """
+    client = get_llm_client()
+    request = _build_request(prompt, system_instruction, temperature, max_tokens)
+
+    # The consumer may stop early, possibly from another thread, so the
+    # span is not made current
+    current = start_span("llm.generate_content_stream", **_llm_span_attributes(request))
+    error = None
+    last_usage = None
+    try:
+        stream = client.models.generate_content_stream(**request)
+
+        chunks = 0
+        for chunk in stream:
+            chunks += 1
+            if chunk.usage_metadata is not None:
+                last_usage = chunk
+                current.set_attributes(**_usage_attributes(chunk))
+            if chunk.text:
+                if "first_chunk_s" not in current.attributes:
+                    current.set_attribute("first_chunk_s", round(current.duration, 3))
+                yield chunk.text
+        current.set_attribute("chunks", chunks)
+    except GeneratorExit:
+        current.set_attribute("closed_early", True)
+        raise
+    except BaseException as e:
+        error = e
+        raise
+    finally:
+        # Tokens of an abandoned stream are still billed up to where it stopped
+        if last_usage is not None:
+            _record_usage(request["model"], last_usage, current.duration)
+        end_span(current, error)
+
+
+def _llm_span_attributes(request: dict) -> dict:
+    """Span attributes describing an LLM request"""
+    config = request["config"]
+    return {
+        "llm.model": request["model"],
+        "llm.temperature": config.temperature,
+        "llm.max_output_tokens": config.max_output_tokens,
+        "llm.prompt_chars": len(request["contents"]),
+        "agent": get_log_context()["agent"],
+    }
+
+
+def _usage_attributes(response) -> dict:
+    """Token counts from a response's usage metadata"""
+    usage = getattr(response, "usage_metadata", None)
+    if usage is None:
+        return {}
+    return {
+        "llm.prompt_tokens": usage.prompt_token_count,
+        "llm.output_tokens": usage.candidates_token_count,
+        "llm.total_tokens": usage.total_token_count,
+    }
+
+
+def _record_usage(model: str, response, latency_s: float):
+    """Store a call's token usage, tagged with the current logging context"""
+    usage = getattr(response, "usage_metadata", None)
+    if usage is None or not settings.usage_tracking_enabled:
+        return
+
+    from models.usage_store import get_usage_store
+
+    # Simulated calls are kept apart from billed ones
+    if settings.llm_backend in ("replay", "synthetic"):
+        model = f"{settings.llm_backend}:{model}"
+
+    context = get_log_context()
+    get_usage_store().record(
+        model=model,
+        prompt_tokens=usage.prompt_token_count,
+        output_tokens=usage.candidates_token_count,
+        total_tokens=usage.total_token_count,
+        latency_s=latency_s,
+        user_id=context["user_id"],
+        report_id=context["report_id"],
+        agent=context["agent"],
+        phase=context["phase"],
+        topic=context["topic"],
+    )
+
+
+def _build_request(
+    prompt: str,
+    system_instruction: str = None,
+    temperature: float = None,
+    max_tokens: int = None,
+) -> dict:
+    """Build the keyword arguments for a Gemini generate call"""
     # Combine system instruction with prompt if provided
     if system_instruction:
         full_prompt = f"{system_instruction}\n\n{prompt}"
     else:
         full_prompt = prompt
 
-    response = client.models.generate_content(
+    return dict(
         model=settings.gemini_model,
         contents=full_prompt,
         config=types.GenerateContentConfig(
             temperature=temperature or settings.temperature,
             max_output_tokens=max_tokens or settings.max_tokens,
-        )
+        ),
     )
-
-    return response.text
@@ -0,0 +1,120 @@
+"""
+Verification result cache
+Avoids re-verifying identical articles across loop retries, users and runs
+"""
+import hashlib
+import json
+import time
+from pathlib import Path
+from typing import Dict, Optional
+
+from config import settings
+from models.schemas import Article, VerificationResult
+from models.atomic_io import atomic_write
+from models.serialization import dumps, loads
+from core.metrics import record_cache_lookup
+
+
+# Fields the Verification Agent sees; any change to them needs a new audit
+VERIFIED_FIELDS = {"title", "summary", "priority", "key_insights", "citations"}
+
+
+def article_hash(article: Article) -> str:
+    """
+    Canonical hash of an article's verified fields
+
+    Args:
+        article: Article to hash
+
+    Returns:
+        Hex SHA-256 digest
+    """
+    payload = article.model_dump(mode="json", include=VERIFIED_FIELDS)
+    canonical = json.dumps(payload, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+class VerificationCache:
+    """
+    Two-level cache of VerificationResults keyed by article hash
+
+    Results are held in memory for the lifetime of the cache (one
+    verification loop) and persisted to disk, where they expire after
+    the configured TTL.
+    """
+
+    def __init__(self, cache_dir: Optional[Path] = None, ttl_hours: float = None):
+        """
+        Initialize the cache
+
+        Args:
+            cache_dir: Directory for persisted results (defaults to settings)
+            ttl_hours: Lifetime of persisted results (defaults to settings)
+        """
+        self.cache_dir = cache_dir or settings.cache_dir / "verification"
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.ttl_seconds = (
+            ttl_hours if ttl_hours is not None else settings.verification_cache_ttl_hours
+        ) * 3600
+        self._memory: Dict[str, VerificationResult] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def _path(self, key: str) -> Path:
+        return self.cache_dir / f"{key}.json"
+
+    def get(self, article: Article) -> Optional[VerificationResult]:
+        """
+        Look up the verification result for an article
+
+        Args:
+            article: Article to look up
+
+        Returns:
+            Cached VerificationResult, or None if not cached or expired
+        """
+        key = article_hash(article)
+        result = self._memory.get(key)
+
+        if result is None:
+            result = self._load(key)
+            if result is not None:
+                self._memory[key] = result
+
+        if result is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        record_cache_lookup("verification", result is not None)
+        return result
+
+    def set(self, article: Article, result: VerificationResult):
+        """
+        Store the verification result for an article
+
+        Args:
+            article: Verified article
+            result: Its VerificationResult
+        """
+        key = article_hash(article)
+        self._memory[key] = result
+
+        record = {"cached_at": time.time(), "result": result.model_dump(mode="json")}
+        atomic_write(self._path(key), dumps(record, pretty=False), durable=False)
+
+    def _load(self, key: str) -> Optional[VerificationResult]:
+        path = self._path(key)
+        if not path.exists():
+            return None
+
+        try:
+            with open(path, "rb") as f:
+                record = loads(f.read())
+        except (OSError, ValueError):
+            return None
+
+        if time.time() - record.get("cached_at", 0) > self.ttl_seconds:
+            path.unlink(missing_ok=True)
+            return None
+
+        return VerificationResult(**record["result"])
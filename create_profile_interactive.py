@@ -29,8 +29,8 @@ def main():
         return 1
 
     # Check if profile already exists
-    from models.user_profile import UserProfileManager
-    manager = UserProfileManager()
+    from models.user_profile import get_profile_manager
+    manager = get_profile_manager()
     existing = manager.load_profile(user_id)
 
     if existing:
@@ -5,17 +5,37 @@ Self-Correcting AI Analyst for Executives
 
 Usage:
     python main.py create-profile    # Create a new user profile
-    python main.py generate <user_id>  # Generate report for a user
+    python main.py generate <user_id> [--profile]  # Generate report for a user
+    python main.py batch [user_id ...] [--concurrency N]  # Reports for many users
+    python main.py serve [--port 8080]  # Run the HTTP API with warm clients
+    python main.py schedule [--dry-run]  # Deliver each report at its profile's delivery time
+    python main.py prewarm [--topics T ...]  # Research active topics ahead of delivery
     python main.py feedback <report_id> <user_id> <rating>  # Submit feedback
+    python main.py import-history  # Import legacy JSON history files
+    python main.py trace [--report-id ID]  # Show a report's spans and critical path
+    python main.py stats [--days N] [--by agent]  # Show LLM token usage and cost
 """
 import asyncio
 import sys
+import time
 import argparse
-from datetime import datetime
+from contextlib import nullcontext
+from datetime import datetime, timedelta
 
+from config import settings, configure_logging
 from core.orchestrator import NewsPulseOrchestrator
 from agents.feedback_agent import collect_feedback
-from models.user_profile import UserProfileManager
+from agents.historical_recommender_agent import drain_background_insights
+from models.user_profile import get_profile_manager
+from models.history_store import get_history_store
+from core.tracing import critical_path, load_trace
+from core.profiling import RunProfiler
+from core.metrics import start_metrics_server, write_metrics
+from core.service import run_service
+from core.scheduler import DeliveryScheduler, run_scheduler
+from core.research_cache import prewarm_topics
+from models.serialization import dump_model
+from models.usage_store import GROUP_COLUMNS, get_usage_store
 
 
 def create_profile_interactive():
@@ -62,19 +82,28 @@ def create_profile_interactive():
     print(f"  Delivery: {delivery_email}")
 
 
-async def generate_report(user_id: str, deliver: bool = True):
+async def generate_report(user_id: str, deliver: bool = True, profile: bool = False):
     """Generate a report for a user"""
     print(f"\n=== NewsPulse AI - Generating Report for {user_id} ===\n")
 
     orchestrator = NewsPulseOrchestrator()
+    profiler = RunProfiler(interval=settings.profile_sample_interval_ms / 1000) if profile else None
+    report = None
 
     try:
-        report = await orchestrator.generate_report(user_id, deliver=deliver)
+        with profiler or nullcontext():
+            report = await orchestrator.generate_report(user_id, deliver=deliver)
 
         print(f"\n✓ Report generated successfully!")
         print(f"  Report ID: {report.report_id}")
         print(f"  Articles: {report.total_articles}")
         print(f"  Topics: {', '.join(report.topics_covered)}")
+        if report.usage:
+            print(
+                f"  LLM usage: {report.usage['calls']} calls, "
+                f"{report.usage['total_tokens']} tokens, "
+                f"~${report.usage['cost_usd']:.4f}"
+            )
 
         if deliver:
             print(f"  Status: Delivered via email")
@@ -87,6 +116,105 @@ async def generate_report(user_id: str, deliver: bool = True):
         print(f"\n✗ Error generating report: {e}")
         raise
 
+    finally:
+        # History insights refresh off the report's critical path; let it finish
+        await drain_background_insights()
+        # Slow and failing runs are the ones worth profiling, so write either way
+        if profiler is not None:
+            write_profile(profiler, orchestrator, user_id, report)
+
+
+def write_profile(profiler: RunProfiler, orchestrator: NewsPulseOrchestrator, user_id: str, report=None):
+    """Write profiling artifacts (and the report) to data/reports/<report_id>/"""
+    name = report.report_id if report else f"failed-{user_id}-{datetime.now():%Y%m%d-%H%M%S}"
+    output_dir = settings.reports_dir / name
+    paths = profiler.write(
+        output_dir,
+        timings=orchestrator.last_timings,
+        title=f"NewsPulse profile: {user_id} ({name})",
+    )
+    if report is not None:
+        (output_dir / "report.json").write_text(dump_model(report, pretty=True), encoding="utf-8")
+
+    print(f"\n  Profile: {profiler.duration:.2f}s, {profiler.samples} samples")
+    for step, timing in sorted(orchestrator.last_timings.items(), key=lambda item: item[1]["start"]):
+        print(f"    {step:<22} {timing['duration']:>7.2f}s")
+    print(f"  Summary: {paths['html']}")
+    print(f"  Stacks (flamegraph.pl / speedscope): {paths['folded']}")
+
+
+async def generate_batch(user_ids: list, deliver: bool = True, concurrency: int = None):
+    """Generate reports for several users (all profiles by default)"""
+    user_ids = user_ids or get_profile_manager().list_profiles()
+    concurrency = concurrency or settings.batch_concurrency
+    print(f"\n=== NewsPulse AI - Batch of {len(user_ids)} reports ({concurrency} at a time) ===\n")
+    if not user_ids:
+        print("No profiles found.")
+        return []
+
+    orchestrator = NewsPulseOrchestrator()
+    start = time.perf_counter()
+    results = await orchestrator.generate_batch(user_ids, deliver=deliver, concurrency=concurrency)
+    elapsed = time.perf_counter() - start
+
+    durations = sorted(result["duration_s"] for result in results if result["status"] == "ok")
+    failed = [result for result in results if result["status"] == "error"]
+
+    print(f"\n✓ {len(durations)} reports generated, {len(failed)} failed in {elapsed:.1f}s")
+    if durations:
+        print(f"  Throughput: {len(durations) / elapsed * 60:.1f} reports/min")
+        print(f"  Latency: median {durations[len(durations) // 2]:.1f}s, max {durations[-1]:.1f}s")
+    for result in failed:
+        print(f"  ✗ {result['user_id']}: {result['error']}")
+    if settings.metrics_path:
+        print(f"  Metrics: {write_metrics(settings.metrics_path)}")
+
+    return results
+
+
+def show_schedule(concurrency: int = None, horizon_hours: float = None):
+    """Print when each upcoming report will start and be delivered"""
+    scheduler = DeliveryScheduler(concurrency=concurrency, horizon_hours=horizon_hours)
+    runs = scheduler.plan()
+    print(f"\n=== NewsPulse AI - Schedule ({len(runs)} reports) ===\n")
+    print(
+        f"Lead time {scheduler.lead_time_s():.0f}s per report "
+        f"({len(scheduler.estimator.durations)} measured runs), {scheduler.concurrency} at once\n"
+    )
+    if not runs:
+        print("No deliveries within the horizon.")
+        return
+
+    profiles = get_profile_manager().load_profiles([run["user_id"] for run in runs])
+    print(f"{'user_id':<24}{'starts (UTC)':<20}{'delivers (UTC)':<20}local")
+    for run in runs:
+        profile = profiles[run["user_id"]]
+        print(
+            f"{run['user_id']:<24}{run['start_at']:%m-%d %H:%M:%S}{'':<5}"
+            f"{run['deliver_at']:%m-%d %H:%M}{'':<8}{profile.delivery_time} {profile.timezone}"
+        )
+
+
+async def prewarm(topics: list = None, concurrency: int = None):
+    """Research topics into the research cache and print a summary"""
+    print(f"\n=== NewsPulse AI - Pre-warm Research ===\n")
+    start = time.perf_counter()
+    summaries = await prewarm_topics(topics or None, concurrency=concurrency)
+    if not summaries:
+        print("No active topics.")
+        return summaries
+
+    for summary in summaries:
+        if "error" in summary:
+            print(f"  ✗ {summary['topic']}: {summary['error']}")
+        else:
+            print(f"  ✓ {summary['topic']}: {summary['articles']} articles ({summary['duration_s']}s)")
+    print(
+        f"\n{len(summaries)} topics in {time.perf_counter() - start:.1f}s; "
+        f"cached for {settings.research_cache_ttl_hours:g}h"
+    )
+    return summaries
+
 
 async def submit_feedback(report_id: str, user_id: str, rating: int):
     """Submit feedback for a report"""
@@ -134,18 +262,77 @@ async def submit_feedback(report_id: str, user_id: str, rating: int):
 
 def list_profiles():
     """List all user profiles"""
-    manager = UserProfileManager()
-    profiles = manager.list_profiles()
+    profiles = get_profile_manager().load_profiles()
 
     print("\n=== User Profiles ===\n")
     if not profiles:
         print("No profiles found.")
     else:
-        for user_id in profiles:
-            profile = manager.load_profile(user_id)
+        for user_id, profile in sorted(profiles.items()):
             print(f"  - {user_id}: {profile.name} ({profile.role} at {profile.company})")
 
 
+def import_history():
+    """Import legacy JSON history files into the history store"""
+    imported = get_history_store().import_all()
+
+    print("\n=== Import History ===\n")
+    if not imported:
+        print("No legacy history files found.")
+    else:
+        for user_id, count in imported.items():
+            print(f"  - {user_id}: {count} reports imported")
+
+
+def show_trace(report_id: str = None):
+    """Print a report's span tree and its critical path"""
+    print("\n=== Trace ===\n")
+    if settings.trace_path is None or not settings.trace_path.exists():
+        print("No traces recorded. Set TRACE_PATH to export spans.")
+        return
+
+    spans = load_trace(settings.trace_path, report_id)
+    if not spans:
+        print("No matching trace found.")
+        return
+
+    critical = {entry["spanId"] for entry in critical_path(spans)}
+    children = {}
+    for entry in spans:
+        children.setdefault(entry["parentSpanId"], []).append(entry)
+
+    def show(entry, depth):
+        duration = (int(entry["endTimeUnixNano"]) - int(entry["startTimeUnixNano"])) / 1e9
+        marker = "*" if entry["spanId"] in critical else " "
+        status = " [error]" if entry["status"]["code"] == "STATUS_CODE_ERROR" else ""
+        print(f"{marker} {'  ' * depth}{entry['name']:<{40 - 2 * depth}} {duration:8.2f}s{status}")
+        for child in sorted(children.get(entry["spanId"], []), key=lambda e: int(e["startTimeUnixNano"])):
+            show(child, depth + 1)
+
+    for root in children.get("", []):
+        show(root, 0)
+    print("\n* = critical path")
+
+
+def show_stats(days: int = 7, group_by: str = "agent"):
+    """Print LLM token usage and estimated cost, grouped by a tag"""
+    since = datetime.utcnow() - timedelta(days=days)
+    rows = get_usage_store().summary(group_by, since=since)
+
+    print(f"\n=== LLM Usage (last {days} days, by {group_by}) ===\n")
+    if not rows:
+        print("No LLM calls recorded.")
+        return
+
+    print(f"  {group_by:<28}{'calls':>8}{'prompt':>12}{'output':>10}{'total':>12}{'cost $':>10}")
+    for row in rows:
+        print(
+            f"  {str(row[group_by])[:27]:<28}{row['calls']:>8}{row['prompt_tokens']:>12}"
+            f"{row['output_tokens']:>10}{row['total_tokens']:>12}{row['cost_usd']:>10.4f}"
+        )
+    print(f"\n  Total: ~${sum(row['cost_usd'] for row in rows):.4f}")
+
+
 def main():
     """Main CLI entry point"""
     parser = argparse.ArgumentParser(
@@ -167,6 +354,65 @@ def main():
         action="store_true",
         help="Generate but don't deliver via email",
     )
+    generate_parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="Profile the run (phases, stacks, memory) into data/reports/<report_id>/",
+    )
+
+    # Batch command
+    batch_parser = subparsers.add_parser(
+        "batch", help="Generate reports for several users"
+    )
+    batch_parser.add_argument(
+        "user_ids", nargs="*", help="User IDs (defaults to every profile)"
+    )
+    batch_parser.add_argument(
+        "--concurrency", type=int, help="Reports generated at once (default: BATCH_CONCURRENCY)"
+    )
+    batch_parser.add_argument(
+        "--no-deliver",
+        action="store_true",
+        help="Generate but don't deliver via email",
+    )
+
+    # Serve command
+    serve_parser = subparsers.add_parser(
+        "serve", help="Run the HTTP API with warm clients (see core/service.py)"
+    )
+    serve_parser.add_argument("--host", help="Interface to bind (default: SERVICE_HOST)")
+    serve_parser.add_argument("--port", type=int, help="Port (default: SERVICE_PORT)")
+    serve_parser.add_argument(
+        "--concurrency", type=int, help="Jobs run at once (default: SERVICE_CONCURRENCY)"
+    )
+
+    # Schedule command
+    schedule_parser = subparsers.add_parser(
+        "schedule", help="Generate and deliver reports at each profile's delivery time"
+    )
+    schedule_parser.add_argument(
+        "--dry-run", action="store_true", help="Print the plan without running it"
+    )
+    schedule_parser.add_argument(
+        "--once", action="store_true", help="Deliver the reports planned now, then exit"
+    )
+    schedule_parser.add_argument(
+        "--concurrency", type=int, help="Reports generated at once (default: SCHEDULE_CONCURRENCY)"
+    )
+    schedule_parser.add_argument(
+        "--horizon-hours", type=float, help="How far ahead to plan (default: SCHEDULE_HORIZON_HOURS)"
+    )
+
+    # Prewarm command
+    prewarm_parser = subparsers.add_parser(
+        "prewarm", help="Research active topics ahead of delivery (see core/research_cache.py)"
+    )
+    prewarm_parser.add_argument(
+        "--topics", nargs="+", help="Topics to research (default: every profile's topics)"
+    )
+    prewarm_parser.add_argument(
+        "--concurrency", type=int, help="Topics researched at once (default: PREWARM_CONCURRENCY)"
+    )
 
     # Feedback command
     feedback_parser = subparsers.add_parser("feedback", help="Submit feedback")
@@ -179,13 +425,59 @@ def main():
     # List profiles command
     subparsers.add_parser("list", help="List all user profiles")
 
+    # Trace command
+    trace_parser = subparsers.add_parser(
+        "trace", help="Show a report's spans and critical path"
+    )
+    trace_parser.add_argument(
+        "--report-id", help="Report ID (defaults to the latest trace)"
+    )
+
+    # Stats command
+    stats_parser = subparsers.add_parser(
+        "stats", help="Show LLM token usage and estimated cost"
+    )
+    stats_parser.add_argument(
+        "--days", type=int, default=7, help="Look back this many days (default: 7)"
+    )
+    stats_parser.add_argument(
+        "--by", choices=GROUP_COLUMNS, default="agent", help="Group by (default: agent)"
+    )
+
+    # Import history command
+    subparsers.add_parser(
+        "import-history", help="Import legacy JSON history files"
+    )
+
     args = parser.parse_args()
 
+    # Queue-based logging, set up once; see LOG_LEVEL and LOG_JSON_PATH
+    configure_logging()
+
+    if settings.metrics_port is not None and args.command in ("generate", "batch", "schedule", "prewarm"):
+        server = start_metrics_server(settings.metrics_port)
+        print(f"Metrics: http://{settings.metrics_host}:{server.server_port}/metrics")
+
     if args.command == "create-profile":
         create_profile_interactive()
 
     elif args.command == "generate":
-        asyncio.run(generate_report(args.user_id, deliver=not args.no_deliver))
+        asyncio.run(generate_report(args.user_id, deliver=not args.no_deliver, profile=args.profile))
+
+    elif args.command == "batch":
+        asyncio.run(generate_batch(args.user_ids, not args.no_deliver, args.concurrency))
+
+    elif args.command == "serve":
+        asyncio.run(run_service(args.host, args.port, args.concurrency))
+
+    elif args.command == "schedule":
+        if args.dry_run:
+            show_schedule(args.concurrency, args.horizon_hours)
+        else:
+            asyncio.run(run_scheduler(args.concurrency, args.horizon_hours, once=args.once))
+
+    elif args.command == "prewarm":
+        asyncio.run(prewarm(args.topics, args.concurrency))
 
     elif args.command == "feedback":
         asyncio.run(submit_feedback(args.report_id, args.user_id, args.rating))
@@ -193,6 +485,15 @@ def main():
     elif args.command == "list":
         list_profiles()
 
+    elif args.command == "import-history":
+        import_history()
+
+    elif args.command == "trace":
+        show_trace(args.report_id)
+
+    elif args.command == "stats":
+        show_stats(args.days, args.by)
+
     else:
         parser.print_help()
 
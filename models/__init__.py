@@ -7,7 +7,12 @@ from .schemas import (
     VerificationResult,
     FeedbackData,
 )
-from .user_profile import UserProfileManager
+from .user_profile import (
+    UserProfileManager,
+    SQLiteUserProfileManager,
+    ConcurrentUpdateError,
+    get_profile_manager,
+)
 
 __all__ = [
     "UserProfile",
@@ -18,4 +23,7 @@ __all__ = [
     "VerificationResult",
     "FeedbackData",
     "UserProfileManager",
+    "SQLiteUserProfileManager",
+    "ConcurrentUpdateError",
+    "get_profile_manager",
 ]
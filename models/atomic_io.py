@@ -0,0 +1,85 @@
+"""
+Crash-safe file writes
+Atomic write-rename with fsync, and advisory locks for read-modify-write cycles
+"""
+import os
+import tempfile
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterator, Union
+
+try:
+    import fcntl
+except ImportError:  # Windows: writes stay atomic, but locks are not taken
+    fcntl = None
+
+
+def atomic_write(path: Path, data: Union[str, bytes], durable: bool = True):
+    """
+    Replace a file's contents atomically
+
+    The data is written to a temporary file in the same directory,
+    flushed to disk and renamed over the target, so readers see either
+    the old or the new contents and a crash never leaves a truncated
+    file. The directory is synced so the rename itself is durable.
+
+    Args:
+        path: File to write
+        data: New contents (str is encoded as UTF-8)
+        durable: fsync before returning; caches that can be rebuilt skip it
+    """
+    path = Path(path)
+    if isinstance(data, str):
+        data = data.encode("utf-8")
+
+    fd, tmp_name = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+            if durable:
+                f.flush()
+                os.fsync(f.fileno())
+        os.replace(tmp_name, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_name)
+        except FileNotFoundError:
+            pass
+        raise
+
+    if durable:
+        _fsync_directory(path.parent)
+
+
+@contextmanager
+def file_lock(path: Path) -> Iterator[None]:
+    """
+    Hold an exclusive advisory lock for a file
+
+    The lock is taken on a ``.lock`` file next to ``path``, so it
+    survives the target being replaced by ``atomic_write``. Locks
+    serialise cooperating processes and threads; they do not stop
+    other programs writing the file.
+
+    Args:
+        path: File to lock
+    """
+    lock_path = Path(path).with_name(f".{Path(path).name}.lock")
+    with open(lock_path, "a") as lock_file:
+        if fcntl is not None:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+
+
+def _fsync_directory(directory: Path):
+    if not hasattr(os, "O_DIRECTORY"):
+        return
+    fd = os.open(directory, os.O_RDONLY | os.O_DIRECTORY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
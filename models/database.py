@@ -0,0 +1,59 @@
+"""
+SQLite connection handling
+Shared by the local stores that replace rewrite-everything JSON files
+"""
+import sqlite3
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterator, Optional
+
+from config import settings
+
+
+@contextmanager
+def connect(db_path: Optional[Path] = None) -> Iterator[sqlite3.Connection]:
+    """
+    Open a connection to the NewsPulse database
+
+    Each call opens its own connection, so stores are safe to use from
+    executor threads. The transaction is committed on success and rolled
+    back on error.
+
+    Args:
+        db_path: Database file (defaults to settings)
+
+    Yields:
+        sqlite3.Connection with rows accessible by column name
+    """
+    conn = open_connection(db_path)
+    try:
+        with conn:
+            yield conn
+    finally:
+        conn.close()
+
+
+def open_connection(db_path: Optional[Path] = None) -> sqlite3.Connection:
+    """
+    Open a long-lived connection to the NewsPulse database
+
+    For callers that keep a connection per thread (e.g. for frequent,
+    cheap reads) instead of paying connect() and its PRAGMAs per call.
+    Each read outside a transaction sees the latest committed data. The
+    caller closes the connection.
+
+    Args:
+        db_path: Database file (defaults to settings)
+
+    Returns:
+        sqlite3.Connection with rows accessible by column name
+    """
+    conn = sqlite3.connect(str(db_path or settings.database_path), timeout=30)
+    conn.row_factory = sqlite3.Row
+    try:
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+    except sqlite3.Error:
+        conn.close()
+        raise
+    return conn
@@ -0,0 +1,183 @@
+"""
+Report history storage
+Append-only SQLite store with an index on (user_id, report_date)
+"""
+from datetime import datetime
+from functools import lru_cache
+from pathlib import Path
+from typing import List, Optional, Union
+
+from pydantic import BaseModel
+
+from config import settings
+from .database import connect
+from .serialization import dumps, loads
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS report_history (
+    user_id TEXT NOT NULL,
+    report_id TEXT NOT NULL,
+    report_date TEXT NOT NULL,
+    data TEXT NOT NULL,
+    PRIMARY KEY (user_id, report_id)
+);
+CREATE INDEX IF NOT EXISTS idx_report_history_date
+    ON report_history (user_id, report_date);
+"""
+
+_DATE_FORMAT = "%Y-%m-%dT%H:%M:%S.%f"
+
+
+def _normalize_date(value) -> str:
+    """Fixed-width ISO timestamp so that string order is time order"""
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    if value.tzinfo is not None:
+        value = value.replace(tzinfo=None) - value.utcoffset()
+    return value.strftime(_DATE_FORMAT)
+
+
+class HistoryStore:
+    """
+    Stores delivered reports per user
+
+    Appends are single-row inserts and range queries by report date use
+    the index, so neither slows down as history grows. Legacy
+    ``{user_id}_history.json`` files are imported automatically the first
+    time a user's history is touched.
+    """
+
+    def __init__(
+        self, db_path: Optional[Path] = None, history_dir: Optional[Path] = None
+    ):
+        self.db_path = db_path or settings.database_path
+        self.history_dir = history_dir or settings.history_dir
+        self._imported = set()
+
+        with connect(self.db_path) as conn:
+            conn.executescript(_SCHEMA)
+
+    def append(self, user_id: str, report_data: Union[BaseModel, dict]):
+        """
+        Append a report to a user's history
+
+        Args:
+            user_id: User ID
+            report_data: NewsReport, or report data as from its model_dump()
+        """
+        self._import_legacy(user_id)
+
+        with connect(self.db_path) as conn:
+            self._insert(conn, user_id, report_data)
+
+    def load(
+        self,
+        user_id: str,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+    ) -> List[dict]:
+        """
+        Load a user's reports in a date range, oldest first
+
+        Args:
+            user_id: User ID
+            since: Only reports after this time (exclusive)
+            until: Only reports up to this time (inclusive)
+
+        Returns:
+            List of report data dictionaries
+        """
+        self._import_legacy(user_id)
+
+        query = "SELECT data FROM report_history WHERE user_id = ?"
+        params = [user_id]
+        if since is not None:
+            query += " AND report_date > ?"
+            params.append(_normalize_date(since))
+        if until is not None:
+            query += " AND report_date <= ?"
+            params.append(_normalize_date(until))
+        query += " ORDER BY report_date"
+
+        with connect(self.db_path) as conn:
+            rows = conn.execute(query, params).fetchall()
+
+        return [loads(row["data"]) for row in rows]
+
+    def import_json_history(self, user_id: str) -> int:
+        """
+        Import a legacy JSON history file into the store
+
+        The file is renamed to ``*.imported`` afterwards so it is never
+        imported twice. Reports already in the store are skipped.
+
+        Args:
+            user_id: User ID
+
+        Returns:
+            Number of reports imported
+        """
+        legacy_file = self.history_dir / f"{user_id}_history.json"
+
+        # Another worker may import (and rename) the same file concurrently;
+        # inserts are idempotent, so whichever finishes first wins
+        try:
+            with open(legacy_file, "rb") as f:
+                reports = loads(f.read())
+        except FileNotFoundError:
+            return 0
+
+        with connect(self.db_path) as conn:
+            for report_data in reports:
+                self._insert(conn, user_id, report_data)
+
+        try:
+            legacy_file.rename(legacy_file.with_suffix(".json.imported"))
+        except FileNotFoundError:
+            pass
+        return len(reports)
+
+    def import_all(self) -> dict:
+        """
+        Import every legacy JSON history file
+
+        Returns:
+            Mapping of user ID to number of reports imported
+        """
+        imported = {}
+        for legacy_file in sorted(self.history_dir.glob("*_history.json")):
+            user_id = legacy_file.name[: -len("_history.json")]
+            imported[user_id] = self.import_json_history(user_id)
+        return imported
+
+    def _import_legacy(self, user_id: str):
+        if user_id not in self._imported:
+            self.import_json_history(user_id)
+            self._imported.add(user_id)
+
+    def _insert(self, conn, user_id: str, report_data: Union[BaseModel, dict]):
+        if isinstance(report_data, BaseModel):
+            report_id = getattr(report_data, "report_id", None)
+            report_date = getattr(report_data, "report_date", None)
+        else:
+            report_id = report_data.get("report_id")
+            report_date = report_data.get("report_date")
+        report_date = report_date or datetime.utcnow()
+
+        conn.execute(
+            "INSERT OR IGNORE INTO report_history "
+            "(user_id, report_id, report_date, data) VALUES (?, ?, ?, ?)",
+            (
+                user_id,
+                report_id or _normalize_date(report_date),
+                _normalize_date(report_date),
+                dumps(report_data, pretty=False),
+            ),
+        )
+
+
+@lru_cache(maxsize=None)
+def get_history_store() -> HistoryStore:
+    """Shared HistoryStore for the configured database"""
+    return HistoryStore()
@@ -59,6 +59,9 @@ class UserProfile(BaseModel):
     # Metadata
     created_at: datetime = Field(default_factory=datetime.utcnow)
     updated_at: datetime = Field(default_factory=datetime.utcnow)
+    version: int = Field(
+        default=0, description="Incremented on every save, for optimistic concurrency"
+    )
 
 
 class SearchResult(BaseModel):
@@ -71,6 +74,7 @@ class SearchResult(BaseModel):
     source: str
     published_date: Optional[str] = None
     relevance_score: Optional[float] = None
+    topic: Optional[str] = None  # Profile topic the search was for
 
 
 class FetchedContent(BaseModel):
@@ -86,6 +90,10 @@ class FetchedContent(BaseModel):
     success: bool = True
     error_message: Optional[str] = None
 
+    # Set by extractive condensation before LLM analysis
+    condensed_content: Optional[str] = None
+    compression_ratio: Optional[float] = None
+
 
 class Citation(BaseModel):
     """Citation for a claim in the report"""
@@ -132,6 +140,9 @@ class NewsReport(BaseModel):
     # Metadata
     generated_at: datetime = Field(default_factory=datetime.utcnow)
     report_id: str
+    usage: Optional[Dict[str, Any]] = Field(
+        default=None, description="LLM token and cost totals for this report"
+    )
 
     @validator("articles")
     def validate_articles_not_empty(cls, v):
@@ -0,0 +1,268 @@
+"""
+Seen-URL index
+Persistent per-user set of canonicalised URLs already sent, for constant-time exclusion checks
+"""
+import hashlib
+import math
+from datetime import datetime
+from pathlib import Path
+from typing import Iterable, Optional
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+from config import settings
+from .database import connect
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS seen_urls (
+    user_id TEXT NOT NULL,
+    url TEXT NOT NULL,
+    first_seen TEXT NOT NULL,
+    PRIMARY KEY (user_id, url)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS seen_url_blooms (
+    user_id TEXT PRIMARY KEY,
+    capacity INTEGER NOT NULL,
+    bits BLOB NOT NULL,
+    error_rate REAL
+);
+"""
+
+_TRACKING_PARAMS = {
+    "fbclid", "gclid", "dclid", "msclkid", "mc_cid", "mc_eid",
+    "ref", "ref_src", "cmpid", "ocid", "smid", "sr_share", "igshid",
+}
+_DEFAULT_PORTS = {"http": 80, "https": 443}
+
+
+def canonicalize_url(url: str) -> str:
+    """
+    Canonical form of a URL for duplicate detection
+
+    Lower-cases the scheme and host, drops ``www.``, default ports,
+    fragments and tracking parameters, sorts the query and removes a
+    trailing slash, so trivially different links to one article match.
+
+    Args:
+        url: URL to canonicalise
+
+    Returns:
+        Canonical URL string; URLs that cannot be parsed (bad port or
+        IPv6 host) are returned stripped but otherwise unchanged
+    """
+    try:
+        parts = urlsplit(url.strip())
+        port = parts.port
+    except ValueError:
+        return url.strip()
+
+    scheme = (parts.scheme or "http").lower()
+    if scheme == "http":
+        scheme = "https"
+
+    host = (parts.hostname or "").lower()
+    if host.startswith("www."):
+        host = host[4:]
+    if port and port != _DEFAULT_PORTS.get(parts.scheme.lower()):
+        host = f"{host}:{port}"
+
+    path = parts.path.rstrip("/") or "/"
+
+    query = sorted(
+        (key, value)
+        for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if not key.lower().startswith("utm_") and key.lower() not in _TRACKING_PARAMS
+    )
+
+    return urlunsplit((scheme, host, path, urlencode(query), ""))
+
+
+class BloomFilter:
+    """Fixed-size Bloom filter over strings using double hashing"""
+
+    def __init__(
+        self, capacity: int, error_rate: float = 0.001, bits: Optional[bytes] = None
+    ):
+        self.capacity = max(capacity, 1)
+        self.error_rate = error_rate
+        self.num_bits = max(
+            int(-self.capacity * math.log(error_rate) / (math.log(2) ** 2)), 8
+        )
+        self.num_hashes = max(int(round(self.num_bits / self.capacity * math.log(2))), 1)
+        size = (self.num_bits + 7) // 8
+        self.bits = bytearray(bits) if bits is not None else bytearray(size)
+
+    def _positions(self, item: str):
+        digest = hashlib.sha256(item.encode("utf-8")).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:16], "little") | 1
+        for i in range(self.num_hashes):
+            yield (h1 + i * h2) % self.num_bits
+
+    def add(self, item: str):
+        for pos in self._positions(item):
+            self.bits[pos >> 3] |= 1 << (pos & 7)
+
+    def __contains__(self, item: str) -> bool:
+        return all(self.bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(item))
+
+
+class SeenUrlIndex:
+    """
+    Persistent, incrementally updated index of URLs a user has been sent
+
+    Membership checks are constant-time: small histories are held as an
+    in-memory set loaded once; histories above the Bloom threshold use a
+    persisted Bloom filter, and only its (rare) positives are confirmed
+    against the primary-key index in SQLite.
+
+    On first use for a user with an empty index, URLs from the report
+    history are backfilled.
+    """
+
+    def __init__(self, user_id: str, db_path: Optional[Path] = None):
+        self.user_id = user_id
+        self.db_path = db_path or settings.database_path
+        self.bloom_threshold = settings.seen_url_bloom_threshold
+        self._urls: Optional[set] = None
+        self._bloom: Optional[BloomFilter] = None
+        self._count: Optional[int] = None
+
+        with connect(self.db_path) as conn:
+            conn.executescript(_SCHEMA)
+            columns = {row["name"] for row in conn.execute("PRAGMA table_info(seen_url_blooms)")}
+            if "error_rate" not in columns:
+                # Filters saved without their error rate are rebuilt on first load
+                conn.execute("ALTER TABLE seen_url_blooms ADD COLUMN error_rate REAL")
+
+    def __len__(self) -> int:
+        if self._count is None:
+            with connect(self.db_path) as conn:
+                self._count = conn.execute(
+                    "SELECT COUNT(*) FROM seen_urls WHERE user_id = ?", (self.user_id,)
+                ).fetchone()[0]
+            if self._count == 0:
+                self._backfill_from_history()
+        return self._count
+
+    def __contains__(self, url: str) -> bool:
+        canonical = canonicalize_url(url)
+
+        if len(self) <= self.bloom_threshold:
+            if self._urls is None:
+                with connect(self.db_path) as conn:
+                    rows = conn.execute(
+                        "SELECT url FROM seen_urls WHERE user_id = ?", (self.user_id,)
+                    ).fetchall()
+                self._urls = {row["url"] for row in rows}
+            return canonical in self._urls
+
+        if canonical not in self._load_bloom():
+            return False
+        with connect(self.db_path) as conn:
+            row = conn.execute(
+                "SELECT 1 FROM seen_urls WHERE user_id = ? AND url = ?",
+                (self.user_id, canonical),
+            ).fetchone()
+        return row is not None
+
+    def add(self, urls: Iterable[str]):
+        """
+        Record URLs as seen by the user
+
+        Args:
+            urls: URLs to add (canonicalised before storing)
+        """
+        canonical = {canonicalize_url(url) for url in urls if url}
+        if not canonical:
+            return
+
+        now = datetime.utcnow().isoformat()
+        with connect(self.db_path) as conn:
+            before = conn.total_changes
+            conn.executemany(
+                "INSERT OR IGNORE INTO seen_urls (user_id, url, first_seen) VALUES (?, ?, ?)",
+                [(self.user_id, url, now) for url in canonical],
+            )
+            added = conn.total_changes - before
+
+        if self._urls is not None:
+            self._urls.update(canonical)
+        if self._count is not None:
+            self._count += added
+
+        if len(self) > self.bloom_threshold:
+            bloom = self._load_bloom()
+            if len(self) > bloom.capacity:
+                self._bloom = self._rebuild_bloom()
+            else:
+                for url in canonical:
+                    bloom.add(url)
+                self._save_bloom(bloom)
+
+    def _load_bloom(self) -> BloomFilter:
+        if self._bloom is None:
+            with connect(self.db_path) as conn:
+                row = conn.execute(
+                    "SELECT capacity, bits, error_rate FROM seen_url_blooms WHERE user_id = ?",
+                    (self.user_id,),
+                ).fetchone()
+            if self._matches(row) and row["capacity"] >= len(self):
+                self._bloom = BloomFilter(
+                    row["capacity"], row["error_rate"], row["bits"]
+                )
+            else:
+                self._bloom = self._rebuild_bloom()
+        return self._bloom
+
+    @staticmethod
+    def _matches(row, bloom: Optional[BloomFilter] = None) -> bool:
+        """
+        Whether persisted bits can be read with the current parameters
+
+        Filters sized for another error rate (or capacity, when ``bloom``
+        is given) hash to different positions, so their bits are unusable.
+        """
+        if row is None or row["error_rate"] != settings.seen_url_bloom_error_rate:
+            return False
+        expected = bloom or BloomFilter(row["capacity"], row["error_rate"])
+        return row["capacity"] == expected.capacity and len(row["bits"]) == len(expected.bits)
+
+    def _rebuild_bloom(self) -> BloomFilter:
+        """Size a new filter for twice the current history and persist it"""
+        bloom = BloomFilter(max(len(self) * 2, 1024), settings.seen_url_bloom_error_rate)
+        with connect(self.db_path) as conn:
+            for row in conn.execute(
+                "SELECT url FROM seen_urls WHERE user_id = ?", (self.user_id,)
+            ):
+                bloom.add(row["url"])
+        self._save_bloom(bloom)
+        return bloom
+
+    def _save_bloom(self, bloom: BloomFilter):
+        """Persist the filter, merging bits written concurrently by other workers"""
+        with connect(self.db_path) as conn:
+            row = conn.execute(
+                "SELECT capacity, bits, error_rate FROM seen_url_blooms WHERE user_id = ?",
+                (self.user_id,),
+            ).fetchone()
+            if self._matches(row, bloom) and row["error_rate"] == bloom.error_rate:
+                for i, byte in enumerate(row["bits"]):
+                    bloom.bits[i] |= byte
+            conn.execute(
+                "INSERT OR REPLACE INTO seen_url_blooms (user_id, capacity, bits, error_rate) "
+                "VALUES (?, ?, ?, ?)",
+                (self.user_id, bloom.capacity, bytes(bloom.bits), bloom.error_rate),
+            )
+
+    def _backfill_from_history(self):
+        from .history_store import HistoryStore
+
+        urls = [
+            article["url"]
+            for report in HistoryStore(db_path=self.db_path).load(self.user_id)
+            for article in report.get("articles", [])
+            if article.get("url")
+        ]
+        if urls:
+            self.add(urls)
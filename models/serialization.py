@@ -0,0 +1,94 @@
+"""
+JSON serialisation for models and persisted data
+Pydantic's native JSON encoding for models, orjson (when installed) for plain data
+"""
+import json
+from typing import Any, Type, TypeVar, Union
+
+from pydantic import BaseModel
+
+from config import settings
+
+try:
+    import orjson
+except ImportError:  # Optional: pip install newspulse-ai[fast]
+    orjson = None
+
+
+ModelT = TypeVar("ModelT", bound=BaseModel)
+
+
+def dump_model(model: BaseModel, pretty: bool = None) -> str:
+    """
+    Serialise a model to JSON without building an intermediate dict
+
+    Args:
+        model: Pydantic model
+        pretty: Indent the output (defaults to settings.pretty_json)
+
+    Returns:
+        JSON text
+    """
+    if pretty is None:
+        pretty = settings.pretty_json
+    return model.model_dump_json(indent=2 if pretty else None)
+
+
+def load_model(model_class: Type[ModelT], data: Union[str, bytes]) -> ModelT:
+    """
+    Parse and validate JSON straight into a model
+
+    Args:
+        model_class: Pydantic model class
+        data: JSON text
+
+    Returns:
+        Validated model instance
+    """
+    return model_class.model_validate_json(data)
+
+
+def dumps(obj: Any, pretty: bool = None) -> str:
+    """
+    Serialise plain data (dicts, lists, models) to compact JSON
+
+    Args:
+        obj: Data to serialise; datetimes and other values are stringified
+        pretty: Indent the output (defaults to settings.pretty_json)
+
+    Returns:
+        JSON text
+    """
+    if pretty is None:
+        pretty = settings.pretty_json
+    if isinstance(obj, BaseModel):
+        return dump_model(obj, pretty)
+
+    if orjson is not None:
+        option = orjson.OPT_NON_STR_KEYS | (orjson.OPT_INDENT_2 if pretty else 0)
+        return orjson.dumps(obj, default=_default, option=option).decode("utf-8")
+
+    if pretty:
+        return json.dumps(obj, indent=2, default=_default)
+    return json.dumps(obj, separators=(",", ":"), default=_default)
+
+
+def loads(data: Union[str, bytes]) -> Any:
+    """
+    Parse JSON text
+
+    Args:
+        data: JSON text
+
+    Returns:
+        Parsed data
+    """
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def _default(value: Any) -> Any:
+    if isinstance(value, BaseModel):
+        return value.model_dump(mode="json")
+    return str(value)
@@ -0,0 +1,191 @@
+"""
+LLM usage storage
+Per-call token counts and latency, tagged by agent, user, report and topic
+"""
+from datetime import datetime
+from functools import lru_cache
+from pathlib import Path
+from typing import List, Optional
+
+from config import settings
+from .database import connect
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS llm_usage (
+    id INTEGER PRIMARY KEY,
+    created_at TEXT NOT NULL,
+    user_id TEXT NOT NULL,
+    report_id TEXT NOT NULL,
+    agent TEXT NOT NULL,
+    phase TEXT NOT NULL,
+    topic TEXT NOT NULL,
+    model TEXT NOT NULL,
+    prompt_tokens INTEGER NOT NULL,
+    output_tokens INTEGER NOT NULL,
+    total_tokens INTEGER NOT NULL,
+    latency_s REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_llm_usage_report ON llm_usage (report_id);
+CREATE INDEX IF NOT EXISTS idx_llm_usage_created ON llm_usage (created_at);
+"""
+
+# Columns usage can be grouped by in summaries
+GROUP_COLUMNS = ("agent", "user_id", "report_id", "topic", "phase", "model")
+
+
+def estimate_cost(prompt_tokens: int, output_tokens: int) -> float:
+    """
+    Estimated cost in USD at the configured per-million-token prices
+
+    Args:
+        prompt_tokens: Input tokens
+        output_tokens: Billed output tokens (including thinking tokens)
+
+    Returns:
+        Cost in USD
+    """
+    return (
+        prompt_tokens * settings.llm_input_cost_per_million
+        + output_tokens * settings.llm_output_cost_per_million
+    ) / 1_000_000
+
+
+class UsageStore:
+    """
+    Stores token usage for every LLM call
+
+    One row per call, so totals can be broken down by any tag after the
+    fact: which agents, users, topics or reports cost the most.
+    """
+
+    def __init__(self, db_path: Optional[Path] = None):
+        self.db_path = db_path or settings.database_path
+
+        with connect(self.db_path) as conn:
+            conn.executescript(_SCHEMA)
+
+    def record(
+        self,
+        model: str,
+        prompt_tokens: int,
+        output_tokens: int,
+        total_tokens: int,
+        latency_s: float,
+        user_id: str = "-",
+        report_id: str = "-",
+        agent: str = "-",
+        phase: str = "-",
+        topic: str = "-",
+    ):
+        """
+        Record one LLM call
+
+        Args:
+            model: Model name
+            prompt_tokens: Input tokens
+            output_tokens: Output (candidate) tokens
+            total_tokens: Total tokens billed (includes thinking tokens)
+            latency_s: Wall-clock duration of the call
+            user_id: User the call was made for
+            report_id: Report the call was made for
+            agent: Agent that made the call
+            phase: Pipeline phase
+            topic: Topic the call was about, if any
+        """
+        with connect(self.db_path) as conn:
+            conn.execute(
+                "INSERT INTO llm_usage (created_at, user_id, report_id, agent, phase, "
+                "topic, model, prompt_tokens, output_tokens, total_tokens, latency_s) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    datetime.utcnow().isoformat(),
+                    user_id, report_id, agent, phase, topic, model,
+                    prompt_tokens or 0, output_tokens or 0, total_tokens or 0,
+                    latency_s,
+                ),
+            )
+
+    def report_totals(self, report_id: str) -> dict:
+        """
+        Usage totals for one report, with a breakdown by agent
+
+        Args:
+            report_id: Report ID
+
+        Returns:
+            Dictionary of calls, token counts, latency, estimated cost and by_agent
+        """
+        by_agent = {
+            row.pop("agent"): row
+            for row in self.summary("agent", report_id=report_id)
+        }
+        totals = {
+            key: sum(row[key] for row in by_agent.values())
+            for key in ("calls", "prompt_tokens", "output_tokens", "total_tokens")
+        }
+        totals["latency_s"] = round(sum(row["latency_s"] for row in by_agent.values()), 3)
+        totals["cost_usd"] = round(sum(row["cost_usd"] for row in by_agent.values()), 6)
+        totals["by_agent"] = by_agent
+        return totals
+
+    def summary(
+        self,
+        group_by: str = "agent",
+        since: Optional[datetime] = None,
+        report_id: Optional[str] = None,
+    ) -> List[dict]:
+        """
+        Usage totals grouped by a tag, most expensive first
+
+        Args:
+            group_by: One of GROUP_COLUMNS
+            since: Only calls after this time
+            report_id: Only calls for this report
+
+        Returns:
+            List of dictionaries with the group value, calls, token counts,
+            latency and estimated cost
+        """
+        if group_by not in GROUP_COLUMNS:
+            raise ValueError(f"Cannot group usage by: {group_by}")
+
+        query = (
+            f"SELECT {group_by}, COUNT(*) AS calls, "
+            "SUM(prompt_tokens) AS prompt_tokens, SUM(output_tokens) AS output_tokens, "
+            "SUM(total_tokens) AS total_tokens, SUM(latency_s) AS latency_s "
+            "FROM llm_usage"
+        )
+        conditions = []
+        params = []
+        if since is not None:
+            conditions.append("created_at > ?")
+            params.append(since.isoformat())
+        if report_id is not None:
+            conditions.append("report_id = ?")
+            params.append(report_id)
+        if conditions:
+            query += " WHERE " + " AND ".join(conditions)
+        query += f" GROUP BY {group_by} ORDER BY total_tokens DESC"
+
+        with connect(self.db_path) as conn:
+            rows = conn.execute(query, params).fetchall()
+
+        summary = []
+        for row in rows:
+            entry = dict(row)
+            entry["latency_s"] = round(entry["latency_s"], 3)
+            entry["cost_usd"] = round(
+                estimate_cost(
+                    entry["prompt_tokens"], entry["total_tokens"] - entry["prompt_tokens"]
+                ),
+                6,
+            )
+            summary.append(entry)
+        return summary
+
+
+@lru_cache(maxsize=None)
+def get_usage_store() -> UsageStore:
+    """Shared UsageStore for the configured database"""
+    return UsageStore()
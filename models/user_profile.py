@@ -2,17 +2,32 @@
 User profile management
 Handles loading, saving, and updating user profiles
 """
-import json
+import threading
+from functools import lru_cache
 from pathlib import Path
-from typing import Optional
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
 from datetime import datetime
 
 from .schemas import UserProfile
+from .database import connect, open_connection
+from .atomic_io import atomic_write, file_lock
+from .serialization import dump_model, load_model, loads
 from config import settings
 
 
+class ConcurrentUpdateError(RuntimeError):
+    """A profile was changed by another writer since it was loaded"""
+
+
 class UserProfileManager:
-    """Manages user profiles stored as JSON files"""
+    """
+    Manages user profiles stored as JSON files
+
+    Saves are atomic (write, fsync, rename) and serialised per user by an
+    advisory file lock. Every save increments ``UserProfile.version``;
+    passing ``expected_version`` makes a save fail with
+    ``ConcurrentUpdateError`` if another writer got there first.
+    """
 
     def __init__(self, profiles_dir: Optional[Path] = None):
         self.profiles_dir = profiles_dir or settings.user_profiles_dir
@@ -29,33 +44,87 @@ class UserProfileManager:
         if not profile_path.exists():
             return None
 
-        with open(profile_path, "r") as f:
-            data = json.load(f)
+        with open(profile_path, "rb") as f:
+            return load_model(UserProfile, f.read())
 
-        return UserProfile(**data)
+    def save_profile(
+        self, profile: UserProfile, expected_version: Optional[int] = None
+    ):
+        """
+        Save a user profile to disk
 
-    def save_profile(self, profile: UserProfile):
-        """Save a user profile to disk"""
+        Args:
+            profile: Profile to save (its version is updated)
+            expected_version: Stored version the caller's changes are based
+                on; None overwrites whatever is stored
+
+        Raises:
+            ConcurrentUpdateError: If the stored version differs from expected_version
+        """
         profile_path = self.get_profile_path(profile.user_id)
-        profile.updated_at = datetime.utcnow()
 
-        with open(profile_path, "w") as f:
-            json.dump(profile.model_dump(), f, indent=2, default=str)
+        with file_lock(profile_path):
+            stored_version = self._stored_version(profile_path)
+            if expected_version is not None and stored_version != expected_version:
+                raise ConcurrentUpdateError(
+                    f"Profile {profile.user_id} is at version {stored_version}, "
+                    f"expected {expected_version}"
+                )
+
+            profile.version = stored_version + 1
+            profile.updated_at = datetime.utcnow()
+            atomic_write(profile_path, dump_model(profile))
+
+    def update_profile(
+        self,
+        user_id: str,
+        apply: Callable[[UserProfile], None],
+        retries: Optional[int] = None,
+    ) -> UserProfile:
+        """
+        Read-modify-write a profile without losing concurrent updates
+
+        ``apply`` mutates a freshly loaded profile. If another writer saved
+        the profile in the meantime, the profile is reloaded and ``apply``
+        runs again.
+
+        Args:
+            user_id: User ID
+            apply: Function that modifies the profile in place
+            retries: Attempts after a conflict (defaults to settings)
+
+        Returns:
+            The saved profile
+
+        Raises:
+            ValueError: If the profile does not exist
+            ConcurrentUpdateError: If every attempt conflicted
+        """
+        if retries is None:
+            retries = settings.profile_update_retries
+
+        for attempt in range(retries + 1):
+            profile = self.load_profile(user_id)
+
+            if profile is None:
+                raise ValueError(f"Profile not found for user_id: {user_id}")
+
+            apply(profile)
+            try:
+                self.save_profile(profile, expected_version=profile.version)
+                return profile
+            except ConcurrentUpdateError:
+                if attempt == retries:
+                    raise
 
     def update_constraints(
         self, user_id: str, new_constraints: dict
     ) -> UserProfile:
         """Update user constraints based on feedback"""
-        profile = self.load_profile(user_id)
-
-        if profile is None:
-            raise ValueError(f"Profile not found for user_id: {user_id}")
-
         # Merge new constraints
-        profile.constraints.update(new_constraints)
-        self.save_profile(profile)
-
-        return profile
+        return self.update_profile(
+            user_id, lambda profile: profile.constraints.update(new_constraints)
+        )
 
     def create_profile(
         self,
@@ -88,3 +157,293 @@ class UserProfileManager:
         return [
             p.stem for p in self.profiles_dir.glob("*.json")
         ]
+
+    def load_profiles(
+        self, user_ids: Optional[Iterable[str]] = None
+    ) -> Dict[str, UserProfile]:
+        """Load several profiles (all of them by default), keyed by user ID"""
+        if user_ids is None:
+            user_ids = self.list_profiles()
+
+        profiles = {}
+        for user_id in user_ids:
+            profile = self.load_profile(user_id)
+            if profile is not None:
+                profiles[user_id] = profile
+        return profiles
+
+    def _stored_version(self, profile_path: Path) -> int:
+        if not profile_path.exists():
+            return 0
+        with open(profile_path, "rb") as f:
+            return loads(f.read()).get("version", 0)
+
+
+_PROFILE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS user_profiles (
+    user_id TEXT PRIMARY KEY,
+    delivery_time TEXT NOT NULL,
+    timezone TEXT NOT NULL,
+    updated_at TEXT NOT NULL,
+    version INTEGER NOT NULL DEFAULT 0,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_user_profiles_delivery
+    ON user_profiles (delivery_time, timezone);
+CREATE INDEX IF NOT EXISTS idx_user_profiles_timezone
+    ON user_profiles (timezone);
+CREATE TABLE IF NOT EXISTS user_profile_topics (
+    topic TEXT NOT NULL,
+    user_id TEXT NOT NULL,
+    PRIMARY KEY (topic, user_id)
+) WITHOUT ROWID;
+"""
+
+
+class SQLiteUserProfileManager(UserProfileManager):
+    """
+    Manages user profiles stored in the NewsPulse SQLite database
+
+    Profiles are kept as validated JSON alongside indexed delivery_time,
+    timezone and topic columns, so schedulers can select users without
+    loading every profile. Version checks and writes happen in one
+    immediate transaction, so concurrent workers never lose updates.
+
+    Profiles are validated once and cached in memory as their JSON with
+    their version. Each lookup checks the stored version, on a connection
+    kept open per thread, so edits made by other processes are picked up
+    and only changed profiles are read again. Lookups rebuild the model from the cached JSON (a few
+    microseconds, cheaper than a deep copy), so mutating a returned
+    profile never changes the cache.
+
+    Profiles in the JSON profiles directory are imported the first time
+    the database holds no profiles.
+    """
+
+    def __init__(
+        self, db_path: Optional[Path] = None, profiles_dir: Optional[Path] = None
+    ):
+        super().__init__(profiles_dir)
+        self.db_path = db_path or settings.database_path
+        self._cache: Dict[str, Tuple[int, str]] = {}  # user_id -> (version, JSON)
+        self._local = threading.local()  # Per-thread read connection
+
+        with connect(self.db_path) as conn:
+            conn.executescript(_PROFILE_SCHEMA)
+            columns = {row["name"] for row in conn.execute("PRAGMA table_info(user_profiles)")}
+            if "version" not in columns:
+                conn.execute(
+                    "ALTER TABLE user_profiles ADD COLUMN version INTEGER NOT NULL DEFAULT 0"
+                )
+            empty = conn.execute("SELECT 1 FROM user_profiles LIMIT 1").fetchone() is None
+
+        if empty:
+            self.import_json_profiles()
+
+    def load_profile(self, user_id: str) -> Optional[UserProfile]:
+        """Load a user profile, from the in-memory cache while it is current"""
+        cached = self._cache.get(user_id)
+
+        # The JSON is only read when the cached copy is missing or stale
+        row = self._reader().execute(
+            "SELECT version, CASE WHEN version = ? THEN NULL ELSE data END AS data "
+            "FROM user_profiles WHERE user_id = ?",
+            (cached[0] if cached else None, user_id),
+        ).fetchone()
+        if row is None:
+            self._cache.pop(user_id, None)
+            return None
+        if row["data"] is None:
+            return load_model(UserProfile, cached[1])
+
+        profile = load_model(UserProfile, row["data"])
+        self._cache[user_id] = (row["version"], row["data"])
+        return profile
+
+    def load_profiles(
+        self, user_ids: Optional[Iterable[str]] = None
+    ) -> Dict[str, UserProfile]:
+        """
+        Load several profiles (all of them by default)
+
+        One query reads the stored versions; a second reads the JSON of
+        profiles that are not cached or have changed since.
+        """
+        conn = self._reader()
+        if user_ids is None:
+            rows = conn.execute("SELECT user_id, version FROM user_profiles").fetchall()
+        else:
+            rows = self._select_in(conn, "user_id, version", list(user_ids))
+        found = {row["user_id"]: row["version"] for row in rows}
+
+        stale = [
+            user_id
+            for user_id, version in found.items()
+            if self._cache.get(user_id, (None,))[0] != version
+        ]
+        for row in self._select_in(conn, "user_id, version, data", stale):
+            load_model(UserProfile, row["data"])
+            self._cache[row["user_id"]] = (row["version"], row["data"])
+
+        # Profiles deleted by another process
+        candidates = list(self._cache) if user_ids is None else user_ids
+        for user_id in candidates:
+            if user_id not in found:
+                self._cache.pop(user_id, None)
+
+        order = [row["user_id"] for row in rows] if user_ids is None else user_ids
+        return {
+            user_id: load_model(UserProfile, self._cache[user_id][1])
+            for user_id in order
+            if user_id in found and user_id in self._cache
+        }
+
+    def _reader(self):
+        """This thread's kept-open connection for reads"""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._local.conn = open_connection(self.db_path)
+        return conn
+
+    @staticmethod
+    def _select_in(conn, columns: str, user_ids: List[str]) -> list:
+        """Rows for the given users, staying under SQLite's bound-parameter limit"""
+        rows = []
+        for i in range(0, len(user_ids), 500):
+            chunk = user_ids[i:i + 500]
+            rows.extend(conn.execute(
+                f"SELECT {columns} FROM user_profiles WHERE user_id IN "
+                f"({', '.join('?' * len(chunk))})",
+                chunk,
+            ).fetchall())
+        return rows
+
+    def save_profile(
+        self, profile: UserProfile, expected_version: Optional[int] = None
+    ):
+        """Save a user profile and refresh the cached copy"""
+        try:
+            with connect(self.db_path) as conn:
+                conn.execute("BEGIN IMMEDIATE")
+                data = self._write(conn, profile, expected_version)
+            self._cache[profile.user_id] = (profile.version, data)
+        except ConcurrentUpdateError:
+            # Another process wrote it; the cached copy is stale too
+            self._cache.pop(profile.user_id, None)
+            raise
+
+    def list_profiles(self) -> list[str]:
+        """List all user IDs with profiles"""
+        with connect(self.db_path) as conn:
+            rows = conn.execute("SELECT user_id FROM user_profiles ORDER BY user_id").fetchall()
+        return [row["user_id"] for row in rows]
+
+    def find_profiles(
+        self,
+        delivery_time: Optional[str] = None,
+        timezone: Optional[str] = None,
+        topic: Optional[str] = None,
+    ) -> List[str]:
+        """
+        Find user IDs by the indexed columns
+
+        Args:
+            delivery_time: Delivery time (HH:MM)
+            timezone: IANA timezone name
+            topic: A topic of interest
+
+        Returns:
+            Matching user IDs
+        """
+        query = "SELECT p.user_id FROM user_profiles p"
+        conditions = []
+        params = []
+        if topic is not None:
+            query += " JOIN user_profile_topics t ON t.user_id = p.user_id"
+            conditions.append("t.topic = ?")
+            params.append(topic)
+        if delivery_time is not None:
+            conditions.append("p.delivery_time = ?")
+            params.append(delivery_time)
+        if timezone is not None:
+            conditions.append("p.timezone = ?")
+            params.append(timezone)
+        if conditions:
+            query += " WHERE " + " AND ".join(conditions)
+        query += " ORDER BY p.user_id"
+
+        with connect(self.db_path) as conn:
+            rows = conn.execute(query, params).fetchall()
+        return [row["user_id"] for row in rows]
+
+    def import_json_profiles(self) -> int:
+        """
+        Import profiles from the JSON profiles directory
+
+        Returns:
+            Number of profiles imported
+        """
+        profiles = []
+        for profile_path in sorted(self.profiles_dir.glob("*.json")):
+            with open(profile_path, "rb") as f:
+                profiles.append(load_model(UserProfile, f.read()))
+
+        with connect(self.db_path) as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            for profile in profiles:
+                data = self._write(conn, profile)
+                self._cache[profile.user_id] = (profile.version, data)
+
+        return len(profiles)
+
+    def clear_cache(self):
+        """Drop cached profiles (e.g. after another process changed them)"""
+        self._cache.clear()
+
+    def _write(
+        self, conn, profile: UserProfile, expected_version: Optional[int] = None
+    ) -> str:
+        row = conn.execute(
+            "SELECT version FROM user_profiles WHERE user_id = ?", (profile.user_id,)
+        ).fetchone()
+        stored_version = row["version"] if row is not None else 0
+        if expected_version is not None and stored_version != expected_version:
+            raise ConcurrentUpdateError(
+                f"Profile {profile.user_id} is at version {stored_version}, "
+                f"expected {expected_version}"
+            )
+
+        profile.version = stored_version + 1
+        profile.updated_at = datetime.utcnow()
+        data = dump_model(profile, pretty=False)
+        conn.execute(
+            "INSERT OR REPLACE INTO user_profiles "
+            "(user_id, delivery_time, timezone, updated_at, version, data) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            (
+                profile.user_id,
+                profile.delivery_time,
+                profile.timezone,
+                profile.updated_at.isoformat(),
+                profile.version,
+                data,
+            ),
+        )
+        conn.execute(
+            "DELETE FROM user_profile_topics WHERE user_id = ?", (profile.user_id,)
+        )
+        conn.executemany(
+            "INSERT OR IGNORE INTO user_profile_topics (topic, user_id) VALUES (?, ?)",
+            [(topic, profile.user_id) for topic in profile.topics_of_interest],
+        )
+        return data
+
+
+@lru_cache(maxsize=None)
+def get_profile_manager() -> UserProfileManager:
+    """Shared profile manager for the configured backend"""
+    if settings.profile_backend == "sqlite":
+        return SQLiteUserProfileManager()
+    if settings.profile_backend == "json":
+        return UserProfileManager()
+    raise ValueError(f"Unknown profile backend: {settings.profile_backend}")
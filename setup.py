@@ -26,6 +26,7 @@ setup(
         "google-api-python-client>=2.100.0",
         "pydantic-settings>=2.0.0",
         "typing-extensions>=4.8.0",
+        "numpy>=1.24.0",
         "structlog>=23.2.0",
         "colorlog>=6.8.0",
         "python-dateutil>=2.8.2",
@@ -36,6 +37,9 @@ setup(
             "pytest>=7.4.0",
             "pytest-asyncio>=0.21.0",
         ],
+        "fast": [
+            "orjson>=3.9.0",
+        ],
     },
     entry_points={
         "console_scripts": [
@@ -127,6 +127,85 @@ class TestSchemas:
         assert article.priority == Priority.HIGH
 
 
+class TestHistoricalRecommender:
+    """Test the Historical Recommender Agent's cached insights"""
+
+    @pytest.mark.asyncio
+    async def test_insights_refresh_off_the_critical_path(self, tmp_path, monkeypatch):
+        """Test that the LLM call runs in the background and is cached"""
+        from agents import historical_recommender_agent as agent
+
+        calls = []
+        history = [{"articles": [{"url": "https://example.com/a"}], "topics_covered": ["AI"]}]
+        monkeypatch.setattr(agent.settings, "cache_dir", tmp_path)
+        monkeypatch.setattr(agent, "load_user_history", lambda user_id: history)
+        monkeypatch.setattr(
+            agent, "generate_content", lambda *args: calls.append(args) or "Fresh angles"
+        )
+
+        first = await agent.run_historical_recommender_agent("test_user", ["AI"])
+        await agent.drain_background_insights()
+        second = await agent.run_historical_recommender_agent("test_user", ["AI"])
+        await agent.drain_background_insights()
+
+        assert first.exclude_urls == ["https://example.com/a"]
+        assert first.insights == ""
+        assert second.insights == "Fresh angles"
+        assert len(calls) == 1
+
+    @pytest.mark.asyncio
+    async def test_insights_reach_the_search_prompt(self, monkeypatch):
+        """Test that history insights are passed to the query prompt"""
+        from agents import search_agent
+
+        prompts = []
+        monkeypatch.setattr(
+            search_agent, "generate_content", lambda prompt, *args: prompts.append(prompt) or "q"
+        )
+        monkeypatch.setattr(search_agent, "search_news", lambda **kwargs: [])
+
+        await search_agent.run_search_agent(
+            ["AI"], {"role": "CTO", "history_insights": "Chip export rules not covered yet."}
+        )
+
+        assert "Chip export rules not covered yet." in prompts[0]
+
+
+class TestProfileAgent:
+    """Test the Profile Agent's memoised analysis"""
+
+    @pytest.mark.asyncio
+    async def test_analysis_cached_until_profile_changes(self, tmp_path, monkeypatch):
+        """Test that the LLM is only called when content fields change"""
+        from agents import profile_agent as agent
+
+        calls = []
+        monkeypatch.setattr(agent.settings, "cache_dir", tmp_path)
+        monkeypatch.setattr(
+            agent, "generate_content", lambda *args: calls.append(args) or "Focus on AI"
+        )
+        profile = UserProfile(
+            user_id="test_user",
+            name="Test User",
+            role="CEO",
+            company="Test Corp",
+            industry="Technology",
+            topics_of_interest=["AI"],
+            delivery_email="test@example.com",
+        )
+
+        first = await agent.run_profile_agent("test_user", profile=profile)
+        profile.delivery_time = "09:00"
+        second = await agent.run_profile_agent("test_user", profile=profile)
+        profile.constraints = {"avoid": "speculation"}
+        await agent.run_profile_agent("test_user", profile=profile)
+
+        assert first["personalization_analysis"] == "Focus on AI"
+        assert second["personalization_analysis"] == "Focus on AI"
+        assert len(calls) == 2
+        assert "Learned Constraints:\n- avoid: speculation\n" in calls[1][0]
+
+
 # Async tests for agents
 @pytest.mark.asyncio
 class TestAgents:
@@ -0,0 +1,863 @@
+"""
+Tests for NewsPulse AI core utilities
+
+To run tests:
+    pytest tests/
+"""
+import asyncio
+import json
+import logging
+from types import SimpleNamespace
+
+import pytest
+
+from models.schemas import Article, Citation, Priority, VerificationResult
+from core.extractive import condense_text
+from core import loop_agent
+from core.json_stream import StreamingJSONParser, parse_json_lenient
+from core.verification_cache import VerificationCache
+from core.task_graph import TaskGraph
+from core.utils import run_blocking
+from core import tracing
+from core.profiling import RunProfiler
+from core import metrics
+from core.llm_backends import (
+    LatencyModel,
+    RecordingBackend,
+    RecordingNotFoundError,
+    ReplayBackend,
+    SyntheticBackend,
+    make_response,
+)
+from config import log_context, set_agent_context
+from config.logger_config import AgentContextFilter, JsonLinesFormatter
+from core.prompt_budget import (
+    PromptBuilder,
+    estimate_tokens,
+    rank_weights,
+    trim_to_budget,
+)
+
+
+class TestStreamingJSONParser:
+    """Test the tolerant streaming JSON parser"""
+
+    def test_emits_articles_as_they_close(self):
+        """Test that array items are emitted before the document ends"""
+        document = json.dumps({
+            "executive_summary": "Summary",
+            "articles": [{"title": "A"}, {"title": "B"}],
+        })
+        parser = StreamingJSONParser("articles")
+
+        emitted = []
+        for i in range(0, len(document), 5):
+            emitted.extend(parser.feed(document[i:i + 5]))
+            if len(emitted) == 1:
+                # First article is available while the second is pending
+                assert '"B"' not in parser.text
+
+        assert [item["title"] for item in emitted] == ["A", "B"]
+        assert parser.finish() == json.loads(document)
+
+    def test_repairs_common_defects(self):
+        """Test unescaped newlines, stray quotes and trailing commas"""
+        text = (
+            '```json\n{"executive_summary": "line one\nline two",'
+            ' "articles": [{"title": "He said "hi" today", "rank": 1,},],}\n```'
+        )
+
+        data = parse_json_lenient(text)
+
+        assert data["executive_summary"] == "line one\nline two"
+        assert data["articles"] == [{"title": 'He said "hi" today', "rank": 1}]
+
+    def test_salvages_truncated_output(self):
+        """Test that a truncated tail keeps every complete article"""
+        text = (
+            '{"executive_summary": "Summary", "articles": ['
+            '{"title": "A", "citations": [{"claim": "c"}]}, '
+            '{"title": "B", "summary": "cut off mid-sent'
+        )
+
+        data = parse_json_lenient(text)
+
+        assert data["executive_summary"] == "Summary"
+        assert data["articles"][0] == {"title": "A", "citations": [{"claim": "c"}]}
+        # The incomplete member is dropped, not half-kept
+        assert data["articles"][1] == {"title": "B"}
+
+
+class TestPromptBudget:
+    """Test prompt budget planning"""
+
+    def test_trim_drops_lowest_value_sentences_first(self):
+        """Test that boilerplate goes before quotable passages"""
+        text = (
+            "Subscribe to our newsletter for more updates today. "
+            'The CEO said "revenue grew 25% this quarter" on Monday. '
+            "Click here to read more stories like this one."
+        )
+
+        trimmed = trim_to_budget(text, estimate_tokens(text) // 2)
+
+        assert "revenue grew 25%" in trimmed
+        assert "Subscribe" not in trimmed
+
+    def test_ordered_sections_trim_from_the_end(self):
+        """Test that ranked lists keep their head"""
+        urls = "\n".join(f"https://example.com/{i}" for i in range(100))
+
+        trimmed = trim_to_budget(urls, 30, scorer=None)
+
+        assert trimmed.startswith("https://example.com/0\n")
+        assert "https://example.com/99" not in trimmed
+
+    def test_budget_shared_by_rank(self):
+        """Test that higher-ranked sections get a larger allowance"""
+        long_text = "This is a reasonably long sentence about markets. " * 200
+        builder = PromptBuilder(max_tokens=1000).add("Header")
+        for weight in rank_weights(3):
+            builder.add(long_text, weight=weight)
+
+        allowance = builder.allocate()
+
+        assert allowance[1] > allowance[2] > allowance[3]
+        assert sum(allowance) <= 1000
+        assert estimate_tokens(builder.build()) <= 1000
+
+
+class TestExtractiveCondensation:
+    """Test extractive pre-summarisation"""
+
+    def test_keeps_relevant_quotable_sentences(self):
+        """Test that boilerplate is dropped and citations survive"""
+        text = (
+            "Subscribe to our newsletter. " * 20
+            + "Nvidia reported revenue of $30 billion, up 122% from a year earlier. "
+            + 'CEO Jensen Huang said "demand for AI chips remains extraordinary". '
+            + "Related stories: Apple, Google, Meta. " * 30
+        )
+
+        condensed, ratio = condense_text(
+            text,
+            title="Nvidia earnings beat on AI chip demand",
+            topics=["AI chips"],
+            target_chars=200,
+        )
+
+        assert "revenue of $30 billion" in condensed
+        assert "demand for AI chips remains extraordinary" in condensed
+        assert "Subscribe" not in condensed
+        assert ratio < 0.2
+
+    def test_short_text_is_unchanged(self):
+        """Test that text under the target is passed through"""
+        assert condense_text("Short text.", target_chars=100) == ("Short text.", 1.0)
+
+    def test_whitespace_text_is_emptied(self):
+        """Test that text with no sentences doesn't fail when the title has tokens"""
+        assert condense_text(" " * 3000, title="AI chips") == ("", 0.0)
+
+
+class TestSpeculativeVerificationLoop:
+    """Test speculative writer candidates"""
+
+    @pytest.mark.asyncio
+    async def test_returns_first_verified_candidate(self, monkeypatch):
+        """Test that the first passing candidate wins and the rest are cancelled"""
+        delays = {0.7: 0.2, 0.5: 0.01, 0.9: 0.05}
+        cancelled = []
+
+        async def fake_writer(temperature=None, **kwargs):
+            try:
+                await asyncio.sleep(delays[temperature])
+            except asyncio.CancelledError:
+                cancelled.append(temperature)
+                raise
+            return temperature
+
+        async def fake_verifier(report, **kwargs):
+            return report
+
+        def fake_check(temperature):
+            return temperature == 0.9, "rejected"
+
+        monkeypatch.setattr(loop_agent, "run_writer_agent", fake_writer)
+        monkeypatch.setattr(loop_agent, "run_verification_agent", fake_verifier)
+        monkeypatch.setattr(loop_agent, "check_report_verified", fake_check)
+        monkeypatch.setattr(loop_agent.settings, "temperature", 0.7)
+
+        loop = loop_agent.VerificationLoop(candidates=3)
+        report, is_verified = await loop.run([], {})
+
+        assert (report, is_verified) == (0.9, True)
+        assert cancelled == [0.7]
+
+
+class TestVerificationCache:
+    """Test the verification result cache"""
+
+    def _article(self, summary="Revenue grew 25%."):
+        return Article(
+            title="Test Article",
+            summary=summary,
+            key_insights=["Insight 1"],
+            citations=[Citation(
+                claim="Revenue grew",
+                source_url="https://example.com",
+                source_title="Example",
+                quote="Revenue grew 25%",
+            )],
+            priority=Priority.HIGH,
+            relevance_reason="Test relevance",
+            url="https://example.com",
+            source="example.com",
+        )
+
+    def test_hits_on_identical_content_across_instances(self, tmp_path):
+        """Test that results persist on disk and are keyed by content"""
+        result = VerificationResult(
+            article_title="Test Article", is_verified=True, feedback="Looks good"
+        )
+        VerificationCache(cache_dir=tmp_path).set(self._article(), result)
+
+        cache = VerificationCache(cache_dir=tmp_path)
+
+        assert cache.get(self._article()) == result
+        assert cache.get(self._article(summary="Revenue fell.")) is None
+
+    def test_expired_results_are_ignored(self, tmp_path):
+        """Test the on-disk TTL"""
+        result = VerificationResult(
+            article_title="Test Article", is_verified=True, feedback="Looks good"
+        )
+        VerificationCache(cache_dir=tmp_path).set(self._article(), result)
+
+        cache = VerificationCache(cache_dir=tmp_path, ttl_hours=-1)
+
+        assert cache.get(self._article()) is None
+
+
+class TestTaskGraph:
+    """Test the async task graph executor"""
+
+    @pytest.mark.asyncio
+    async def test_independent_steps_run_concurrently(self):
+        """Test that steps start once their inputs are ready"""
+        async def slow(value, delay=0.05):
+            await asyncio.sleep(delay)
+            return value
+
+        graph = TaskGraph()
+        graph.add("profile", lambda user_id: f"profile:{user_id}", inputs=["user_id"])
+        graph.add("analysis", lambda profile: slow("analysis"), inputs=["profile"])
+        graph.add("history", lambda profile: slow("history"), inputs=["profile"])
+        graph.add("search", lambda analysis, history: analysis + "+" + history,
+                  inputs=["analysis", "history"])
+
+        results = await graph.run(user_id="u1")
+
+        assert results["profile"] == "profile:u1"
+        assert results["search"] == "analysis+history"
+        timings = graph.timings
+        assert timings["history"]["start"] < timings["analysis"]["end"]
+        assert timings["search"]["start"] >= timings["history"]["end"]
+
+    @pytest.mark.asyncio
+    async def test_sync_steps_run_off_the_event_loop(self):
+        """Test that a blocking step doesn't stall async steps"""
+        import threading
+        import time
+
+        async def tick():
+            await asyncio.sleep(0.01)
+            return time.perf_counter()
+
+        graph = TaskGraph()
+        graph.add("blocking", lambda: (time.sleep(0.1), threading.get_ident())[1])
+        graph.add("tick", tick)
+
+        start = time.perf_counter()
+        results = await graph.run()
+
+        assert results["blocking"] != threading.get_ident()
+        assert results["tick"] - start < 0.08
+
+    def test_rejects_unknown_inputs_and_cycles(self):
+        """Test graph validation"""
+        graph = TaskGraph().add("a", lambda missing: None, inputs=["missing"])
+        with pytest.raises(ValueError, match="Unknown input"):
+            graph.order()
+
+        graph = TaskGraph()
+        graph.add("a", lambda b: b, inputs=["b"]).add("b", lambda a: a, inputs=["a"])
+        with pytest.raises(ValueError, match="cycle"):
+            graph.order()
+
+
+class TestLogContext:
+    """Test per-task logging context"""
+
+    def test_setup_logger_applies_level(self):
+        """Test that an explicit level takes effect once logging is configured"""
+        from config import setup_logger
+
+        setup_logger("newspulse.level_test")
+        logger = setup_logger("newspulse.level_test", level="error")
+
+        assert logger.getEffectiveLevel() == logging.ERROR
+        assert setup_logger("newspulse.level_test").level == logging.ERROR
+
+    @pytest.mark.asyncio
+    async def test_concurrent_pipelines_keep_their_own_context(self):
+        """Test that context follows tasks and executor threads"""
+        records = []
+
+        class Capture(logging.Handler):
+            def emit(self, record):
+                records.append((record.user_id, record.agent, record.getMessage()))
+
+        logger = logging.getLogger("newspulse.test_context")
+        handler = Capture()
+        handler.addFilter(AgentContextFilter())
+        logger.addHandler(handler)
+        logger.setLevel(logging.INFO)
+
+        async def pipeline(user_id, agent):
+            with log_context(user_id=user_id):
+                set_agent_context(logger, agent)
+                await asyncio.sleep(0.01)
+                logger.info("in task")
+                await run_blocking(logger.info, "in thread")
+
+        try:
+            await asyncio.gather(pipeline("alice", "SearchAgent"), pipeline("bob", "WriterAgent"))
+        finally:
+            logger.removeHandler(handler)
+
+        assert sorted(records) == [
+            ("alice", "SearchAgent", "in task"),
+            ("alice", "SearchAgent", "in thread"),
+            ("bob", "WriterAgent", "in task"),
+            ("bob", "WriterAgent", "in thread"),
+        ]
+
+    def test_json_lines_sink_includes_context_and_extra_fields(self):
+        """Test the structured log format"""
+        record = logging.makeLogRecord({
+            "name": "newspulse.writer",
+            "levelname": "INFO",
+            "msg": "Drafted %d articles",
+            "args": (3,),
+            "duration_s": 1.5,
+        })
+        with log_context(user_id="alice", phase="verification"):
+            AgentContextFilter().filter(record)
+
+        entry = json.loads(JsonLinesFormatter().format(record))
+
+        assert entry["message"] == "Drafted 3 articles"
+        assert (entry["user_id"], entry["phase"], entry["agent"]) == ("alice", "verification", "SYSTEM")
+        assert entry["duration_s"] == 1.5
+
+
+class TestTracing:
+    """Test span nesting and export"""
+
+    @pytest.mark.asyncio
+    async def test_spans_nest_across_tasks_and_threads(self, tmp_path, monkeypatch):
+        """Test parent links and the exported OTLP shape"""
+        trace_path = tmp_path / "traces.jsonl"
+        monkeypatch.setattr(tracing.settings, "trace_path", trace_path)
+
+        def fetch():
+            with tracing.span("http.fetch", **{"http.url": "https://example.com"}):
+                pass
+
+        graph = TaskGraph().add("fetch", lambda: run_blocking(fetch))
+        with tracing.span("report.generate", user_id="alice"):
+            await graph.run()
+            with pytest.raises(ValueError):
+                with tracing.span("llm.generate_content"):
+                    raise ValueError("quota")
+
+        spans = {
+            entry["name"]: entry
+            for entry in map(json.loads, trace_path.read_text().splitlines())
+        }
+        root = spans["report.generate"]
+
+        assert root["parentSpanId"] == ""
+        assert spans["step.fetch"]["parentSpanId"] == root["spanId"]
+        assert spans["http.fetch"]["parentSpanId"] == spans["step.fetch"]["spanId"]
+        assert {s["traceId"] for s in spans.values()} == {root["traceId"]}
+        assert spans["llm.generate_content"]["status"]["code"] == "STATUS_CODE_ERROR"
+        assert root["attributes"] == [{"key": "user_id", "value": {"stringValue": "alice"}}]
+
+
+class TestMetrics:
+    """Test the metrics registry and its span-derived metrics"""
+
+    def test_prometheus_text_format(self):
+        """Test counter and histogram exposition"""
+        registry = metrics.MetricsRegistry()
+        requests = registry.counter("test_requests_total", "Requests", ["error"])
+        latency = registry.histogram("test_latency_seconds", "Latency", buckets=(0.1, 1))
+        requests.labels('Bad "quote"').inc()
+        requests.labels("none").inc(2)
+        latency.observe(0.05)
+        latency.observe(0.5)
+        latency.observe(5)
+
+        text = registry.render()
+
+        assert "# TYPE test_requests_total counter" in text
+        assert 'test_requests_total{error="Bad \\"quote\\""} 1' in text
+        assert 'test_requests_total{error="none"} 2' in text
+        assert 'test_latency_seconds_bucket{le="0.1"} 1' in text
+        assert 'test_latency_seconds_bucket{le="1"} 2' in text
+        assert 'test_latency_seconds_bucket{le="+Inf"} 3' in text
+        assert "test_latency_seconds_count 3" in text
+
+    def test_spans_feed_metrics_and_endpoint(self):
+        """Test that finished spans update metrics served over HTTP"""
+        from urllib.request import urlopen
+
+        metrics.REGISTRY.clear()
+        with tracing.span("step.search_results"):
+            with pytest.raises(ValueError):
+                with tracing.span("llm.generate_content", agent="Search"):
+                    raise ValueError("bad JSON")
+        with tracing.span("verification.attempt", attempt=1) as attempt:
+            attempt.set_attribute("outcome", "rejected")
+        metrics.record_cache_lookup("verification", hit=True)
+
+        server = metrics.start_metrics_server(0, host="127.0.0.1")
+        try:
+            with urlopen(f"http://127.0.0.1:{server.server_port}/metrics") as response:
+                text = response.read().decode()
+        finally:
+            server.shutdown()
+            server.server_close()
+
+        assert 'newspulse_llm_requests_total{agent="Search",error="ValueError"} 1' in text
+        assert 'newspulse_phase_duration_seconds_count{phase="search_results"} 1' in text
+        assert 'newspulse_verification_attempts_total{attempt="1",outcome="rejected"} 1' in text
+        assert 'newspulse_cache_lookups_total{cache="verification",result="hit"} 1' in text
+
+    def test_failed_searches_count_as_errors(self, monkeypatch):
+        """Test that a swallowed search error still marks the span as failed"""
+        from tools import search_tool
+
+        def get_search_service():
+            raise ConnectionError("offline")
+
+        monkeypatch.setattr(search_tool, "get_search_service", get_search_service)
+        metrics.REGISTRY.clear()
+
+        assert search_tool.google_search("AI news") == []
+        assert 'newspulse_search_requests_total{error="ConnectionError"} 1' in metrics.render()
+
+
+class TestRunProfiler:
+    """Test the sampling profiler"""
+
+    @pytest.mark.asyncio
+    async def test_samples_threads_and_awaiting_tasks(self, tmp_path):
+        """Test that blocking calls and the tasks awaiting them are both sampled"""
+        import time
+
+        def blocking_fetch():
+            time.sleep(0.1)
+
+        with RunProfiler(interval=0.005) as profiler:
+            await asyncio.create_task(run_blocking(blocking_fetch), name="fetch_step")
+
+        folded = profiler.folded()
+        assert profiler.samples > 0
+        assert "blocking_fetch (test_core.py" in folded
+        assert "task fetch_step;" in folded
+
+        timings = {"fetch": {"start": 0.0, "end": 0.1, "duration": 0.1}}
+        paths = profiler.write(tmp_path / "report_1", timings=timings, title="Test run")
+        assert paths["folded"].read_text() == folded
+        assert "fetch" in paths["html"].read_text()
+
+
+class TestLLMBackends:
+    """Test the record, replay and synthetic LLM backends"""
+
+    def test_record_then_replay(self, tmp_path):
+        """Test that recorded responses replay by prompt, streamed or not"""
+        live = SimpleNamespace(models=SimpleNamespace(
+            generate_content=lambda **request: make_response(
+                "Focus on AI", {"prompt_token_count": 10, "candidates_token_count": 3,
+                                "total_token_count": 13},
+            ),
+        ))
+        recorder = RecordingBackend(lambda: live, tmp_path)
+        recorder.models.generate_content(model="m", contents="Analyze this profile")
+
+        replay = ReplayBackend(tmp_path, LatencyModel("recorded", scale=0))
+        response = replay.models.generate_content(model="m", contents="Analyze this profile")
+        assert response.text == "Focus on AI"
+        assert response.usage_metadata.total_token_count == 13
+
+        chunks = list(replay.models.generate_content_stream(model="m", contents="Analyze this profile"))
+        assert "".join(chunk.text for chunk in chunks) == "Focus on AI"
+
+        with pytest.raises(RecordingNotFoundError):
+            replay.models.generate_content(model="m", contents="Another prompt")
+
+    def test_synthetic_writer_report_is_schema_valid(self):
+        """Test that synthetic writer output cites the prompt's articles"""
+        from agents.writer_agent import WRITER_AGENT_INSTRUCTION
+
+        prompt = (
+            f"{WRITER_AGENT_INSTRUCTION}\n\nArticle 1:\nTitle: Chip rules tighten\n"
+            "Source: example.com\nURL: https://example.com/chips\n"
+        )
+        backend = SyntheticBackend(LatencyModel("fixed:0"))
+        report = json.loads(backend.models.generate_content(model="m", contents=prompt).text)
+
+        article = Article(
+            **{**report["articles"][0], "priority": report["articles"][0]["priority"].lower()},
+        )
+        assert article.url == "https://example.com/chips"
+        assert article.citations[0].source_url == article.url
+        assert report["executive_summary"]
+
+    def test_simulated_rate_limits(self):
+        """Test that the configured share of calls fails with a 429"""
+        from google.genai import errors
+
+        backend = SyntheticBackend(LatencyModel("fixed:0"), rate_limit_rate=1.0, seed=1)
+        with pytest.raises(errors.ClientError) as raised:
+            backend.models.generate_content(model="m", contents="Hello")
+        assert raised.value.code == 429
+
+
+class TestGenerateBatch:
+    """Test batch report generation"""
+
+    @pytest.mark.asyncio
+    async def test_bounded_concurrency_and_failures(self, monkeypatch):
+        """Test that a failed report doesn't stop the batch"""
+        from core.orchestrator import NewsPulseOrchestrator
+
+        in_flight = 0
+        peak = 0
+
+        async def generate_report(user_id, deliver=True):
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0.01)
+            in_flight -= 1
+            if user_id == "bob":
+                raise ValueError("No search results found")
+            return SimpleNamespace(report_id=f"report_{user_id}")
+
+        orchestrator = NewsPulseOrchestrator()
+        monkeypatch.setattr(orchestrator, "generate_report", generate_report)
+
+        results = await orchestrator.generate_batch(
+            ["alice", "bob", "carol", "dave"], concurrency=2
+        )
+
+        assert peak == 2
+        assert [r["status"] for r in results] == ["ok", "error", "ok", "ok"]
+        assert results[0]["report_id"] == "report_alice"
+        assert results[1]["error"] == "ValueError: No search results found"
+
+
+class TestService:
+    """Test the service mode job queue and HTTP API"""
+
+    @pytest.mark.asyncio
+    async def test_jobs_bounded_and_drained_on_shutdown(self, monkeypatch):
+        """Test that queued jobs run a bounded number at a time and finish at shutdown"""
+        from urllib.error import HTTPError
+        from urllib.request import Request, urlopen
+        from core import service as service_module
+
+        monkeypatch.setattr(service_module, "warm_up", lambda logger: None)
+        monkeypatch.setattr(
+            service_module,
+            "get_profile_manager",
+            lambda: SimpleNamespace(load_profile=lambda user_id: None if user_id == "nobody" else user_id),
+        )
+
+        running = 0
+        peak = 0
+
+        async def generate_report(user_id, deliver=True):
+            nonlocal running, peak
+            running += 1
+            peak = max(peak, running)
+            await asyncio.sleep(0.05)
+            running -= 1
+            return SimpleNamespace(
+                report_id=f"report_{user_id}", total_articles=3, topics_covered=["AI"], usage=None
+            )
+
+        service = service_module.NewsPulseService(
+            orchestrator=SimpleNamespace(generate_report=generate_report), concurrency=2
+        )
+        port = await service.start("127.0.0.1", 0)
+
+        def request(method, path, payload=None):
+            data = json.dumps(payload).encode() if payload is not None else None
+            try:
+                with urlopen(Request(f"http://127.0.0.1:{port}{path}", data=data, method=method)) as response:
+                    return response.status, json.loads(response.read())
+            except HTTPError as e:
+                return e.code, json.loads(e.read())
+
+        jobs = []
+        for user_id in ("alice", "bob", "carol"):
+            status, job = await run_blocking(request, "POST", "/reports", {"user_id": user_id})
+            assert (status, job["status"]) == (202, "queued")
+            jobs.append(job["job_id"])
+
+        assert (await run_blocking(request, "POST", "/reports", {"user_id": "nobody"}))[0] == 404
+        assert (await run_blocking(request, "POST", "/reports", {}))[0] == 400
+        status, job = await run_blocking(request, "GET", f"/jobs/{jobs[0]}")
+        assert status == 200 and job["user_id"] == "alice"
+
+        await service.shutdown(timeout=5)
+
+        assert peak == 2
+        assert [service.jobs[job_id]["status"] for job_id in jobs] == ["done"] * 3
+        assert service.jobs[jobs[2]]["result"]["report_id"] == "report_carol"
+        with pytest.raises(service_module.ServiceUnavailable):
+            service.submit_report("alice")
+
+    @pytest.mark.asyncio
+    async def test_slow_fetches_overlap_and_health_stays_responsive(self, monkeypatch):
+        """Test that blocking fetches in one job don't stall other jobs or requests"""
+        import time
+        from urllib.request import urlopen
+        from agents import fetch_agent
+        from core import service as service_module
+
+        monkeypatch.setattr(service_module, "warm_up", lambda logger: None)
+
+        fetches = []
+
+        def slow_fetch(urls):
+            start = time.perf_counter()
+            time.sleep(0.3)
+            fetches.append((start, time.perf_counter()))
+            return []
+
+        monkeypatch.setattr(fetch_agent, "fetch_multiple_urls", slow_fetch)
+
+        async def generate_report(user_id, deliver=True):
+            await fetch_agent.run_fetch_agent([], topics=["AI"])
+            return SimpleNamespace(
+                report_id=f"report_{user_id}", total_articles=0, topics_covered=[], usage=None
+            )
+
+        service = service_module.NewsPulseService(
+            orchestrator=SimpleNamespace(generate_report=generate_report), concurrency=2
+        )
+        port = await service.start("127.0.0.1", 0)
+        jobs = [service.submit_report(user_id)["job_id"] for user_id in ("alice", "bob")]
+
+        await asyncio.sleep(0.05)
+
+        def health():
+            start = time.perf_counter()
+            with urlopen(f"http://127.0.0.1:{port}/health") as response:
+                return json.loads(response.read()), time.perf_counter() - start
+
+        status, elapsed = await run_blocking(health)
+        await service.shutdown(timeout=5)
+
+        assert status["running"] == 2
+        assert elapsed < 0.2
+        assert [service.jobs[job_id]["status"] for job_id in jobs] == ["done"] * 2
+        (first_start, first_end), (second_start, second_end) = sorted(fetches)
+        assert second_start < first_end
+
+
+class TestDeliveryScheduler:
+    """Test per-user delivery scheduling"""
+
+    def test_plan_staggers_shared_delivery_times(self):
+        """Test time zones, the fallback time and the concurrency cap"""
+        from datetime import datetime, timedelta, timezone
+        from core.scheduler import next_delivery, plan_runs
+
+        def profile(user_id, delivery_time="08:00", tz="America/New_York"):
+            return SimpleNamespace(user_id=user_id, delivery_time=delivery_time, timezone=tz)
+
+        now = datetime(2026, 1, 15, 10, 0, tzinfo=timezone.utc)  # 05:00 in New York
+        assert next_delivery(profile("a"), now) == datetime(2026, 1, 15, 13, 0, tzinfo=timezone.utc)
+        assert next_delivery(profile("b", "07:30", "Asia/Kolkata"), now) == datetime(
+            2026, 1, 16, 2, 0, tzinfo=timezone.utc
+        )
+        assert next_delivery(profile("c", "8am", "Not/AZone"), now) == datetime(
+            2026, 1, 16, 8, 0, tzinfo=timezone.utc
+        )
+
+        runs = plan_runs(
+            [profile(f"user_{i}") for i in range(5)], now,
+            duration_s=100, concurrency=2, horizon=timedelta(hours=24),
+        )
+
+        deliver_at = datetime(2026, 1, 15, 13, 0, tzinfo=timezone.utc)
+        starts = sorted(run["start_at"] for run in runs)
+        assert all(run["deliver_at"] == deliver_at for run in runs)
+        assert starts == [deliver_at - timedelta(seconds=s) for s in (300, 200, 200, 100, 100)]
+
+    def test_replan_replaces_queued_runs(self, tmp_path, monkeypatch):
+        """Test that changed and deleted profiles don't leave stale runs"""
+        from datetime import datetime, timedelta, timezone
+        from core.scheduler import DeliveryScheduler, DurationEstimator
+
+        now = datetime(2026, 1, 15, 10, 0, tzinfo=timezone.utc)
+
+        def run(user_id, hour):
+            deliver_at = now.replace(hour=hour)
+            start_at = deliver_at - timedelta(minutes=5)
+            return {"user_id": user_id, "deliver_at": deliver_at, "start_at": start_at}
+
+        scheduler = DeliveryScheduler(
+            orchestrator=SimpleNamespace(),
+            estimator=DurationEstimator(path=tmp_path / "durations.json"),
+        )
+        plans = iter([
+            [run("alice", 13), run("bob", 13), run("carol", 14)],
+            # alice moved her delivery time, bob was deleted, carol's run started
+            [run("alice", 15), run("carol", 14)],
+        ])
+        monkeypatch.setattr(scheduler, "plan", lambda now=None: next(plans))
+
+        assert scheduler.replan(now) == 3
+        carol = next(entry for entry in scheduler._queue if entry[2] == "carol")
+        scheduler._queue.remove(carol)
+        scheduler._started.add(("carol", carol[1]))
+
+        assert scheduler.replan(now) == 1
+        queued = [(user_id, deliver_at.hour) for _, deliver_at, user_id in scheduler._queue]
+        assert queued == [("alice", 15)]
+
+    @pytest.mark.asyncio
+    async def test_generates_early_and_delivers_on_time(self, tmp_path):
+        """Test that a report is held until its delivery time"""
+        from datetime import datetime, timedelta, timezone
+        from core.scheduler import DeliveryScheduler, DurationEstimator
+
+        events = []
+
+        async def generate_report(user_id, deliver=True):
+            events.append(("generate", deliver))
+            return SimpleNamespace(report_id="report_1", user_id=user_id)
+
+        async def deliver_report(report):
+            events.append(("deliver", datetime.now(timezone.utc)))
+            return {"status": "delivered"}
+
+        estimator = DurationEstimator(path=tmp_path / "durations.json")
+        scheduler = DeliveryScheduler(
+            orchestrator=SimpleNamespace(generate_report=generate_report, deliver_report=deliver_report),
+            estimator=estimator,
+        )
+        deliver_at = datetime.now(timezone.utc) + timedelta(seconds=0.1)
+
+        await scheduler._run_one("alice", deliver_at)
+
+        assert events[0] == ("generate", False)
+        assert events[1][0] == "deliver" and events[1][1] >= deliver_at
+        assert scheduler.results[0]["status"] == "delivered"
+        assert len(DurationEstimator(path=tmp_path / "durations.json").durations) == 1
+
+
+class TestResearchCache:
+    """Test pre-warmed topic research"""
+
+    @pytest.mark.asyncio
+    async def test_cached_topics_skip_search_and_fetch(self, tmp_path, monkeypatch):
+        """Test that only uncached topics are researched live"""
+        from models.schemas import FetchedContent, SearchResult
+        from core import orchestrator as orchestrator_module
+        from core.research_cache import ResearchCache
+
+        def article(topic, url):
+            return {
+                "search_result": SearchResult(
+                    query=topic, url=url, title=url, snippet="", source="example.com", topic=topic
+                ),
+                "fetched_content": FetchedContent(
+                    url=url, title=url, content="raw page", source="example.com",
+                    condensed_content="condensed",
+                ),
+                "analysis": f"Analysis of {url}",
+            }
+
+        monkeypatch.setattr(orchestrator_module.settings, "cache_dir", tmp_path)
+        ResearchCache().set("AI", "ai news", [
+            article("AI", "https://example.com/seen"),
+            article("AI", "https://example.com/ai"),
+        ])
+        cached = ResearchCache().get("  ai ")
+        assert cached[1]["analysis"] == "Analysis of https://example.com/ai"
+        assert cached[1]["fetched_content"].content == "condensed"
+
+        searched = []
+
+        async def run_search_agent(priority_topics, **kwargs):
+            searched.extend(priority_topics)
+            return [article("Cloud", "https://example.com/cloud")["search_result"]]
+
+        async def run_fetch_agent(search_results, **kwargs):
+            return [article(r.topic, r.url) for r in search_results]
+
+        monkeypatch.setattr(orchestrator_module, "run_search_agent", run_search_agent)
+        monkeypatch.setattr(orchestrator_module, "run_fetch_agent", run_fetch_agent)
+
+        orchestrator = orchestrator_module.NewsPulseOrchestrator()
+        user_context = {"priority_topics": ["Cloud", "AI"]}
+        seen_urls = {"https://example.com/seen"}
+
+        cached_research = await orchestrator._load_cached_research(user_context, seen_urls)
+        results = await orchestrator._run_search(user_context, seen_urls, cached_research)
+        articles = await orchestrator._run_fetch(user_context, results, cached_research)
+
+        assert searched == ["Cloud"]
+        assert [a["search_result"].url for a in articles] == [
+            "https://example.com/cloud", "https://example.com/ai"
+        ]
+        assert ResearchCache(ttl_hours=-1).get("AI") is None
+
+    @pytest.mark.asyncio
+    async def test_prewarmed_topics_fetch_concurrently(self, tmp_path, monkeypatch):
+        """Test that one topic's blocking fetch doesn't hold up the others"""
+        import time
+        from agents import fetch_agent
+        from core import research_cache
+
+        fetches = []
+
+        async def plan_topic_query(topic):
+            return f"{topic} news"
+
+        def slow_fetch(urls):
+            start = time.perf_counter()
+            time.sleep(0.3)
+            fetches.append((start, time.perf_counter()))
+            return []
+
+        monkeypatch.setattr(research_cache.settings, "cache_dir", tmp_path)
+        monkeypatch.setattr(research_cache, "plan_topic_query", plan_topic_query)
+        monkeypatch.setattr(research_cache, "search_news", lambda *args: [])
+        monkeypatch.setattr(fetch_agent, "fetch_multiple_urls", slow_fetch)
+
+        summaries = await research_cache.prewarm_topics(["AI", "Cloud"], concurrency=2)
+
+        assert [s["topic"] for s in summaries] == ["AI", "Cloud"]
+        (first_start, first_end), (second_start, second_end) = sorted(fetches)
+        assert second_start < first_end
@@ -0,0 +1,292 @@
+"""
+Tests for NewsPulse AI local storage
+
+To run tests:
+    pytest tests/
+"""
+import json
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+import pytest
+
+from config import settings
+
+from models.database import connect
+from models.history_store import HistoryStore
+from models.schemas import Article, Citation, NewsReport, Priority, UserProfile
+from models.user_profile import (
+    ConcurrentUpdateError,
+    SQLiteUserProfileManager,
+    UserProfileManager,
+)
+from models.seen_urls import SeenUrlIndex, canonicalize_url
+from models.usage_store import UsageStore, estimate_cost
+
+
+class TestHistoryStore:
+    """Test the append-only report history store"""
+
+    def _report(self, report_id, days_ago, url="https://example.com"):
+        return {
+            "report_id": report_id,
+            "report_date": (datetime.utcnow() - timedelta(days=days_ago)).isoformat(),
+            "articles": [{"url": url}],
+        }
+
+    def test_append_and_range_query(self, tmp_path):
+        """Test that loads are filtered by report date, oldest first"""
+        store = HistoryStore(db_path=tmp_path / "test.db", history_dir=tmp_path)
+        store.append("test_user", self._report("new", days_ago=1))
+        store.append("test_user", self._report("old", days_ago=40))
+        store.append("test_user", self._report("mid", days_ago=10))
+        store.append("other_user", self._report("other", days_ago=1))
+
+        recent = store.load("test_user", since=datetime.utcnow() - timedelta(days=30))
+
+        assert [r["report_id"] for r in recent] == ["mid", "new"]
+
+    def test_imports_legacy_json_history(self, tmp_path):
+        """Test that an existing history file is imported once"""
+        legacy_file = tmp_path / "test_user_history.json"
+        with open(legacy_file, "w") as f:
+            json.dump([self._report("a", 2), self._report("b", 1)], f)
+
+        store = HistoryStore(db_path=tmp_path / "test.db", history_dir=tmp_path)
+        store.append("test_user", self._report("c", 0))
+
+        assert [r["report_id"] for r in store.load("test_user")] == ["a", "b", "c"]
+        assert not legacy_file.exists()
+        assert store.import_json_history("test_user") == 0
+
+    def test_append_serialises_models_directly(self, tmp_path):
+        """Test that reports can be stored without a model_dump() round trip"""
+        report = NewsReport(
+            user_id="test_user",
+            executive_summary="Summary",
+            articles=[Article(
+                title="Test Article",
+                summary="Revenue grew.",
+                key_insights=[],
+                citations=[Citation(
+                    claim="Revenue grew",
+                    source_url="https://example.com",
+                    source_title="Example",
+                    quote="Revenue grew",
+                )],
+                priority=Priority.HIGH,
+                relevance_reason="Test relevance",
+                url="https://example.com",
+                source="example.com",
+            )],
+            total_articles=1,
+            topics_covered=["AI"],
+            report_id="r1",
+        )
+        store = HistoryStore(db_path=tmp_path / "test.db", history_dir=tmp_path)
+        store.append("test_user", report)
+
+        (loaded,) = store.load("test_user")
+        assert NewsReport(**loaded) == report
+
+
+class TestUsageStore:
+    """Test LLM usage accounting"""
+
+    def test_report_totals_and_grouping(self, tmp_path):
+        """Totals roll up per report and can be grouped by any tag"""
+        store = UsageStore(db_path=tmp_path / "test.db")
+        store.record("m", 1000, 200, 1500, 1.0, user_id="u1", report_id="r1",
+                     agent="SearchAgent", topic="AI")
+        store.record("m", 3000, 400, 3400, 2.0, user_id="u1", report_id="r1",
+                     agent="WriterAgent")
+        store.record("m", 500, 100, 600, 0.5, user_id="u2", report_id="r2",
+                     agent="SearchAgent", topic="Cloud")
+
+        totals = store.report_totals("r1")
+        assert totals["calls"] == 2
+        assert totals["total_tokens"] == 4900
+        assert set(totals["by_agent"]) == {"SearchAgent", "WriterAgent"}
+        # Thinking tokens (total - prompt - output) are billed as output
+        assert totals["cost_usd"] == pytest.approx(
+            estimate_cost(1000, 500) + estimate_cost(3000, 400), abs=1e-6
+        )
+
+        by_user = store.summary("user_id")
+        assert [row["user_id"] for row in by_user] == ["u1", "u2"]
+        assert store.summary("topic", since=datetime.utcnow() + timedelta(days=1)) == []
+        with pytest.raises(ValueError):
+            store.summary("prompt_tokens; DROP TABLE llm_usage")
+
+
+class TestSeenUrlIndex:
+    """Test the persistent seen-URL index"""
+
+    def test_canonicalize_url(self):
+        """Test that trivially different links match"""
+        assert canonicalize_url(
+            "http://www.Example.com/news/story/?utm_source=x&id=7#top"
+        ) == canonicalize_url("https://example.com/news/story?id=7")
+
+    def test_canonicalize_malformed_url(self):
+        """Test that unparseable links fall back to the raw URL"""
+        for url in ("http://x.com:99999/", "http://x.com:abc/a", "http://[::1/a"):
+            assert canonicalize_url(f" {url} ") == url
+
+    def test_persists_and_excludes(self, tmp_path):
+        """Test set-mode membership across instances"""
+        db_path = tmp_path / "test.db"
+        SeenUrlIndex("test_user", db_path=db_path).add(["https://example.com/a"])
+
+        index = SeenUrlIndex("test_user", db_path=db_path)
+
+        assert "http://www.example.com/a/" in index
+        assert "https://example.com/b" not in index
+        assert "https://example.com/a" not in SeenUrlIndex("other_user", db_path=db_path)
+
+    def test_bloom_filter_mode(self, tmp_path):
+        """Test membership once the history exceeds the Bloom threshold"""
+        index = SeenUrlIndex("test_user", db_path=tmp_path / "test.db")
+        index.bloom_threshold = 10
+        urls = [f"https://example.com/{i}" for i in range(50)]
+        index.add(urls)
+
+        reloaded = SeenUrlIndex("test_user", db_path=tmp_path / "test.db")
+        reloaded.bloom_threshold = 10
+
+        assert all(url in reloaded for url in urls)
+        assert "https://example.com/unseen" not in reloaded
+
+    def test_bloom_rebuilt_when_error_rate_changes(self, tmp_path, monkeypatch):
+        """Test that bits persisted at another error rate are not reused"""
+        urls = [f"https://example.com/{i}" for i in range(50)]
+        for error_rate in (0.01, 0.0001, 0.1):
+            monkeypatch.setattr(settings, "seen_url_bloom_error_rate", error_rate)
+            index = SeenUrlIndex("test_user", db_path=tmp_path / "test.db")
+            index.bloom_threshold = 10
+            index.add(urls[:40] if error_rate == 0.01 else [])
+
+            assert all(url in index for url in urls[:40])
+            assert index._load_bloom().error_rate == error_rate
+
+    def test_backfills_from_history(self, tmp_path):
+        """Test that an empty index is seeded from report history"""
+        db_path = tmp_path / "test.db"
+        HistoryStore(db_path=db_path, history_dir=tmp_path).append(
+            "test_user", self._report()
+        )
+
+        assert "https://example.com/old" in SeenUrlIndex("test_user", db_path=db_path)
+
+    def _report(self):
+        return {
+            "report_id": "r1",
+            "report_date": datetime.utcnow().isoformat(),
+            "articles": [{"url": "https://example.com/old"}],
+        }
+
+
+class TestSQLiteUserProfileManager:
+    """Test the SQLite profile backend"""
+
+    def _profile(self, user_id, **kwargs):
+        return UserProfile(
+            user_id=user_id,
+            name="Test User",
+            role="CEO",
+            company="Test Corp",
+            industry="Technology",
+            delivery_email=f"{user_id}@example.com",
+            **{"topics_of_interest": ["AI"], **kwargs},
+        )
+
+    def test_imports_json_profiles_and_finds_by_indexed_columns(self, tmp_path):
+        """Test the JSON import and indexed lookups"""
+        with open(tmp_path / "alice.json", "w") as f:
+            f.write(self._profile("alice", delivery_time="07:00").model_dump_json())
+
+        manager = SQLiteUserProfileManager(db_path=tmp_path / "test.db", profiles_dir=tmp_path)
+        manager.save_profile(self._profile("bob", topics_of_interest=["AI", "Cloud"]))
+        manager.save_profile(self._profile("carol", timezone="Europe/London"))
+
+        assert manager.list_profiles() == ["alice", "bob", "carol"]
+        assert manager.find_profiles(delivery_time="07:00") == ["alice"]
+        assert manager.find_profiles(topic="Cloud") == ["bob"]
+        assert manager.find_profiles(topic="AI", timezone="America/New_York") == ["alice", "bob"]
+
+    def test_cache_returns_copies_and_writes_through(self, tmp_path):
+        """Test that the cache can't be mutated by callers and sees saves"""
+        db_path = tmp_path / "test.db"
+        manager = SQLiteUserProfileManager(db_path=db_path, profiles_dir=tmp_path)
+        manager.save_profile(self._profile("alice"))
+
+        profile = manager.load_profile("alice")
+        profile.constraints["tone"] = "brief"
+        assert manager.load_profile("alice").constraints == {}
+
+        manager.update_constraints("alice", {"tone": "brief"})
+        assert manager.load_profile("alice").constraints == {"tone": "brief"}
+
+        fresh = SQLiteUserProfileManager(db_path=db_path, profiles_dir=tmp_path)
+        assert fresh.load_profiles(["alice", "missing"])["alice"].constraints == {"tone": "brief"}
+
+    def test_cache_sees_other_processes_writes(self, tmp_path):
+        """Test that edits and deletes made elsewhere invalidate cached profiles"""
+        db_path = tmp_path / "test.db"
+        manager = SQLiteUserProfileManager(db_path=db_path, profiles_dir=tmp_path)
+        manager.save_profile(self._profile("alice"))
+        manager.save_profile(self._profile("bob"))
+        assert set(manager.load_profiles()) == {"alice", "bob"}
+
+        other = SQLiteUserProfileManager(db_path=db_path, profiles_dir=tmp_path)
+        other.update_constraints("alice", {"tone": "brief"})
+        with connect(db_path) as conn:
+            conn.execute("DELETE FROM user_profiles WHERE user_id = 'bob'")
+
+        assert manager.load_profile("alice").constraints == {"tone": "brief"}
+        assert manager.load_profile("bob") is None
+        assert list(manager.load_profiles()) == ["alice"]
+        assert manager.load_profiles()["alice"].constraints == {"tone": "brief"}
+
+
+@pytest.mark.parametrize("backend", ["json", "sqlite"])
+class TestProfileConcurrency:
+    """Test optimistic concurrency for profile updates"""
+
+    def _manager(self, backend, tmp_path):
+        if backend == "sqlite":
+            return SQLiteUserProfileManager(db_path=tmp_path / "test.db", profiles_dir=tmp_path)
+        return UserProfileManager(profiles_dir=tmp_path)
+
+    def test_stale_save_is_rejected(self, backend, tmp_path):
+        """Test that a save based on an old version raises"""
+        manager = self._manager(backend, tmp_path)
+        manager.create_profile(
+            "alice", "Alice", "CEO", "Test Corp", "Technology", ["AI"], "alice@example.com"
+        )
+        first = manager.load_profile("alice")
+        second = manager.load_profile("alice")
+
+        manager.save_profile(first, expected_version=first.version)
+
+        with pytest.raises(ConcurrentUpdateError):
+            manager.save_profile(second, expected_version=second.version)
+        assert manager.load_profile("alice").version == 2
+
+    def test_concurrent_constraint_updates_are_not_lost(self, backend, tmp_path, monkeypatch):
+        """Test that parallel read-modify-writes all land"""
+        monkeypatch.setattr(settings, "profile_update_retries", 50)
+        manager = self._manager(backend, tmp_path)
+        manager.create_profile(
+            "alice", "Alice", "CEO", "Test Corp", "Technology", ["AI"], "alice@example.com"
+        )
+        workers = [self._manager(backend, tmp_path) for _ in range(8)]
+
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            list(pool.map(
+                lambda i: workers[i].update_constraints("alice", {f"key_{i}": i}),
+                range(8),
+            ))
+
+        profile = self._manager(backend, tmp_path).load_profile("alice")
+        assert profile.constraints == {f"key_{i}": i for i in range(8)}
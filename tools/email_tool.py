@@ -8,6 +8,7 @@ from typing import Optional, List
 
 from config import settings
 from models.schemas import NewsReport, Article
+from core.tracing import span
 
 
 def format_report_html(report: NewsReport) -> str:
@@ -257,7 +258,8 @@ def send_email_report(
             all_recipients.extend(bcc_emails)
 
         # Connect to SMTP server
-        with smtplib.SMTP(settings.smtp_server, settings.smtp_port) as server:
+        with span("smtp.send", **{"email.recipients": len(all_recipients)}), \
+                smtplib.SMTP(settings.smtp_server, settings.smtp_port) as server:
             server.starttls()
             server.login(settings.smtp_username, settings.smtp_password)
             # Send to all recipients (To, CC, and BCC)
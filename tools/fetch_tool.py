@@ -2,13 +2,36 @@
 Content fetching tool using BeautifulSoup
 Scrapes actual HTML to ground the model in real-time data and prevent hallucinations
 """
+import contextvars
 import requests
+from requests.adapters import HTTPAdapter
 from bs4 import BeautifulSoup
+from functools import lru_cache
 from typing import Optional
 from datetime import datetime
 import time
 
+from config import settings
 from models.schemas import FetchedContent
+from core.tracing import Span, span
+
+
+@lru_cache(maxsize=None)
+def get_http_session() -> requests.Session:
+    """
+    Process-wide HTTP session with a connection pool
+
+    Keeps connections to news sites alive between fetches instead of
+    opening one per request.
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(
+        pool_connections=settings.http_pool_hosts,
+        pool_maxsize=settings.http_pool_size,
+    )
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
 
 
 def fetch_url_content(
@@ -33,14 +56,35 @@ def fetch_url_content(
         This function forces the model to read ACTUAL live content rather than
         relying on search snippets, which is critical for minimizing hallucinations.
     """
+    with span("http.fetch", **{"http.url": url}) as current:
+        fetched = _fetch_url_content(url, timeout, retry_count, retry_delay, current)
+        current.set_attributes(**{
+            "fetch.success": fetched.success,
+            "fetch.content_chars": len(fetched.content),
+            "fetch.error": fetched.error_message,
+        })
+        if not fetched.success:
+            current.status = "ERROR"
+            current.status_message = fetched.error_message or ""
+        return fetched
+
+
+def _fetch_url_content(
+    url: str, timeout: int, retry_count: int, retry_delay: int, current: Span
+) -> FetchedContent:
     headers = {
         "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
     }
 
     for attempt in range(retry_count + 1):
+        current.set_attribute("http.attempts", attempt + 1)
         try:
             # Fetch the page
-            response = requests.get(url, headers=headers, timeout=timeout)
+            response = get_http_session().get(url, headers=headers, timeout=timeout)
+            current.set_attributes(**{
+                "http.status_code": response.status_code,
+                "http.response_bytes": len(response.content),
+            })
             response.raise_for_status()
 
             # Parse HTML
@@ -125,6 +169,7 @@ def fetch_url_content(
                 continue
 
             # Final attempt failed
+            current.set_attribute("error.type", type(e).__name__)
             return FetchedContent(
                 url=url,
                 title="",
@@ -135,6 +180,7 @@ def fetch_url_content(
             )
 
         except Exception as e:
+            current.set_attribute("error.type", type(e).__name__)
             return FetchedContent(
                 url=url,
                 title="",
@@ -168,7 +214,13 @@ def fetch_multiple_urls(urls: list[str], max_workers: int = 5) -> list[FetchedCo
     """
     from concurrent.futures import ThreadPoolExecutor
 
+    # Each worker runs in a copy of the caller's context, so fetch spans and
+    # log lines stay attached to the current report
     with ThreadPoolExecutor(max_workers=max_workers) as executor:
-        results = list(executor.map(fetch_url_content, urls))
+        futures = [
+            executor.submit(contextvars.copy_context().run, fetch_url_content, url)
+            for url in urls
+        ]
+        results = [future.result() for future in futures]
 
     return results
@@ -2,12 +2,33 @@
 Google Custom Search API tool
 Separates search (finding URLs) from content fetching to minimize hallucinations
 """
+import threading
 from typing import List, Optional
 from googleapiclient.discovery import build
 from googleapiclient.errors import HttpError
 
 from config import settings
 from models.schemas import SearchResult
+from core.tracing import Span, span
+
+
+_local = threading.local()
+
+
+def get_search_service():
+    """
+    Custom Search service for the calling thread
+
+    Building the service parses its discovery document, so it is built
+    once per thread and reused. googleapiclient services share an httplib2
+    connection that is not thread-safe, hence one per thread rather than
+    one per process.
+    """
+    key = settings.google_search_api_key
+    if getattr(_local, "key", None) != key:
+        _local.service = build("customsearch", "v1", developerKey=key)
+        _local.key = key
+    return _local.service
 
 
 def google_search(
@@ -32,13 +53,21 @@ def google_search(
         This function ONLY returns URLs and snippets, NOT full content.
         Content must be fetched separately using fetch_url_content.
     """
+    with span("search.google", **{"search.query": query}) as current:
+        search_results = _google_search(query, num_results, date_restrict, site_restrict, current)
+        current.set_attribute("search.results", len(search_results))
+        return search_results
+
+
+def _google_search(
+    query: str,
+    num_results: int,
+    date_restrict: Optional[str],
+    site_restrict: Optional[str],
+    current: Span,
+) -> List[SearchResult]:
     try:
-        # Build the Custom Search service
-        service = build(
-            "customsearch",
-            "v1",
-            developerKey=settings.google_search_api_key,
-        )
+        service = get_search_service()
 
         # Prepare search parameters
         search_params = {
@@ -77,9 +106,13 @@ def google_search(
 
     except HttpError as e:
         print(f"Search API error: {e}")
+        current.set_attribute("search.error", str(e))
+        current.set_error(e)
         return []
     except Exception as e:
         print(f"Unexpected search error: {e}")
+        current.set_attribute("search.error", str(e))
+        current.set_error(e)
         return []
 
 